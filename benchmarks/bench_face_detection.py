@@ -0,0 +1,142 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from src.core.image_io import load_rgb_image
+from src.experts.face_detectors import HaarFaceDetector, build_face_detector
+from src.experts.face_tracker import box_iou
+
+
+# =========================================================
+# FACE DETECTOR BENCHMARK: latency vs recall
+# =========================================================
+# Recall is measured against full-resolution Haar detection (the
+# previous Level 2 behaviour) on a directory of images:
+#   python -m benchmarks.bench_face_detection --images data/faces --max-sides 640,1024,1600
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def list_images(directory):
+
+    paths = sorted(
+        path for path in glob.glob(os.path.join(directory, "**", "*"), recursive=True)
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+    if not paths:
+        raise FileNotFoundError(f"No images found in {directory}")
+
+    return paths
+
+
+def matched_boxes(reference, candidate, iou_threshold=0.5):
+
+    # Greedy one-to-one IoU matching; returns the number of matches
+    pairs = sorted(
+        (
+            (box_iou(ref, cand), i, j)
+            for i, ref in enumerate(reference)
+            for j, cand in enumerate(candidate)
+        ),
+        reverse=True
+    )
+
+    used_ref, used_cand = set(), set()
+
+    for iou, i, j in pairs:
+        if iou < iou_threshold:
+            break
+        if i in used_ref or j in used_cand:
+            continue
+        used_ref.add(i)
+        used_cand.add(j)
+
+    return len(used_ref)
+
+
+def time_detector(detector, images, batch_size):
+
+    boxes = []
+    start = time.perf_counter()
+
+    for i in range(0, len(images), batch_size):
+        boxes.extend(detector.detect_batch(images[i:i + batch_size]))
+
+    return time.perf_counter() - start, boxes
+
+
+def run(image_dir, max_sides=(640, 1024, 1600), detectors=("haar", "mtcnn"), batch_size=8, iou_threshold=0.5):
+
+    paths = list_images(image_dir)
+    images = [np.array(load_rgb_image(path)) for path in paths]
+
+    reference_seconds, reference = time_detector(HaarFaceDetector(max_side=None), images, batch_size)
+    reference_faces = sum(len(boxes) for boxes in reference)
+
+    report = {
+        "images": len(images),
+        "megapixels_mean": float(np.mean([image.shape[0] * image.shape[1] / 1e6 for image in images])),
+        "reference_faces": reference_faces,
+        "haar_full_resolution": {
+            "ms_per_image": 1000 * reference_seconds / len(images),
+        },
+    }
+
+    for name in detectors:
+        for max_side in max_sides:
+
+            label = f"{name}_max{max_side}"
+
+            try:
+                detector = build_face_detector(name, max_side=max_side)
+            except ImportError as error:
+                report[label] = {"skipped": str(error)}
+                continue
+
+            seconds, boxes = time_detector(detector, images, batch_size)
+
+            matches = sum(
+                matched_boxes(ref, cand, iou_threshold)
+                for ref, cand in zip(reference, boxes)
+            )
+            detected = sum(len(b) for b in boxes)
+
+            report[label] = {
+                "ms_per_image": 1000 * seconds / len(images),
+                "speedup": reference_seconds / seconds if seconds > 0 else None,
+                "faces": detected,
+                "recall_vs_full_haar": matches / reference_faces if reference_faces else None,
+                "unmatched_detections": detected - matches,
+            }
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare face detector latency and recall")
+    parser.add_argument("--images", required=True, help="Directory of test images")
+    parser.add_argument("--max-sides", default="640,1024,1600", help="Comma-separated detection sizes")
+    parser.add_argument("--detectors", default="haar,mtcnn")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--json", default=None, help="Optional path for the JSON report")
+    args = parser.parse_args()
+
+    report = run(
+        args.images,
+        max_sides=[int(side) for side in args.max_sides.split(",")],
+        detectors=args.detectors.split(","),
+        batch_size=args.batch_size,
+    )
+
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,101 @@
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from functools import partial
+
+from src.experts.frame_sampler import sample_frames, uniform_indices
+from benchmarks.synthetic import write_synthetic_video
+
+
+# =========================================================
+# FRAME SAMPLING BENCHMARK: seek-based vs forward (grab/retrieve)
+# =========================================================
+# Run from the repository root:
+#   python -m benchmarks.bench_frame_sampling --frames 3000 --samples 15
+
+
+# Previous Level4VideoExpert.extract_frames behaviour (one seek per sample)
+def sample_frames_seek(video_path, max_frames=15):
+
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    indices = []
+    frames = []
+
+    for idx in uniform_indices(total_frames, max_frames):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = cap.read()
+
+        if ret:
+            indices.append(idx)
+            frames.append(frame)
+
+    cap.release()
+    return indices, frames
+
+
+def time_sampler(sampler, video_path, max_frames, repeats):
+
+    timings = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        indices, frames = sampler(video_path, max_frames=max_frames)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), indices, frames
+
+
+def run(num_frames=3000, max_frames=15, repeats=3, video_path=None):
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+
+        if video_path is None:
+            video_path = os.path.join(temp_dir, "synthetic.mp4")
+            write_synthetic_video(video_path, num_frames)
+
+        samplers = {
+            "seek_per_frame": sample_frames_seek,
+            "sequential": partial(sample_frames, seek_threshold=None),
+            "auto": sample_frames,
+        }
+
+        report = {"video_frames": num_frames, "requested_samples": max_frames}
+        reference = None
+
+        for name, sampler in samplers.items():
+
+            seconds, indices, frames = time_sampler(sampler, video_path, max_frames, repeats)
+
+            if reference is None:
+                reference = (indices, frames)
+
+            report[name] = {
+                "seconds": seconds,
+                "samples": len(frames),
+                "identical_to_seek": indices == reference[0] and all(
+                    np.array_equal(a, b) for a, b in zip(frames, reference[1])
+                ),
+            }
+
+        return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare seek-based and forward frame sampling")
+    parser.add_argument("--video", default=None, help="Existing video (default: synthetic mp4)")
+    parser.add_argument("--frames", type=int, default=3000, help="Synthetic video length")
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    report = run(args.frames, args.samples, args.repeats, args.video)
+
+    for key, value in report.items():
+        print(f"{key:>20}: {value}")
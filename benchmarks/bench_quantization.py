@@ -0,0 +1,130 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+
+from src.core.ensemble_engine import EnsembleEngine
+from src.core.quantization import quantized_linear_count
+from benchmarks.bench_face_detection import list_images
+from benchmarks.synthetic import synthetic_images
+
+
+# =========================================================
+# INT8 PARITY + LATENCY REPORT
+# =========================================================
+# Compares an fp32 engine with one whose experts are dynamically
+# quantized: per-expert latency, max probability deltas and the
+# verdict agreement rate on a reference image set.
+#   python -m benchmarks.bench_quantization --images data/reference --quantize level2,level3
+# Without --images a synthetic set is used (latency only is meaningful).
+
+
+def best_of(repeats, fn):
+
+    timings = []
+    result = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), result
+
+
+def run(images, quantize=("level2", "level3"), batch_size=8, repeats=3):
+
+    torch.manual_seed(0)
+
+    fp32 = EnsembleEngine(cache=None, lazy=False)
+
+    # Experts that stay fp32 are shared between both engines
+    shared = {name: getattr(fp32, name) for name in ("level1", "level2", "level3") if name not in quantize}
+    int8 = EnsembleEngine(cache=None, lazy=False, quantize=quantize, **shared)
+
+    report = {"images": len(images), "quantized": list(quantize), "experts": {}}
+
+    # --------------------------------------------------
+    # Per-expert latency on identical inputs
+    # --------------------------------------------------
+    sample = images[:batch_size]
+
+    level3_batch = torch.stack([fp32.level3.preprocess(image) for image in sample])
+    face_batch = torch.randn(batch_size, 3, *fp32.level2.input_size)
+
+    inputs = {
+        "level2": lambda engine: engine.level2.predict_tensors(face_batch),
+        "level3": lambda engine: engine.level3.predict_tensors(level3_batch),
+    }
+
+    for name in quantize:
+
+        fp32_seconds, fp32_out = best_of(repeats, lambda: inputs[name](fp32))
+        int8_seconds, int8_out = best_of(repeats, lambda: inputs[name](int8))
+
+        report["experts"][name] = {
+            "quantized_linear_layers": quantized_linear_count(getattr(int8, name).model),
+            "fp32_ms_per_batch": 1000 * fp32_seconds,
+            "int8_ms_per_batch": 1000 * int8_seconds,
+            "speedup": fp32_seconds / int8_seconds if int8_seconds > 0 else None,
+            "max_probability_delta": max(
+                abs(a["fake_probability"] - b["fake_probability"])
+                for a, b in zip(fp32_out, int8_out)
+            ),
+        }
+
+    # --------------------------------------------------
+    # End-to-end parity on the reference set
+    # --------------------------------------------------
+    fp32_seconds, fp32_results = best_of(1, lambda: fp32.analyze_batch(images, batch_size=batch_size))
+    int8_seconds, int8_results = best_of(1, lambda: int8.analyze_batch(images, batch_size=batch_size))
+
+    deltas = [
+        abs(a["final_fake_probability"] - b["final_fake_probability"])
+        for a, b in zip(fp32_results, int8_results)
+    ]
+    flips = [
+        i for i, (a, b) in enumerate(zip(fp32_results, int8_results))
+        if a["verdict"] != b["verdict"]
+    ]
+
+    report["end_to_end"] = {
+        "fp32_images_per_second": len(images) / fp32_seconds,
+        "int8_images_per_second": len(images) / int8_seconds,
+        "speedup": fp32_seconds / int8_seconds if int8_seconds > 0 else None,
+        "max_final_probability_delta": max(deltas),
+        "mean_final_probability_delta": float(np.mean(deltas)),
+        "verdict_agreement_rate": 1.0 - len(flips) / len(images),
+        "verdict_flips": flips,
+    }
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="INT8 vs fp32 parity and latency report")
+    parser.add_argument("--images", default=None, help="Reference image directory")
+    parser.add_argument("--synthetic", type=int, default=32, help="Synthetic images when --images is not given")
+    parser.add_argument("--quantize", default="level2,level3")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", default=None, help="Optional path for the JSON report")
+    args = parser.parse_args()
+
+    images = list_images(args.images) if args.images else synthetic_images(args.synthetic)
+
+    report = run(
+        images,
+        quantize=tuple(args.quantize.split(",")),
+        batch_size=args.batch_size,
+        repeats=args.repeats,
+    )
+
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
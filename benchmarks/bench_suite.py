@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import cv2
+import torch
+
+from src.core.ensemble_engine import EnsembleEngine
+from src.core.image_io import ImagePyramid
+from src.core.inference_backends import INPUT_SHAPES
+from src.core.quantization import validate_quantize
+from src.experts.level1_expert import Level1Expert
+from src.experts.level2_expert import Level2FaceExpert
+from src.experts.level3_expert import Level3SemanticExpert
+from src.experts.level4_video_expert import Level4VideoExpert
+from benchmarks.synthetic import random_checkpoints, synthetic_image, write_synthetic_video
+
+
+# =========================================================
+# ENGINE BENCHMARK SUITE (random weights, synthetic inputs)
+# =========================================================
+# Baseline numbers for every optimisation, no downloads needed:
+#   python -m benchmarks.bench_suite --json bench.json
+#   python -m benchmarks.bench_suite --quick
+#
+# Sections (--sections):
+#   experts     forward latency per batch size + preprocess per resolution
+#   end_to_end  EnsembleEngine.analyze on JPEG files (resolution x faces)
+#   batch       analyze_batch images/s vs one-by-one, with/without cascade
+#   video       Level4VideoExpert frames/s (pipelined, serial, dedup on)
+#
+# Latencies are wall-clock milliseconds over --repeats runs after one
+# warm-up call. Random weights give realistic cost, not realistic
+# verdicts (so the cascade exits early at a data-dependent rate).
+
+SECTIONS = ("experts", "end_to_end", "batch", "video")
+
+QUICK = {
+    "resolutions": "640x480,1920x1080",
+    "faces": "0,2",
+    "batch_sizes": "1,8",
+    "batch_images": 8,
+    "video_frames": 90,
+    "max_frames": 8,
+    "repeats": 2,
+}
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def parse_sizes(spec):
+    return [tuple(int(v) for v in item.split("x")) for item in spec.split(",") if item]
+
+
+def parse_ints(spec):
+    return [int(item) for item in spec.split(",") if item]
+
+
+def measure(fn, repeats=3, warmup=1):
+
+    # Returns (timing summary in ms, result of the last call)
+    result = None
+
+    for _ in range(warmup):
+        result = fn()
+
+    timings = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(1000 * (time.perf_counter() - start))
+
+    return {
+        "runs": len(timings),
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+    }, result
+
+
+def per_second(count, timing):
+    return count / (timing["median_ms"] / 1000) if timing["median_ms"] > 0 else None
+
+
+def git_commit():
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "cuda": torch.cuda.is_available(),
+        "opencv": cv2.__version__,
+    }
+
+
+def write_jpeg(path, image_rgb, quality=90):
+
+    cv2.imwrite(path, cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return path
+
+
+def build_engine(paths, quantize=()):
+
+    experts = {
+        "level1": Level1Expert(paths["level1"]),
+        "level2": Level2FaceExpert(paths["level2"], quantize="level2" in quantize),
+        "level3": Level3SemanticExpert(paths["level3"], quantize="level3" in quantize),
+    }
+
+    return EnsembleEngine(cache=None, **experts)
+
+
+# --------------------------------------------------
+# Sections
+# --------------------------------------------------
+def bench_experts(engine, resolutions, batch_sizes, repeats):
+
+    report = {}
+    generator = torch.Generator().manual_seed(0)
+
+    for name in ("level1", "level2", "level3"):
+
+        expert = getattr(engine, name)
+        forward = {}
+
+        for batch_size in batch_sizes:
+            batch = torch.rand(batch_size, *INPUT_SHAPES[name], generator=generator)
+            timing, _ = measure(lambda: expert.predict_tensors(batch), repeats)
+            forward[str(batch_size)] = {**timing, "items_per_second": per_second(batch_size, timing)}
+
+        preprocess = {}
+
+        for width, height in resolutions:
+            image = synthetic_image(width, height, faces=1)
+
+            # Fresh pyramid per call: nothing is memoised between runs
+            timing, _ = measure(lambda: expert.preprocess(ImagePyramid(image)), repeats)
+            preprocess[f"{width}x{height}"] = timing
+
+        report[name] = {"forward": forward, "preprocess": preprocess}
+
+    return report
+
+
+def bench_end_to_end(engine, work_dir, resolutions, face_counts, repeats):
+
+    rows = []
+
+    for width, height in resolutions:
+        for faces in face_counts:
+
+            path = write_jpeg(
+                os.path.join(work_dir, f"e2e_{width}x{height}_{faces}.jpg"),
+                synthetic_image(width, height, faces=faces, seed=faces)
+            )
+
+            for cascade in (False, True):
+                timing, result = measure(lambda: engine.analyze_image(path, cascade=cascade), repeats)
+
+                rows.append({
+                    "resolution": f"{width}x{height}",
+                    "faces": faces,
+                    "faces_detected": result["level2_details"].get("faces_detected", 0),
+                    "cascade": cascade,
+                    "level3_run": result["level3_details"] is not None,
+                    **timing,
+                })
+
+    return rows
+
+
+def bench_batch(engine, work_dir, resolution, count, batch_size, repeats):
+
+    width, height = resolution
+    paths = [
+        write_jpeg(
+            os.path.join(work_dir, f"batch_{i:03d}.jpg"),
+            synthetic_image(width, height, faces=i % 3, seed=100 + i)
+        )
+        for i in range(count)
+    ]
+
+    report = {"resolution": f"{width}x{height}", "images": count, "batch_size": batch_size}
+
+    timing, _ = measure(lambda: [engine.analyze_image(path) for path in paths], repeats, warmup=0)
+    report["one_by_one"] = {**timing, "images_per_second": per_second(count, timing)}
+
+    for cascade in (False, True):
+        timing, _ = measure(
+            lambda: engine.analyze_batch(paths, batch_size=batch_size, cascade=cascade),
+            repeats,
+            warmup=0
+        )
+        key = "analyze_batch_cascade" if cascade else "analyze_batch"
+        report[key] = {**timing, "images_per_second": per_second(count, timing)}
+
+    return report
+
+
+def bench_video(engine, work_dir, resolution, frames, max_frames, batch_size, repeats):
+
+    width, height = resolution
+    path = os.path.join(work_dir, "synthetic.mp4")
+    write_synthetic_video(path, frames, width=width, height=height, faces=1)
+
+    report = {"resolution": f"{width}x{height}", "video_frames": frames, "max_frames": max_frames}
+
+    # The synthetic clip is mostly static, so opt-in near-duplicate
+    # reuse is measured separately from raw per-frame throughput
+    variants = {
+        "pipelined": {"pipelined": True},
+        "serial": {"pipelined": False},
+        "pipelined_dedup": {"pipelined": True, "dedup_distance": 4},
+    }
+
+    for name, options in variants.items():
+        expert = Level4VideoExpert(engine=engine, batch_size=batch_size, **options)
+        timing, result = measure(lambda: expert.analyze(path, max_frames=max_frames), repeats)
+
+        analyzed = result.get("frames_analyzed", 0)
+        report[name] = {
+            **timing,
+            "frames_analyzed": analyzed,
+            "frames_deduplicated": result.get("frames_deduplicated", 0),
+            "frames_per_second": per_second(analyzed, timing),
+        }
+
+    return report
+
+
+# --------------------------------------------------
+# Runner
+# --------------------------------------------------
+def run(args, work_dir):
+
+    sections = [name for name in args.sections.split(",") if name]
+    unknown = set(sections) - set(SECTIONS)
+
+    if unknown:
+        raise ValueError(f"Unknown sections {sorted(unknown)}. Available: {list(SECTIONS)}")
+
+    quantize = validate_quantize([name for name in args.quantize.split(",") if name])
+    resolutions = parse_sizes(args.resolutions)
+
+    paths = random_checkpoints(args.weights_dir or os.path.join(work_dir, "models"), seed=args.seed)
+    torch.manual_seed(args.seed)
+    engine = build_engine(paths, quantize)
+
+    report = {
+        "environment": environment(),
+        "config": {
+            "sections": sections,
+            "resolutions": args.resolutions,
+            "faces": args.faces,
+            "batch_sizes": args.batch_sizes,
+            "quantize": list(quantize),
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+    }
+
+    if "experts" in sections:
+        print("⏱️ experts...")
+        report["experts"] = bench_experts(engine, resolutions, parse_ints(args.batch_sizes), args.repeats)
+
+    if "end_to_end" in sections:
+        print("⏱️ end_to_end...")
+        report["end_to_end"] = bench_end_to_end(
+            engine, work_dir, resolutions, parse_ints(args.faces), args.repeats
+        )
+
+    if "batch" in sections:
+        print("⏱️ batch...")
+        report["batch"] = bench_batch(
+            engine, work_dir, parse_sizes(args.batch_resolution)[0],
+            args.batch_images, args.batch_size, max(1, args.repeats // 2)
+        )
+
+    if "video" in sections:
+        print("⏱️ video...")
+        report["video"] = bench_video(
+            engine, work_dir, parse_sizes(args.video_resolution)[0],
+            args.video_frames, args.max_frames, args.batch_size, max(1, args.repeats // 2)
+        )
+
+    return report
+
+
+def build_parser():
+
+    parser = argparse.ArgumentParser(description="Engine benchmark suite (random weights, synthetic inputs)")
+    parser.add_argument("--sections", default=",".join(SECTIONS))
+    parser.add_argument("--resolutions", default="640x480,1920x1080,4000x3000")
+    parser.add_argument("--faces", default="0,1,4", help="Face counts for end_to_end")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="Forward batch sizes for experts")
+    parser.add_argument("--batch-resolution", default="1280x720")
+    parser.add_argument("--batch-images", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--video-resolution", default="1280x720")
+    parser.add_argument("--video-frames", type=int, default=300)
+    parser.add_argument("--max-frames", type=int, default=15)
+    parser.add_argument("--quantize", default="", help="INT8 experts, e.g. level2,level3")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weights-dir", default=None, help="Keep the random checkpoints here between runs")
+    parser.add_argument("--quick", action="store_true", help="Small inputs for a fast smoke run")
+    parser.add_argument("--json", default=None, help="Optional path for the JSON report")
+    return parser
+
+
+if __name__ == "__main__":
+
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.quick:
+        parser.set_defaults(**QUICK)
+        args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="authenticity-bench-") as work_dir:
+        report = run(args, work_dir)
+
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,185 @@
+import os
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+from torchvision import models
+
+from src.experts.level1_expert import HybridLevel1
+
+
+# =========================================================
+# SYNTHETIC INPUTS + RANDOM-WEIGHT CHECKPOINTS
+# =========================================================
+# Everything the benchmarks need without downloads or real data:
+#   random_checkpoints(dir) -> {"level1": path, ...} state dicts with
+#                              the production architectures
+#   synthetic_image(...)    -> RGB uint8 array with N drawn faces that
+#                              the Haar cascade detects
+#   write_synthetic_video() -> mp4v clip with moving faces
+# All generators are seeded, so runs are comparable over time.
+
+CHECKPOINT_NAMES = {
+    "level1": "level1_hybrid.pth",
+    "level2": "level2_face_best.pth",
+    "level3": "level3_semantic_best.pth",
+}
+
+
+# --------------------------------------------------
+# Random-Weight Models
+# --------------------------------------------------
+def build_level2_network():
+
+    # Same architecture as Level2FaceExpert
+    model = models.mobilenet_v2(weights=None)
+    model.classifier[1] = nn.Sequential(
+        nn.Linear(model.last_channel, 512),
+        nn.ReLU(),
+        nn.Dropout(0.3),
+        nn.Linear(512, 2)
+    )
+    return model
+
+
+def build_level3_network():
+
+    # Same architecture as Level3SemanticExpert
+    model = models.vit_b_16(weights=None)
+    model.heads.head = nn.Linear(model.heads.head.in_features, 2)
+    return model
+
+
+NETWORK_BUILDERS = {
+    "level1": HybridLevel1,
+    "level2": build_level2_network,
+    "level3": build_level3_network,
+}
+
+
+def random_checkpoints(directory, seed=0, names=None):
+
+    # Existing files are reused, so a kept directory is only built once
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+
+    for name in names or NETWORK_BUILDERS:
+
+        path = os.path.join(directory, CHECKPOINT_NAMES[name])
+
+        if not os.path.exists(path):
+            torch.manual_seed(seed)
+            torch.save(NETWORK_BUILDERS[name]().state_dict(), path)
+
+        paths[name] = path
+
+    return paths
+
+
+# --------------------------------------------------
+# Synthetic Images
+# --------------------------------------------------
+def draw_face(image, cx, cy, size):
+
+    # Cartoon frontal face (skin oval, eyes, brows, nose, mouth); BGR
+    # colours, drawn in place. Detected by the default Haar cascade
+    # from ~60 px up.
+    cv2.ellipse(image, (cx, cy), (int(size * 0.42), int(size * 0.55)), 0, 0, 360, (150, 170, 200), -1)
+
+    for side in (-1, 1):
+        ex = cx + int(side * size * 0.18)
+        ey = cy - int(size * 0.12)
+        cv2.ellipse(image, (ex, ey), (int(size * 0.09), int(size * 0.045)), 0, 0, 360, (40, 40, 40), -1)
+        cv2.line(
+            image,
+            (ex - int(size * 0.11), ey - int(size * 0.1)),
+            (ex + int(size * 0.11), ey - int(size * 0.1)),
+            (60, 50, 50),
+            max(2, int(size * 0.03))
+        )
+
+    cv2.line(image, (cx, cy - int(size * 0.05)), (cx, cy + int(size * 0.12)), (120, 130, 160), max(2, int(size * 0.03)))
+    cv2.ellipse(image, (cx, cy + int(size * 0.28)), (int(size * 0.14), int(size * 0.04)), 0, 0, 360, (70, 60, 120), -1)
+
+
+def face_layout(width, height, faces):
+
+    # Face centres on a near-square grid, sized to fit their cell
+    if faces == 0:
+        return []
+
+    cols = int(np.ceil(np.sqrt(faces * width / height)))
+    rows = int(np.ceil(faces / cols))
+    size = int(min(width / cols, height / rows) * 0.6)
+
+    return [
+        (int((i % cols + 0.5) * width / cols), int((i // cols + 0.5) * height / rows), size)
+        for i in range(faces)
+    ]
+
+
+def textured_background(width, height, rng):
+
+    # Smooth low-frequency colour field + mild sensor-like noise
+    base = rng.integers(60, 200, (max(2, height // 64), max(2, width // 64), 3), dtype=np.uint8)
+    image = cv2.resize(base, (width, height), interpolation=cv2.INTER_CUBIC)
+    noise = rng.normal(0, 6, image.shape)
+
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_image(width, height, faces=0, seed=0):
+
+    # RGB uint8 (H x W x 3)
+    rng = np.random.default_rng(seed)
+    image = textured_background(width, height, rng)
+
+    for cx, cy, size in face_layout(width, height, faces):
+        draw_face(image, cx, cy, size)
+
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def synthetic_images(count, size=256, seed=0):
+
+    # Blocky noise images (no faces) for quick latency runs
+    rng = np.random.default_rng(seed)
+    images = []
+
+    for _ in range(count):
+        base = rng.integers(0, 255, (size // 8, size // 8, 3), dtype=np.uint8)
+        image = np.kron(base, np.ones((8, 8, 1), dtype=np.uint8))
+        noise = rng.integers(-20, 20, image.shape)
+        images.append(np.clip(image.astype(int) + noise, 0, 255).astype(np.uint8))
+
+    return images
+
+
+# --------------------------------------------------
+# Synthetic Videos
+# --------------------------------------------------
+def write_synthetic_video(path, num_frames, width=640, height=360, fps=30.0, faces=0, seed=0):
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+
+    if not writer.isOpened():
+        raise RuntimeError("OpenCV VideoWriter could not open an mp4v stream")
+
+    rng = np.random.default_rng(seed)
+    background = textured_background(width, height, rng)
+    layout = face_layout(width, height, faces)
+
+    for i in range(num_frames):
+        frame = background.copy()
+
+        # Faces drift slowly so trackers / dedup see realistic motion
+        for cx, cy, size in layout:
+            draw_face(frame, cx + int(8 * np.sin(i / 15.0)), cy, size)
+
+        x = (i * 7) % max(1, width - 60)
+        cv2.rectangle(frame, (x, 10), (x + 60, 50), (0, 255, 0), -1)
+        cv2.putText(frame, str(i), (10, height - 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        writer.write(frame)
+
+    writer.release()
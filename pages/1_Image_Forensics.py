@@ -1,9 +1,7 @@
 import streamlit as st
 from PIL import Image
-import tempfile
-import os
 
-from src.core.ensemble_engine import EnsembleEngine
+from src.core.model_registry import get_registry
 from src.core.explanation_engine import ExplanationEngine
 
 
@@ -23,18 +21,14 @@ if uploaded_file:
     with col_img:
         st.image(image, caption="Uploaded Image", use_container_width=True)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-        image.save(tmp.name)
-        temp_path = tmp.name
-
     if st.button("Run Analysis"):
 
         with st.spinner("Running multi-level forensic evaluation..."):
 
-            engine = EnsembleEngine()
+            engine = get_registry().get_engine()
             explainer = ExplanationEngine()
 
-            result = engine.analyze(temp_path)
+            result = engine.analyze_image(image)
 
         final_ai_pct = result["final_ai_percentage"]
         verdict = result["verdict"]
@@ -170,6 +164,4 @@ if uploaded_file:
 
             st.progress(l3_fake / 100)
             st.write(f"Fake Probability: {l3_fake:.2f}%")
-            st.write(f"Confidence Score: {l3_conf:.2f}%")
-
-    os.remove(temp_path)
\ No newline at end of file
+            st.write(f"Confidence Score: {l3_conf:.2f}%")
\ No newline at end of file
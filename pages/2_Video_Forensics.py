@@ -1,12 +1,10 @@
 import streamlit as st
 import tempfile
 import os
-import cv2
-import shutil
-import uuid
 
-from src.core.ensemble_engine import EnsembleEngine
-from src.core.explanation_engine import ExplanationEngine
+from src.core.model_registry import get_registry
+from src.experts.frame_sampler import VideoOpenError
+from src.experts.level4_video_expert import Level4VideoExpert, NoFramesError
 
 
 st.set_page_config(page_title="Video Forensics", page_icon="🎬", layout="wide")
@@ -29,51 +27,34 @@ if uploaded_video:
 
         with st.spinner("Extracting frames and running forensic analysis..."):
 
-            engine = EnsembleEngine()
-            explainer = ExplanationEngine()
+            engine = get_registry().get_engine()
+            video_expert = Level4VideoExpert(engine=engine)
 
-            cap = cv2.VideoCapture(temp_video_path)
+            # Coarse-to-fine sampling over the whole clip; stops once the
+            # verdict is settled, keeps sampling borderline videos
+            video_result, video_error = None, None
 
-            frame_results = []
-            frame_count = 0
-            max_frames = 20
-
-            # Create temporary folder for frames
-            temp_frame_dir = os.path.join(
-                tempfile.gettempdir(),
-                f"video_frames_{uuid.uuid4().hex}"
-            )
-            os.makedirs(temp_frame_dir, exist_ok=True)
-
-            while cap.isOpened() and frame_count < max_frames:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                frame_path = os.path.join(
-                    temp_frame_dir,
-                    f"frame_{frame_count}.jpg"
+            try:
+                video_result = video_expert.analyze(
+                    temp_video_path,
+                    adaptive=True,
+                    min_frames=4,
+                    max_frames=32
                 )
+            except VideoOpenError:
+                video_error = "The file could not be opened as a video."
+            except NoFramesError:
+                video_error = "No frames could be analyzed."
 
-                cv2.imwrite(frame_path, frame)
-
-                frame_result = engine.analyze(frame_path)
-                frame_results.append(frame_result["final_ai_percentage"])
-
-                frame_count += 1
-
-            cap.release()
-
-            # Clean up frame folder
-            shutil.rmtree(temp_frame_dir)
-
-        if not frame_results:
-            st.error("No frames could be analyzed.")
+        if video_result is None:
+            st.error(video_error)
         else:
 
-            final_ai_pct = sum(frame_results) / len(frame_results)
+            final_ai_pct = video_result["video_ai_percentage"]
+            max_ai_pct = video_result["max_frame_fake_probability"] * 100
+            frames_analyzed = video_result["frames_analyzed"]
 
-            verdict = "AI Generated" if final_ai_pct > 65 else "Authentic"
+            verdict = video_result["verdict"]
 
             st.markdown("---")
             st.subheader("🔎 Final Video Verdict")
@@ -86,16 +67,22 @@ if uploaded_video:
 
             with col2:
                 st.metric("Verdict", verdict)
+                st.caption(f"Peak frame AI probability: {max_ai_pct:.2f}%")
 
-            st.caption(f"Frames analyzed: {len(frame_results)}")
+            st.caption(
+                f"Frames analyzed: {frames_analyzed} "
+                f"({video_result['frames_deduplicated']} near-duplicates reused) "
+                f"• {video_result['stop_reason']}"
+            )
 
             st.markdown("---")
             st.subheader("🧾 System Explanation")
 
             explanation = f"""
-The video was analyzed using {len(frame_results)} extracted frames.
+The video was analyzed using {frames_analyzed} frames sampled across the whole clip.
 
 Average AI probability across frames: {final_ai_pct:.2f}%.
+Highest single-frame AI probability: {max_ai_pct:.2f}%.
 
 Based on multi-frame forensic evaluation, the video is classified as **{verdict.upper()}**.
 """
@@ -1,9 +1,9 @@
 import streamlit as st
-import tempfile
-import os
+import io
 from PIL import Image
 
-from src.core.ensemble_engine import EnsembleEngine
+from src.core.batch_executor import default_workers, physical_cores
+from src.core.model_registry import get_registry
 
 
 st.set_page_config(page_title="Batch Forensics", page_icon="📂", layout="wide")
@@ -19,9 +19,19 @@ uploaded_files = st.file_uploader(
 
 if uploaded_files:
 
+    cores = physical_cores()
+    workers = default_workers()
+
+    use_workers = st.checkbox(
+        f"Use {workers} worker processes ({cores} cores available)",
+        value=False,
+        disabled=workers < 2,
+        help="Each worker keeps its own copy of the models in memory."
+    )
+
     if st.button("Run Batch Analysis"):
 
-        engine = EnsembleEngine()
+        registry = get_registry()
 
         results = []
         ai_count = 0
@@ -31,18 +41,37 @@ if uploaded_files:
 
         with st.spinner("Running forensic analysis..."):
 
-            for file in uploaded_files:
+            if use_workers:
+                payloads = [file.read() for file in uploaded_files]
+                images = [Image.open(io.BytesIO(payload)) for payload in payloads]
+
+                # Results arrive in completion order with their index;
+                # a file that cannot be analyzed is reported and skipped
+                batch_results = [None] * len(payloads)
+                progress = st.progress(0.0)
+
+                executor = registry.get_batch_executor()
 
-                image_bytes = file.read()
-                image = Image.open(file)
+                for done, (index, result, error) in enumerate(executor.map_unordered(payloads), 1):
+                    batch_results[index] = result
+                    progress.progress(done / len(payloads))
 
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-                    tmp.write(image_bytes)
-                    temp_path = tmp.name
+                    if error is not None:
+                        st.warning(f"{uploaded_files[index].name} could not be analyzed.")
 
-                result = engine.analyze(temp_path)
+            else:
+                images = [
+                    Image.open(io.BytesIO(file.read()))
+                    for file in uploaded_files
+                ]
 
-                os.remove(temp_path)
+                # Batched forward passes across all uploads
+                batch_results = registry.get_engine().analyze_batch(images, batch_size=16)
+
+            for file, image, result in zip(uploaded_files, images, batch_results):
+
+                if result is None:
+                    continue
 
                 results.append((file.name, image, result))
 
@@ -57,6 +86,10 @@ if uploaded_files:
                 else:
                     uncertain_count += 1
 
+        if not results:
+            st.error("None of the images could be analyzed.")
+            st.stop()
+
         # ==============================
         # 📊 Batch Summary
         # ==============================
@@ -1,5 +1,8 @@
 import streamlit as st
 
+from src.core.model_registry import get_registry
+from src.core.profiling import format_bytes
+
 st.set_page_config(page_title="System Architecture", page_icon="🧠", layout="wide")
 
 st.title("🧠 Multilevel AI Authenticity Engine")
@@ -148,11 +151,17 @@ The final AI probability is computed using weighted fusion:
 • If face manipulation confidence is very high → Face Override mode  
 • Otherwise → Weighted blending of Level 1, Level 2, and Level 3  
 
-Video decisions are computed using average AI probability across frames.
-
-Final Verdict Threshold (Binary Mode):
-• > 65% → AI Generated  
-• ≤ 65% → Authentic  
+Image Verdict Thresholds:
+• > 70% → AI Generated  
+• < 35% → Authentic  
+• Otherwise → Uncertain  
+
+Video decisions sample frames across the whole clip (coarse-to-fine)
+and stop as soon as the verdict is statistically settled:
+• Any frame > 75% → AI Generated  
+• Average > 60% → Likely AI  
+• Average < 35% → Authentic  
+• Otherwise → Uncertain  
 """)
 
 st.markdown("---")
@@ -179,4 +188,38 @@ Our architecture ensures:
 
 st.markdown("---")
 
-st.success("System Architecture Loaded Successfully.")
\ No newline at end of file
+st.success("System Architecture Loaded Successfully.")
+
+# ==========================
+# RUNTIME MODEL STATUS
+# ==========================
+
+st.header("📦 Runtime Model Status")
+
+st.markdown("""
+Experts are loaded once per server process and shared by every page.
+""")
+
+registry_status = get_registry().status()
+
+for name, info in registry_status["experts"].items():
+
+    if info["loaded"]:
+        st.write(
+            f"**{name}** — {info['class']} on {info['device']} • "
+            f"weights {format_bytes(info['model_bytes'])} • "
+            f"loaded in {info['load_seconds']:.2f}s"
+        )
+    else:
+        st.write(f"**{name}** — not loaded yet")
+
+st.caption(f"Process memory (RSS): {format_bytes(registry_status['process_rss_bytes'])}")
+
+cache_stats = registry_status["cache"]
+
+if cache_stats:
+    st.caption(
+        f"Result cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits • "
+        f"{cache_stats['misses']} misses • {cache_stats['evictions']} evictions • "
+        f"hit rate {cache_stats['hit_rate'] * 100:.1f}%"
+    )
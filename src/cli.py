@@ -0,0 +1,417 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from src.core.batch_executor import ProcessBatchExecutor
+from src.core.inference_backends import parse_backends
+from src.core.stage_timing import dump_stage_histograms
+from src.core.model_registry import get_registry
+
+
+# =========================================================
+# HEADLESS BULK ANALYSIS
+# =========================================================
+#   python -m src.cli analyze data/images "scans/**/*.jpg" manifest.txt -o results.jsonl
+#
+# Inputs may be directories (walked recursively), glob patterns or
+# manifests (.txt: one path per line, .jsonl: {"path": ...} per line).
+# One JSON record is appended per input as soon as it is finished;
+# inputs already present in the output file are skipped, so an
+# interrupted job resumes where it stopped.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+MANIFEST_EXTENSIONS = (".txt", ".lst", ".jsonl")
+
+
+# --------------------------------------------------
+# Input Discovery
+# --------------------------------------------------
+def media_type(path):
+
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in IMAGE_EXTENSIONS:
+        return "image"
+    if extension in VIDEO_EXTENSIONS:
+        return "video"
+
+    return None
+
+
+def read_manifest(path):
+
+    base = os.path.dirname(path)
+
+    with open(path) as f:
+        for line in f:
+
+            line = line.strip()
+
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith("{"):
+                line = json.loads(line)["path"]
+
+            yield line if os.path.isabs(line) else os.path.join(base, line)
+
+
+def expand_inputs(sources):
+
+    # Yields unique media paths in a stable order
+    seen = set()
+
+    for source in sources:
+
+        if os.path.isdir(source):
+            candidates = (
+                os.path.join(root, name)
+                for root, dirs, files in sorted(os.walk(source))
+                for name in sorted(files)
+            )
+        elif os.path.isfile(source) and source.lower().endswith(MANIFEST_EXTENSIONS):
+            candidates = read_manifest(source)
+        elif os.path.isfile(source):
+            candidates = [source]
+        else:
+            candidates = sorted(glob.glob(source, recursive=True))
+
+            if not candidates:
+                raise FileNotFoundError(f"No inputs match '{source}'")
+
+        for path in candidates:
+
+            path = os.path.normpath(path)
+
+            if path not in seen and media_type(path) is not None:
+                seen.add(path)
+                yield path
+
+
+# --------------------------------------------------
+# Resumable JSONL Output
+# --------------------------------------------------
+def load_completed(output_path, retry_errors=False):
+
+    # Paths already recorded; a torn last line (crash mid-write) is cut
+    # off. A later record for a path supersedes earlier ones. With
+    # retry_errors, error records are dropped from the file (their
+    # inputs are re-run and appended again), so every path keeps a
+    # single record. The file is streamed: only path -> (line number of
+    # its latest record, failed) is held in memory.
+    if not os.path.exists(output_path):
+        return set()
+
+    latest = {}
+    offset = 0
+
+    with open(output_path, "rb+") as f:
+
+        for number, line in enumerate(f):
+
+            if not line.endswith(b"\n"):
+                f.truncate(offset)
+                break
+
+            offset += len(line)
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            latest[record["path"]] = (number, "error" in record)
+
+    if retry_errors and any(failed for _, failed in latest.values()):
+        _rewrite_without_errors(output_path, latest)
+
+    return {
+        path for path, (_, failed) in latest.items()
+        if not (retry_errors and failed)
+    }
+
+
+def _rewrite_without_errors(output_path, latest):
+
+    # Streams a copy holding each path's latest record, minus error
+    # records, then swaps it in
+    keep = {number for number, failed in latest.values() if not failed}
+
+    with open(output_path, "rb") as source, open(output_path + ".tmp", "wb") as target:
+        for number, line in enumerate(source):
+            if number in keep:
+                target.write(line)
+
+    os.replace(output_path + ".tmp", output_path)
+
+
+class ProgressLine:
+
+    def __init__(self, total, stream=sys.stderr, interval=0.5):
+
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.stream = stream
+        self.interval = interval
+
+        self._start = time.perf_counter()
+        self._last_print = 0.0
+
+    def update(self, count=1, errors=0):
+
+        self.done += count
+        self.errors += errors
+
+        now = time.perf_counter()
+
+        if now - self._last_print >= self.interval or self.done >= self.total:
+            self._last_print = now
+            self._print(now - self._start)
+
+    def _print(self, elapsed):
+
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - self.done) / rate if rate > 0 else float("inf")
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining)) if rate > 0 else "--:--:--"
+
+        self.stream.write(
+            f"\r{self.done}/{self.total} done • {rate:.2f} items/s • "
+            f"ETA {eta} • {self.errors} errors"
+        )
+        self.stream.flush()
+
+    def close(self):
+
+        # The final count is already on screen unless the run was cut short
+        if self.done < self.total:
+            self._print(time.perf_counter() - self._start)
+
+        self.stream.write("\n")
+
+
+# --------------------------------------------------
+# Analysis
+# --------------------------------------------------
+def analyze_images(paths, args, registry):
+
+    # Yields (path, result_or_None, error_or_None) as images finish
+    engine = registry.get_engine()
+
+    if args.workers > 1:
+        with ProcessBatchExecutor(
+            workers=args.workers,
+            cache=engine.cache,
+            engine_options={
+                "cascade": args.cascade,
+                "quantize": registry.quantize,
+                "backends": registry.backends,
+                "decode_max_side": args.decode_max_side,
+                "level1_tiling": level1_tiling(args),
+                "timings": args.timings,
+            }
+        ) as executor:
+            yield from _executor_images(paths, executor)
+        return
+
+    for start in range(0, len(paths), args.batch_size):
+        chunk = paths[start:start + args.batch_size]
+        yield from _guarded_chunk(
+            chunk,
+            lambda items: engine.analyze_batch(items, batch_size=args.batch_size, cascade=args.cascade)
+        )
+
+
+def _executor_images(paths, executor):
+
+    # Completion order, one record per finished image; files that fail
+    # come back as per-image error records from the workers
+    for index, result, error in executor.map_unordered(paths):
+        yield paths[index], result, error
+
+
+def _guarded_chunk(chunk, run):
+
+    # A bad file fails its batch; retry one by one to isolate it
+    try:
+        for path, result in zip(chunk, run(chunk)):
+            yield path, result, None
+        return
+    except Exception as error:
+        if len(chunk) == 1:
+            yield chunk[0], None, f"{type(error).__name__}: {error}"
+            return
+
+    for path in chunk:
+        try:
+            yield path, run([path])[0], None
+        except Exception as error:
+            yield path, None, f"{type(error).__name__}: {error}"
+
+
+def analyze_videos(paths, args, registry):
+
+    if not paths:
+        return
+
+    from src.experts.level4_video_expert import Level4VideoExpert
+
+    expert = Level4VideoExpert(engine=registry.get_engine(), batch_size=args.batch_size)
+
+    for path in paths:
+        try:
+            result = expert.analyze(
+                path,
+                max_frames=args.max_frames,
+                adaptive=args.adaptive,
+                min_frames=args.min_frames
+            )
+            yield path, result, None
+        except Exception as error:
+            yield path, None, f"{type(error).__name__}: {error}"
+
+
+def level1_tiling(args):
+
+    if args.level1_tiles is None:
+        return None
+
+    return {
+        "sampling": args.level1_tiles,
+        "max_patches": args.level1_patches,
+        "aggregate": args.level1_aggregate,
+    }
+
+
+def run_analyze(args):
+
+    paths = list(expand_inputs(args.inputs))
+    completed = load_completed(args.output, retry_errors=args.retry_errors)
+    pending = [path for path in paths if path not in completed]
+
+    print(
+        f"📂 {len(paths)} inputs, {len(paths) - len(pending)} already in {args.output}, "
+        f"{len(pending)} to analyze",
+        file=sys.stderr
+    )
+
+    if not pending:
+        return 0
+
+    registry = get_registry()
+
+    if args.quantize is not None:
+        registry.set_quantize([name for name in args.quantize.split(",") if name])
+
+    if args.backends is not None:
+        registry.set_backends(parse_backends(args.backends))
+
+    if args.no_cache:
+        registry.get_engine().cache = None
+
+    if args.decode_max_side is not None:
+        registry.get_engine().set_decode_max_side(args.decode_max_side)
+
+    if args.level1_tiles is not None:
+        registry.get_engine().set_level1_tiling(level1_tiling(args))
+
+    # Histograms are only fed while spans are being measured
+    args.timings = args.timings or bool(args.timings_out)
+
+    if args.timings:
+        registry.get_engine().timings = True
+
+    images = [path for path in pending if media_type(path) == "image"]
+    videos = [path for path in pending if media_type(path) == "video"]
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    progress = ProgressLine(len(pending))
+
+    with open(args.output, "a") as out:
+
+        for kind, stream in (
+            ("image", analyze_images(images, args, registry)),
+            ("video", analyze_videos(videos, args, registry)),
+        ):
+            for path, result, error in stream:
+
+                record = {"path": path, "type": kind}
+
+                if error is None:
+                    record["result"] = result
+                else:
+                    record["error"] = error
+
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+                progress.update(errors=int(error is not None))
+
+    progress.close()
+
+    if args.timings_out:
+        dump_stage_histograms(args.timings_out)
+        print(f"⏱️ Stage histograms written to {args.timings_out}", file=sys.stderr)
+
+    return 1 if progress.errors else 0
+
+
+# --------------------------------------------------
+# Entry Point
+# --------------------------------------------------
+def build_parser():
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Multilevel AI Authenticity Engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="Analyze images and videos into a JSONL file")
+    analyze.add_argument("inputs", nargs="+", help="Directories, glob patterns or manifest files")
+    analyze.add_argument("-o", "--output", default="results.jsonl")
+    analyze.add_argument("--batch-size", type=int, default=16)
+    analyze.add_argument("--workers", type=int, default=1, help="Worker processes for images")
+    analyze.add_argument("--cascade", action="store_true", help="Skip Level 3 when the verdict is already fixed")
+    analyze.add_argument("--max-frames", type=int, default=15)
+    analyze.add_argument("--min-frames", type=int, default=4)
+    analyze.add_argument("--adaptive", action="store_true", help="Adaptive video sampling")
+    analyze.add_argument("--quantize", default=None, help="INT8 experts, e.g. level2,level3")
+    analyze.add_argument("--backends", default=None, help="e.g. level1=torchscript,level3=onnxruntime")
+    analyze.add_argument(
+        "--decode-max-side", type=int, default=None,
+        help="Decode JPEGs at reduced size (>= N px long side); faster, results may differ"
+    )
+    analyze.add_argument(
+        "--level1-tiles", choices=["grid", "saliency"], default=None,
+        help="Score native-resolution 32x32 patches instead of one downscaled image"
+    )
+    analyze.add_argument("--level1-patches", type=int, default=64, help="Max patches per image (tiled Level 1)")
+    analyze.add_argument("--level1-aggregate", choices=["mean", "max", "topk"], default="mean")
+    analyze.add_argument("--timings", action="store_true", help="Add per-stage timings to every record")
+    analyze.add_argument(
+        "--timings-out", default=None,
+        help="Write stage latency histograms here (.prom = Prometheus text, else JSON); implies --timings"
+    )
+    analyze.add_argument("--no-cache", action="store_true", help="Do not use the result cache")
+    analyze.add_argument("--retry-errors", action="store_true", help="Re-run inputs recorded with an error")
+
+    return parser
+
+
+def main(argv=None):
+
+    args = build_parser().parse_args(argv)
+
+    if args.command == "analyze":
+        return run_analyze(args)
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import torch
+
+from src.core.ensemble_engine import EnsembleEngine
+from src.core.stage_timing import record_timings
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# =========================================================
+# MULTI-PROCESS BATCH EXECUTOR
+# =========================================================
+# Each worker process builds one EnsembleEngine at start-up and keeps
+# its experts resident for the lifetime of the pool. Work is shipped
+# as chunks of (index, image) and runs through analyze_batch, so every
+# worker still gets batched forward passes. Workers are pinned to
+# threads_per_worker intra-op threads so the pool does not
+# oversubscribe the cores.
+#
+# Results are yielded in completion order as (index, result, error).
+# A file that fails to decode or analyze gets an error string instead
+# of a result; it never fails the rest of its chunk. If a worker dies
+# (BrokenProcessPool) the pool is restarted and the lost chunks are
+# resubmitted; a chunk that breaks it again is re-run one image at a
+# time in a private worker, and only an image that kills that worker
+# gets an error record.
+
+# Resubmissions of a chunk to the shared pool after a crash
+MAX_CHUNK_RETRIES = 1
+
+def physical_cores():
+
+    if psutil is not None:
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+
+    return os.cpu_count() or 1
+
+
+# Default pool size: one worker per physical core, as long as every
+# worker's full set of models fits in available memory
+WORKER_MEMORY_BYTES = 1536 * 1024 ** 2
+
+
+def available_memory_bytes():
+
+    if psutil is not None:
+        return psutil.virtual_memory().available
+
+    # Linux without psutil
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return None
+
+
+def default_workers():
+
+    workers = physical_cores()
+    available = available_memory_bytes()
+
+    if available is not None:
+        workers = min(workers, available // WORKER_MEMORY_BYTES)
+
+    return max(1, int(workers))
+
+
+_worker_engine = None
+
+
+def _init_worker(threads, engine_options):
+
+    global _worker_engine
+
+    torch.set_num_threads(threads)
+
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already fixed once parallel work has started
+        pass
+
+    # Result caching is done once, in the parent process
+    _worker_engine = EnsembleEngine(lazy=False, cache=None, **engine_options)
+
+
+def _error_message(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def _analyze_chunk(chunk, batch_size):
+
+    # Returns [(index, result, error)]. A bad file fails the batched
+    # call; the chunk is then re-run one image at a time in this worker
+    # so only that image gets an error record.
+    try:
+        results = _worker_engine.analyze_batch([image for _, image in chunk], batch_size=batch_size)
+        return [(index, result, None) for (index, _), result in zip(chunk, results)]
+    except Exception as error:
+        if len(chunk) == 1:
+            return [(chunk[0][0], None, _error_message(error))]
+
+    records = []
+
+    for index, image in chunk:
+        try:
+            records.append((index, _worker_engine.analyze_image(image), None))
+        except Exception as error:
+            records.append((index, None, _error_message(error)))
+
+    return records
+
+
+class ProcessBatchExecutor:
+
+    def __init__(
+        self,
+        workers=None,
+        threads_per_worker=None,
+        chunk_size=8,
+        max_pending=None,
+        cache=None,
+        engine_options=None
+    ):
+
+        cores = physical_cores()
+
+        self.workers = workers or default_workers()
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        self.chunk_size = chunk_size
+
+        # Chunks in flight; bounds memory when the input is a long iterator
+        self.max_pending = max_pending or 2 * self.workers
+
+        if self.workers < 1 or self.chunk_size < 1 or self.max_pending < 1:
+            raise ValueError("workers, chunk_size and max_pending must be >= 1")
+
+        self.engine_options = dict(engine_options or {})
+
+        # Parent-side engine only derives cache keys; it never loads models
+        self.cache = cache
+        self._key_engine = (
+            EnsembleEngine(cache=cache, **self.engine_options)
+            if cache is not None else None
+        )
+
+        self.pool_restarts = 0
+        self._pool = self._new_pool()
+
+        print(
+            f"🧵 Batch executor: {self.workers} workers x "
+            f"{self.threads_per_worker} threads"
+        )
+
+    def _new_pool(self, workers=None):
+
+        # spawn: forking a process that already runs torch threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=workers or self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, self.engine_options)
+        )
+
+    # --------------------------------------------------
+    # Streaming Map
+    # --------------------------------------------------
+    def map_unordered(self, images):
+
+        pending = set()
+        chunk = []
+
+        for index, image in enumerate(images):
+
+            key = cached = None
+
+            # Reading an upload or hashing a path for the cache key can
+            # fail (missing or unreadable file): that input gets an error
+            # record, the rest of the run continues
+            try:
+                # File-like uploads cannot be pickled: ship their bytes
+                if hasattr(image, "read"):
+                    image = image.read()
+
+                if self._key_engine is not None:
+                    key, image, cached = self._key_engine.cache_lookup(image)
+
+            except Exception as error:
+                yield index, None, _error_message(error)
+                continue
+
+            if cached is not None:
+                yield index, cached, None
+                continue
+
+            chunk.append((index, image, key))
+
+            if len(chunk) >= self.chunk_size:
+                pending.add(self._submit(chunk))
+                chunk = []
+
+            while len(pending) >= self.max_pending:
+                pending = yield from self._collect(pending)
+
+        if chunk:
+            pending.add(self._submit(chunk))
+
+        while pending:
+            pending = yield from self._collect(pending)
+
+    def map(self, images):
+
+        # Input order, for callers that need the full list; raises on
+        # the first image that could not be analyzed
+        records = {index: (result, error) for index, result, error in self.map_unordered(images)}
+        results = []
+
+        for index in range(len(records)):
+
+            result, error = records[index]
+
+            if error is not None:
+                raise RuntimeError(f"Image {index} could not be analyzed: {error}")
+
+            results.append(result)
+
+        return results
+
+    def _submit(self, chunk, attempts=0):
+
+        future = self._pool.submit(
+            _analyze_chunk,
+            [(index, image) for index, image, _ in chunk],
+            self.chunk_size
+        )
+        future.chunk = chunk
+        future.attempts = attempts
+        future.pool = self._pool
+
+        return future
+
+    def _resubmit(self, future):
+
+        # The pool died under this chunk: restart it once per crash
+        # (every in-flight future of the dead pool lands here)
+        if future.pool is self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+            self.pool_restarts += 1
+
+        if future.attempts < MAX_CHUNK_RETRIES:
+            return [self._submit(future.chunk, future.attempts + 1)], []
+
+        return [], self._run_isolated(future.chunk)
+
+    def _run_isolated(self, chunk):
+
+        # One image at a time in a private single-worker pool, so an
+        # image that kills its worker cannot take other images with it
+        records = []
+        pool = None
+
+        for index, image, _ in chunk:
+
+            if pool is None:
+                pool = self._new_pool(workers=1)
+
+            try:
+                records.extend(pool.submit(_analyze_chunk, [(index, image)], 1).result())
+            except BrokenProcessPool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = None
+                records.append((index, None, "BrokenProcessPool: worker process died"))
+
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+        return records
+
+    def _collect(self, pending):
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        for future in done:
+
+            try:
+                records = future.result()
+            except BrokenProcessPool:
+                resubmitted, records = self._resubmit(future)
+                pending.update(resubmitted)
+
+            # Worker stage timings (engine timings=True) feed this
+            # process's histograms once per worker batch, as per-span
+            # means (see record_timings)
+            batch_timings = {
+                id(result["timings"]): result["timings"]
+                for _, result, _ in records if result is not None and "timings" in result
+            }
+
+            for timings in batch_timings.values():
+                record_timings(timings)
+
+            keys = {index: key for index, _, key in future.chunk}
+
+            for index, result, error in records:
+
+                key = keys[index]
+
+                if key is not None and error is None:
+                    self.cache.put(key, {name: value for name, value in result.items() if name != "timings"})
+
+                yield index, result, error
+
+        return pending
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,38 +1,541 @@
+import itertools
+import threading
+from functools import partial
+
 import torch
 
-from src.experts.level1_expert import Level1Expert
-from src.experts.level2_expert import Level2FaceExpert
+from src.core.image_io import ImagePyramid
+from src.core.inference_backends import validate_backends
+from src.core.profiling import timed_load
+from src.core.quantization import validate_quantize
+from src.core.result_cache import config_fingerprint, content_digest, file_fingerprint
+from src.core.stage_timing import span, timing_scope
+from src.experts.face_detectors import HaarFaceDetector
+from src.experts.level1_expert import Level1Expert, validate_tiling
+from src.experts.level2_expert import FACE_BATCH_SIZE, MAX_FACES, Level2FaceExpert
 from src.experts.level3_expert import Level3SemanticExpert
 
 
+EXPERT_FACTORIES = {
+    "level1": Level1Expert,
+    "level2": Level2FaceExpert,
+    "level3": Level3SemanticExpert,
+}
+
+# Default checkpoint of each expert (used for the cache fingerprint
+# before an expert has been loaded)
+MODEL_PATHS = {
+    "level1": "models/level1/level1_hybrid.pth",
+    "level2": "models/level2/level2_face_best.pth",
+    "level3": "models/level3/level3_semantic_best.pth",
+}
+
+
+_default_detector_instance = None
+
+
+def _default_detector():
+
+    # Settings of the detector Level 2 builds by default, for engines
+    # whose Level 2 is not loaded yet (built once per process)
+    global _default_detector_instance
+
+    if _default_detector_instance is None:
+        _default_detector_instance = HaarFaceDetector()
+
+    return _default_detector_instance
+
+
 class EnsembleEngine:
 
-    def __init__(self):
+    # Option C fusion thresholds
+    FACE_OVERRIDE_THRESHOLD = 0.80
+    FACE_WEIGHTS = {"level1": 0.2, "level2": 0.5, "level3": 0.3}
+    NO_FACE_WEIGHTS = {"level1": 0.5, "level3": 0.5}
+    AI_THRESHOLD = 0.70
+    AUTHENTIC_THRESHOLD = 0.35
+
+    def __init__(
+        self,
+        level1=None,
+        level2=None,
+        level3=None,
+        loader=None,
+        lazy=True,
+        cascade=False,
+        cascade_bands=None,
+        cache=None,
+        quantize=None,
+        backends=None,
+        decode_max_side=None,
+        level1_tiling=None,
+        timings=False
+    ):
 
         print("🔧 Initializing Ensemble Engine...")
 
-        self.level1 = Level1Expert()
-        self.level2 = Level2FaceExpert()
-        self.level3 = Level3SemanticExpert()
+        # Pre-loaded experts are reused as-is; the rest are materialised
+        # on first use through `loader(name)` (e.g. the model registry)
+        # or, by default, by constructing the expert class directly.
+        self._experts = {
+            name: expert
+            for name, expert in (("level1", level1), ("level2", level2), ("level3", level3))
+            if expert is not None
+        }
+        self._loader = loader
+        self._load_lock = threading.Lock()
+        self.load_stats = {}
+
+        # Experts built here with INT8 dynamic quantization, e.g.
+        # ("level3",). Ignored for injected / loader-provided experts.
+        self.quantize = validate_quantize(quantize)
+
+        # Per-expert inference backend, e.g. {"level3": "onnxruntime"}
+        self.backends = validate_backends(backends)
+
+        # Cascade mode: decide from Level 1 + Level 2 when possible and
+        # skip the Level 3 ViT pass. cascade_bands optionally adds lossy
+        # early exits on the partial (L1 + L2) score, e.g.
+        # {"authentic_below": 0.15, "ai_above": 0.90}
+        self.cascade = cascade
+        self.cascade_bands = self._validate_bands(cascade_bands or {})
+
+        # Opt-in reduced-size JPEG decoding (see image_io.load_rgb_image).
+        # None decodes at full resolution.
+        self.decode_max_side = decode_max_side
+
+        # Opt-in tiled Level 1 (native-resolution patches), e.g.
+        # {"sampling": "saliency", "aggregate": "topk"}; see level1_expert
+        self.level1_tiling = validate_tiling(level1_tiling)
+
+        # Per-stage timing spans: results get a "timings" key and the
+        # process-level stage histograms are fed (see stage_timing)
+        self.timings = timings
+
+        # Optional ResultCache keyed by image content + engine fingerprint
+        self.cache = cache
+
+        if not lazy:
+            self.preload()
 
         print("✅ Ensemble Engine Ready\n")
 
+    # =========================================================
+    # LAZY EXPERT LOADING
+    # =========================================================
+
+    @property
+    def level1(self):
+        return self._get_expert("level1")
+
+    @property
+    def level2(self):
+        return self._get_expert("level2")
+
+    @property
+    def level3(self):
+        return self._get_expert("level3")
+
+    def _get_expert(self, name):
+
+        expert = self._experts.get(name)
+
+        if expert is None:
+
+            with self._load_lock:
+
+                if name not in self._experts:
+
+                    if self._loader is not None:
+                        self._experts[name] = self._loader(name)
+                    else:
+                        factory = EXPERT_FACTORIES[name]
+
+                        if name in self.quantize:
+                            factory = partial(factory, quantize=True)
+
+                        if name in self.backends:
+                            factory = partial(factory, backend=self.backends[name])
+
+                        expert, stats = timed_load(name, factory)
+                        self._experts[name] = expert
+                        self.load_stats[name] = stats
+
+            expert = self._experts[name]
+
+        return expert
+
+    def preload(self, names=None):
+
+        # Explicit warm-up for latency-sensitive deployments
+        for name in names or EXPERT_FACTORIES:
+            self._get_expert(name)
+
+    def loaded_experts(self):
+        return sorted(self._experts)
+
     # =========================================================
     # OPTION C LOGIC IMPLEMENTATION
     # =========================================================
 
+    def decode(self, image):
+
+        # One decode per image; every expert reads from the same pyramid
+        with span("decode"):
+            return ImagePyramid(image, self.decode_max_side)
+
+    def set_decode_max_side(self, decode_max_side):
+
+        self.decode_max_side = decode_max_side
+
+    def set_level1_tiling(self, level1_tiling):
+
+        self.level1_tiling = validate_tiling(level1_tiling)
+
     def analyze(self, image_path):
+        return self.analyze_image(image_path)
+
+    def analyze_image(self, image, cascade=None):
+
+        with timing_scope("analyze_image", self.timings) as timings:
+            result = self._analyze_image(image, cascade)
+
+        # Added after caching: cached results never carry stale timings
+        if timings is not None:
+            result = dict(result, timings=timings.summary())
+
+        return result
+
+    def _analyze_image(self, image, cascade):
+
+        use_cascade = self.cascade if cascade is None else cascade
+
+        if self.cache is None:
+            return self._analyze_decoded(self.decode(image), use_cascade)
+
+        with span("cache"):
+            key, image = self._cache_key(image, use_cascade)
+            result = self.cache.get(key)
+
+        if result is None:
+            result = self._analyze_decoded(self.decode(image), use_cascade)
+            self.cache.put(key, result)
+
+        return result
+
+    def _analyze_decoded(self, image, use_cascade):
+
+        # The same decoded pyramid is handed to every expert
+        l1_result = self.level1.predict(image, self.level1_tiling)
+        l2_result = self.level2.predict(image)
+
+        if use_cascade:
+            with span("fusion"):
+                early_result = self._early_exit(l1_result, l2_result)
+
+            if early_result is not None:
+                return early_result
+
+        l3_result = self.level3.predict(image)
+
+        with span("fusion"):
+            return self._fuse(l1_result, l2_result, l3_result)
+
+    # =========================================================
+    # BATCHED ANALYSIS
+    # =========================================================
+    # Level 1 and Level 3 inputs are stacked into real batches and
+    # every face detected in a chunk goes through one Level 2 pass.
+    # Fusion is applied per item, so results match analyze_image().
+
+    def analyze_batch(self, images, batch_size=16, cascade=None):
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        with timing_scope("analyze_batch", self.timings) as timings:
+            results = self._analyze_batch(images, batch_size, cascade)
+
+        # Every result of the call shares the call's timings
+        if timings is not None:
+            summary = timings.summary(items=len(results))
+            results = [dict(result, timings=summary) for result in results]
+
+        return results
+
+    def _analyze_batch(self, images, batch_size, cascade):
+
+        use_cascade = self.cascade if cascade is None else cascade
+
+        images = iter(images)
+        results = []
+
+        while True:
+
+            chunk = list(itertools.islice(images, batch_size))
+
+            if not chunk:
+                break
+
+            chunk_results = [None] * len(chunk)
+            keys = [None] * len(chunk)
+
+            if self.cache is not None:
+                with span("cache"):
+                    for i, image in enumerate(chunk):
+                        keys[i], chunk[i] = self._cache_key(image, use_cascade)
+                        chunk_results[i] = self.cache.get(keys[i])
+
+            # Only cache misses go through the experts
+            misses = [i for i, result in enumerate(chunk_results) if result is None]
+
+            if misses:
+                decoded = [self.decode(chunk[i]) for i in misses]
+
+                for i, result in zip(misses, self._analyze_decoded_batch(decoded, use_cascade)):
+                    chunk_results[i] = result
+
+                    if self.cache is not None:
+                        self.cache.put(keys[i], result)
+
+            results.extend(chunk_results)
+
+        return results
+
+    def _analyze_decoded_batch(self, images, use_cascade):
+
+        l1_results = self.level1.predict_batch(images, self.level1_tiling)
+        l2_results = self.level2.predict_batch(images)
+
+        return self._complete_batch(
+            l1_results,
+            l2_results,
+            use_cascade,
+            lambda pending: self.level3.predict_batch([images[i] for i in pending])
+        )
+
+    def _complete_batch(self, l1_results, l2_results, use_cascade, run_level3):
+
+        results = [None] * len(l1_results)
+
+        if use_cascade:
+            with span("fusion"):
+                results = [
+                    self._early_exit(l1_result, l2_result)
+                    for l1_result, l2_result in zip(l1_results, l2_results)
+                ]
+
+        # Level 3 only for the items that are still undecided
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if pending:
+            l3_results = run_level3(pending)
+
+            with span("fusion"):
+                for i, l3_result in zip(pending, l3_results):
+                    results[i] = self._fuse(l1_results[i], l2_results[i], l3_result)
+
+        return results
+
+    # =========================================================
+    # PREPARED INPUTS (pipelined callers)
+    # =========================================================
+    # prepare() does all CPU-side preprocessing for one image so it
+    # can run in a separate stage; analyze_prepared() runs the
+    # batched forward passes + fusion on a list of prepared items.
+
+    def prepare(self, image, face_boxes=None):
+
+        # face_boxes: optional [(x, y, w, h)] that replace Level 2 face
+        # detection (video face tracking)
+        image = self.decode(image)
+
+        if face_boxes is None:
+            level2_input = self.level2.preprocess(image)
+        else:
+            level2_input = self.level2.preprocess_boxes(image, face_boxes)
+
+        return {
+            "level1": self.level1.preprocess(image, self.level1_tiling),
+            "level2": level2_input,
+            "level3": self.level3.preprocess(image),
+        }
+
+    def analyze_prepared(self, prepared, cascade=None):
+
+        use_cascade = self.cascade if cascade is None else cascade
+
+        l1_results = self.level1.predict_prepared(
+            [item["level1"] for item in prepared],
+            self.level1_tiling
+        )
+        l2_results = self.level2.predict_prepared([item["level2"] for item in prepared])
+
+        return self._complete_batch(
+            l1_results,
+            l2_results,
+            use_cascade,
+            lambda pending: self.level3.predict_tensors(
+                torch.stack([prepared[i]["level3"] for i in pending])
+            )
+        )
+
+    # =========================================================
+    # RESULT CACHE KEYS
+    # =========================================================
+
+    def fingerprint(self):
+
+        # Weights + every option that changes outputs: any change
+        # invalidates cached results. Rebuilt on each call from the live
+        # configuration (experts loaded later, setters, registry
+        # reconfiguration), so it can never go stale; weight digests
+        # are memoised per file.
+        weights = {}
+        quantized = []
+        backends = {}
+
+        for name in EXPERT_FACTORIES:
+            expert = self._experts.get(name)
+            path = getattr(expert, "model_path", MODEL_PATHS[name])
+            weights[name] = file_fingerprint(path)
+
+            if getattr(expert, "quantize", name in self.quantize):
+                quantized.append(name)
+
+            backends[name] = getattr(expert, "backend", self.backends.get(name, "eager"))
+
+        # Face boxes (and so Level 2 scores) depend on the detector and
+        # on how many faces are kept / scored per pass
+        level2 = self._experts.get("level2")
+        detector = getattr(level2, "detector", None) or _default_detector()
+
+        return config_fingerprint({
+            "weights": weights,
+            "quantized": quantized,
+            "backends": backends,
+            "face_detector": (
+                detector.describe() if hasattr(detector, "describe")
+                else type(detector).__name__
+            ),
+            "level2": {
+                "max_faces": getattr(level2, "max_faces", MAX_FACES),
+                "face_batch_size": getattr(level2, "face_batch_size", FACE_BATCH_SIZE),
+            },
+            "face_override": self.FACE_OVERRIDE_THRESHOLD,
+            "face_weights": self.FACE_WEIGHTS,
+            "no_face_weights": self.NO_FACE_WEIGHTS,
+            "ai_threshold": self.AI_THRESHOLD,
+            "authentic_threshold": self.AUTHENTIC_THRESHOLD,
+            "cascade_bands": self.cascade_bands,
+            "decode_max_side": self.decode_max_side,
+            "level1_tiling": self.level1_tiling,
+        })
+
+    def _cache_key(self, image, use_cascade):
+
+        digest, image = content_digest(image)
+        mode = "cascade" if use_cascade else "full"
+
+        return f"{digest}:{self.fingerprint()}:{mode}", image
+
+    def cache_lookup(self, image, cascade=None):
+
+        # Returns (key, image, cached_result); key is None without a cache
+        if self.cache is None:
+            return None, image, None
+
+        use_cascade = self.cascade if cascade is None else cascade
+        key, image = self._cache_key(image, use_cascade)
+
+        return key, image, self.cache.get(key)
+
+    # =========================================================
+    # CASCADE / EARLY EXIT
+    # =========================================================
+
+    def _validate_bands(self, bands):
+
+        unknown = set(bands) - {"authentic_below", "ai_above"}
+
+        if unknown:
+            raise ValueError(f"Unknown cascade bands: {sorted(unknown)}")
+
+        # Bands must sit inside the verdict regions they short-circuit to
+        if bands.get("authentic_below", 0.0) >= self.AUTHENTIC_THRESHOLD:
+            raise ValueError("authentic_below must be < AUTHENTIC_THRESHOLD")
+
+        if bands.get("ai_above", 1.0) <= self.AI_THRESHOLD:
+            raise ValueError("ai_above must be > AI_THRESHOLD")
+
+        return dict(bands)
+
+    def _early_exit(self, l1_result, l2_result):
 
-        # -----------------------
-        # Level 1
-        # -----------------------
-        l1_result = self.level1.predict(image_path)
         l1_fake = l1_result["fake_probability"]
+        face_detected = l2_result.get("faces_detected", 0) > 0
 
-        # -----------------------
-        # Level 2
-        # -----------------------
-        l2_result = self.level2.predict(image_path)
+        # Face Override ignores Level 3 entirely: identical result
+        if face_detected and l2_result["max_fake_probability"] > self.FACE_OVERRIDE_THRESHOLD:
+            return self._fuse(
+                l1_result,
+                l2_result,
+                None,
+                skipped={"level3": "Face Override decided the verdict"}
+            )
+
+        weights = self.FACE_WEIGHTS if face_detected else self.NO_FACE_WEIGHTS
+
+        partial_sum = weights["level1"] * l1_fake
+        if face_detected:
+            partial_sum += weights["level2"] * l2_result["max_fake_probability"]
+
+        # Level 3 contributes somewhere in [0, w3]: if the whole interval
+        # falls inside one verdict region, the verdict is already decided
+        lowest = partial_sum
+        highest = partial_sum + weights["level3"]
+
+        # Estimate without Level 3 (remaining weights renormalised)
+        estimate = partial_sum / (1.0 - weights["level3"])
+
+        if lowest > self.AI_THRESHOLD or highest < self.AUTHENTIC_THRESHOLD:
+            reason = "Verdict fixed by Level 1 + Level 2 bounds"
+            decision_mode = "Cascade Early Exit (Bounded)"
+
+        elif estimate < self.cascade_bands.get("authentic_below", float("-inf")):
+            reason = "Partial score below authentic_below band"
+            decision_mode = "Cascade Early Exit (Confidence Band)"
+
+        elif estimate > self.cascade_bands.get("ai_above", float("inf")):
+            reason = "Partial score above ai_above band"
+            decision_mode = "Cascade Early Exit (Confidence Band)"
+
+        else:
+            return None
+
+        result = self._build_result(
+            estimate,
+            decision_mode,
+            l1_result,
+            l2_result,
+            None,
+            skipped={"level3": reason}
+        )
+
+        # final_fake_probability is only an estimate here: the fused
+        # score lies somewhere in final_fake_probability_bounds
+        result["early_exit"] = True
+        result["final_fake_probability_bounds"] = [lowest, highest]
+
+        return result
+
+    # =========================================================
+    # OPTION C FUSION
+    # =========================================================
+
+    def _fuse(self, l1_result, l2_result, l3_result, skipped=None):
+
+        l1_fake = l1_result["fake_probability"]
 
         face_detected = l2_result.get("faces_detected", 0) > 0
 
@@ -41,46 +544,53 @@ class EnsembleEngine:
         else:
             l2_fake = None
 
-        # -----------------------
-        # Level 3
-        # -----------------------
-        l3_result = self.level3.predict(image_path)
-        l3_fake = l3_result["fake_probability"]
-
         # =========================================================
         # AGGREGATION (OPTION C)
         # =========================================================
 
-        if face_detected:
+        if face_detected and l2_fake > self.FACE_OVERRIDE_THRESHOLD:
 
             # Strong facial manipulation override
-            if l2_fake > 0.80:
-                final_fake = l2_fake
-                decision_mode = "Face Override"
-
-            else:
-                final_fake = (
-                    0.2 * l1_fake +
-                    0.5 * l2_fake +
-                    0.3 * l3_fake
-                )
-                decision_mode = "Weighted Fusion (Face Present)"
+            final_fake = l2_fake
+            decision_mode = "Face Override"
+
+        elif face_detected:
+
+            final_fake = (
+                self.FACE_WEIGHTS["level1"] * l1_fake +
+                self.FACE_WEIGHTS["level2"] * l2_fake +
+                self.FACE_WEIGHTS["level3"] * l3_result["fake_probability"]
+            )
+            decision_mode = "Weighted Fusion (Face Present)"
 
         else:
             # No face → L1 + L3 only
             final_fake = (
-                0.5 * l1_fake +
-                0.5 * l3_fake
+                self.NO_FACE_WEIGHTS["level1"] * l1_fake +
+                self.NO_FACE_WEIGHTS["level3"] * l3_result["fake_probability"]
             )
             decision_mode = "Weighted Fusion (No Face)"
 
+        return self._build_result(
+            final_fake,
+            decision_mode,
+            l1_result,
+            l2_result,
+            l3_result,
+            skipped=skipped
+        )
+
+    def _build_result(self, final_fake, decision_mode, l1_result, l2_result, l3_result, skipped=None):
+
+        face_detected = l2_result.get("faces_detected", 0) > 0
+
         # =========================================================
         # FINAL VERDICT
         # =========================================================
 
-        if final_fake > 0.70:
+        if final_fake > self.AI_THRESHOLD:
             verdict = "AI Generated"
-        elif final_fake < 0.35:
+        elif final_fake < self.AUTHENTIC_THRESHOLD:
             verdict = "Authentic"
         else:
             verdict = "Uncertain"
@@ -93,9 +603,10 @@ class EnsembleEngine:
             "experts_used": {
                 "level1": True,
                 "level2": face_detected,
-                "level3": True
+                "level3": l3_result is not None
             },
+            "skipped_experts": skipped or {},
             "level1_details": l1_result,
             "level2_details": l2_result,
             "level3_details": l3_result
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,139 @@
+import io
+import math
+import os
+
+import numpy as np
+from PIL import Image
+
+
+# -------------------------------------------------
+# Decode any supported input into one RGB PIL image
+# -------------------------------------------------
+# Accepted sources:
+#   • file path (str / os.PathLike)
+#   • raw encoded bytes (bytes / bytearray / memoryview)
+#   • binary file-like object (e.g. a Streamlit upload)
+#   • PIL.Image.Image
+#   • numpy array (H x W x 3 RGB, H x W x 4 RGBA or H x W gray, uint8)
+#   • ImagePyramid (its decoded image is returned)
+#
+# decode_max_side (opt-in) lets JPEG files decode at a reduced DCT
+# scale (PIL draft) that is still at least that many pixels on the
+# long side. Pixels then differ from a full decode.
+def load_rgb_image(source, decode_max_side=None):
+
+    if isinstance(source, ImagePyramid):
+        return source.image
+
+    if isinstance(source, Image.Image):
+        return source if source.mode == "RGB" else source.convert("RGB")
+
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(_as_uint8(source)).convert("RGB")
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _decode(io.BytesIO(source), decode_max_side)
+
+    if isinstance(source, (str, os.PathLike)):
+        return _decode(source, decode_max_side)
+
+    if hasattr(source, "read"):
+        return _decode(source, decode_max_side)
+
+    raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+
+def _decode(fp, decode_max_side):
+
+    image = Image.open(fp)
+
+    if decode_max_side is not None and image.format == "JPEG":
+
+        scale = decode_max_side / max(image.size)
+
+        # draft() only picks a scale whose output is >= the requested size
+        if scale < 1.0:
+            image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+
+    return image.convert("RGB")
+
+
+def _as_uint8(array):
+
+    if array.ndim not in (2, 3) or (array.ndim == 3 and array.shape[2] not in (3, 4)):
+        raise ValueError(f"Expected an H x W (x 3|4) image array, got shape {array.shape}")
+
+    if array.dtype == np.uint8:
+        return np.ascontiguousarray(array)
+
+    # Float images are assumed to be in [0, 1]
+    if np.issubdtype(array.dtype, np.floating):
+        array = np.clip(array, 0.0, 1.0) * 255.0
+
+    return np.clip(array, 0, 255).astype(np.uint8)
+
+
+# -------------------------------------------------
+# One decoded image shared by every expert
+# -------------------------------------------------
+# Decodes once and memoises the derived inputs the experts need
+# (RGB array for face detection / crops, gray and resized PIL images),
+# so no conversion is repeated. Each view is built from the full
+# decoded image with the same PIL / NumPy calls the experts used
+# before, so expert inputs are bit-identical to the per-expert path.
+class ImagePyramid:
+
+    def __init__(self, source, decode_max_side=None):
+
+        self.image = load_rgb_image(source, decode_max_side)
+
+        # RGB uint8 arrays (video frames) are kept instead of being
+        # converted back from the PIL copy
+        self._array = None
+
+        if (
+            isinstance(source, np.ndarray)
+            and source.dtype == np.uint8
+            and source.ndim == 3
+            and source.shape[2] == 3
+        ):
+            self._array = np.ascontiguousarray(source)
+
+        self._gray = None
+        self._levels = {}
+
+    @property
+    def size(self):
+        return self.image.size
+
+    @property
+    def array(self):
+
+        # H x W x 3 uint8 RGB (treat as read-only)
+        if self._array is None:
+            self._array = np.array(self.image)
+
+        return self._array
+
+    @property
+    def gray(self):
+
+        if self._gray is None:
+            self._gray = self.image.convert("L")
+
+        return self._gray
+
+    def resized(self, size, gray=False):
+
+        # (width, height), bilinear: same as torchvision Resize on PIL
+        key = (tuple(size), gray)
+
+        if key not in self._levels:
+            source = self.gray if gray else self.image
+            self._levels[key] = source.resize(key[0], Image.BILINEAR)
+
+        return self._levels[key]
+
+
+def as_pyramid(source, decode_max_side=None):
+    return source if isinstance(source, ImagePyramid) else ImagePyramid(source, decode_max_side)
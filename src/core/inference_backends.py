@@ -0,0 +1,158 @@
+import os
+import warnings
+
+import torch
+
+
+# =========================================================
+# ALTERNATIVE INFERENCE BACKENDS
+# =========================================================
+# Each expert runs its network through `expert.forward_fn(batch)`:
+#   eager        -> the nn.Module itself (default)
+#   torchscript  -> <EXPORT_DIR>/<expert>.pt      (torch.jit.load)
+#   onnxruntime  -> <EXPORT_DIR>/<expert>.onnx    (needs onnxruntime)
+# Artefacts are produced by `python -m src.core.model_export`.
+#
+# At load time the backend output is compared with eager on fixed
+# random batches of every size in PARITY_BATCH_SIZES (artefacts are
+# served with dynamic batch sizes); if class probabilities differ by
+# more than PARITY_TOLERANCE at any size the expert falls back to eager.
+
+BACKENDS = ("eager", "torchscript", "onnxruntime")
+
+EXPORT_DIR = os.environ.get("AUTHENTICITY_EXPORT_DIR", os.path.join("models", "exported"))
+
+# Per-item input shape of every exported network
+INPUT_SHAPES = {
+    "level1": (1, 32, 32),
+    "level2": (3, 128, 128),
+    "level3": (3, 224, 224),
+}
+
+PARITY_TOLERANCE = 1e-3
+PARITY_BATCH_SIZES = (1, 2, 8)
+
+ARTEFACT_EXTENSIONS = {"torchscript": ".pt", "onnxruntime": ".onnx"}
+
+
+def artefact_path(name, backend, export_dir=None):
+    return os.path.join(export_dir or EXPORT_DIR, name + ARTEFACT_EXTENSIONS[backend])
+
+
+def parse_backends(spec):
+
+    # "level1=torchscript,level3=onnxruntime" -> dict
+    backends = {}
+
+    for item in (spec or "").split(","):
+
+        if not item:
+            continue
+
+        name, _, backend = item.partition("=")
+        backends[name.strip()] = backend.strip()
+
+    return validate_backends(backends)
+
+
+def validate_backends(backends):
+
+    backends = dict(backends or {})
+
+    for name, backend in backends.items():
+
+        if name not in INPUT_SHAPES:
+            raise ValueError(f"Unknown expert '{name}'. Available: {sorted(INPUT_SHAPES)}")
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Available: {list(BACKENDS)}")
+
+    return backends
+
+
+def parity_batch(name, batch_size=2):
+
+    generator = torch.Generator().manual_seed(0)
+    return torch.rand(batch_size, *INPUT_SHAPES[name], generator=generator)
+
+
+# --------------------------------------------------
+# Backend Loading
+# --------------------------------------------------
+def _onnx_runner(path):
+
+    try:
+        import onnxruntime
+    except ImportError as error:
+        raise ImportError(
+            "The 'onnxruntime' backend requires onnxruntime (pip install onnxruntime)"
+        ) from error
+
+    session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+
+    def run(batch):
+        outputs = session.run(None, {input_name: batch.detach().cpu().numpy()})
+        return torch.from_numpy(outputs[0])
+
+    return run
+
+
+def load_backend(name, model, backend="eager", device="cpu", export_dir=None):
+
+    # Returns (forward_fn, backend_used, parity)
+    if backend == "eager":
+        return model, "eager", None
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Available: {list(BACKENDS)}")
+
+    path = artefact_path(name, backend, export_dir)
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No {backend} artefact at {path}; run `python -m src.core.model_export`"
+        )
+
+    if backend == "torchscript":
+        with warnings.catch_warnings():
+            # torch.jit is flagged as deprecated; loading still works
+            warnings.simplefilter("ignore", FutureWarning)
+            runner = torch.jit.load(path, map_location=device)
+
+        runner.eval()
+    else:
+        runner = _onnx_runner(path)
+
+    # ----------------------------
+    # Parity Check vs Eager
+    # ----------------------------
+    deltas = {}
+
+    for batch_size in PARITY_BATCH_SIZES:
+
+        batch = parity_batch(name, batch_size).to(device)
+
+        with torch.no_grad():
+            expected = torch.softmax(model(batch), dim=1).cpu()
+            actual = torch.softmax(runner(batch), dim=1).cpu()
+
+        if actual.shape != expected.shape:
+            deltas[batch_size] = float("inf")
+        else:
+            deltas[batch_size] = (expected - actual).abs().max().item()
+
+    delta = max(deltas.values())
+    parity = {
+        "max_probability_delta": delta,
+        "batch_deltas": deltas,
+        "tolerance": PARITY_TOLERANCE,
+        "passed": delta <= PARITY_TOLERANCE,
+    }
+
+    if not parity["passed"]:
+        print(f"⚠️ {name}: {backend} differs from eager by {delta:.2e}; using eager")
+        return model, "eager", parity
+
+    print(f"⚡ {name}: {backend} backend active (parity delta {delta:.1e})")
+    return runner, backend, parity
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import warnings
+
+import torch
+import torch.nn as nn
+
+from src.core.ensemble_engine import EXPERT_FACTORIES
+from src.core.inference_backends import (
+    EXPORT_DIR,
+    artefact_path,
+    load_backend,
+    parity_batch,
+)
+from src.experts.level1_expert import DFTMagnitude
+
+
+# =========================================================
+# EXPORT EXPERT NETWORKS (TorchScript / ONNX)
+# =========================================================
+#   python -m src.core.model_export --formats torchscript,onnx
+#
+# Writes <out>/<expert>.pt and <out>/<expert>.onnx with a dynamic
+# batch dimension, then reloads every artefact and checks it against
+# the eager model at several batch sizes.
+
+FORMAT_BACKENDS = {"torchscript": "torchscript", "onnx": "onnxruntime"}
+
+
+class Level1ForONNX(nn.Module):
+
+    # HybridLevel1 with compute_fft replaced by the equivalent real
+    # DFT matmuls (ONNX has no complex FFT operator)
+    def __init__(self, model):
+        super(Level1ForONNX, self).__init__()
+        self.model = model
+        self.dft = DFTMagnitude(32, 32)
+
+    def forward(self, x):
+        spatial_feat = self.model.spatial(x)
+        freq_feat = self.model.frequency(self.dft(x))
+        combined = torch.cat((spatial_feat, freq_feat), dim=1)
+        return self.model.classifier(combined)
+
+
+def export_torchscript(name, model, path):
+
+    with warnings.catch_warnings():
+        # Tracer warnings about shape asserts in torchvision models
+        warnings.simplefilter("ignore")
+        traced = torch.jit.trace(model, parity_batch(name), check_trace=False)
+        torch.jit.save(traced, path)
+
+
+def export_onnx(name, model, path):
+
+    if name == "level1":
+        model = Level1ForONNX(model).eval()
+
+    # Export with grad mode on, even when called under no_grad: there
+    # nn.MultiheadAttention takes a fused fast path
+    # (aten::_native_multi_head_attention) that ONNX cannot express
+    with torch.enable_grad(), warnings.catch_warnings():
+        # The legacy (non-dynamo) exporter is deprecated but needs no
+        # onnxscript and handles the torchvision models as-is
+        warnings.simplefilter("ignore", DeprecationWarning)
+
+        torch.onnx.export(
+            model,
+            (parity_batch(name),),
+            path,
+            dynamo=False,
+            opset_version=17,
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        )
+
+
+EXPORTERS = {"torchscript": export_torchscript, "onnx": export_onnx}
+
+
+def export_experts(names=None, formats=("torchscript", "onnx"), out_dir=None):
+
+    out_dir = out_dir or EXPORT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
+    report = {}
+
+    for name in names or EXPERT_FACTORIES:
+
+        # Always export the fp32 eager network, on CPU
+        expert = EXPERT_FACTORIES[name]()
+        model = expert.model.to("cpu").eval()
+
+        for fmt in formats:
+
+            backend = FORMAT_BACKENDS[fmt]
+            path = artefact_path(name, backend, out_dir)
+            entry = report.setdefault(name, {})
+
+            try:
+                EXPORTERS[fmt](name, model, path)
+
+                _, used, parity = load_backend(name, model, backend, "cpu", out_dir)
+
+                entry[fmt] = {
+                    "path": path,
+                    "bytes": os.path.getsize(path),
+                    "parity": parity,
+                    "usable": used == backend,
+                }
+
+            except Exception as error:
+                # e.g. onnx / onnxruntime not installed
+                entry[fmt] = {"path": path, "error": f"{type(error).__name__}: {error}"}
+
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Export expert networks for alternative backends")
+    parser.add_argument("--experts", default=",".join(EXPERT_FACTORIES))
+    parser.add_argument("--formats", default="torchscript,onnx")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    args = parser.parse_args()
+
+    report = export_experts(
+        names=args.experts.split(","),
+        formats=args.formats.split(","),
+        out_dir=args.out,
+    )
+
+    print(json.dumps(report, indent=2))
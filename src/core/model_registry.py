@@ -0,0 +1,213 @@
+import os
+import threading
+from functools import partial
+
+from src.core.batch_executor import ProcessBatchExecutor
+from src.core.ensemble_engine import EXPERT_FACTORIES, EnsembleEngine
+from src.core.profiling import module_nbytes, process_rss_bytes, timed_load
+from src.core.inference_backends import parse_backends, validate_backends
+from src.core.quantization import validate_quantize
+from src.core.result_cache import DEFAULT_CACHE_PATH, ResultCache
+
+
+# =========================================================
+# PROCESS-WIDE MODEL REGISTRY
+# =========================================================
+# Every Streamlit page (and Level4VideoExpert) pulls its experts
+# from here, so each model is loaded from disk once per process
+# and the same warm instances are shared by all callers.
+
+# Comma-separated experts to load INT8-quantized, e.g. "level2,level3"
+DEFAULT_QUANTIZE = os.environ.get("AUTHENTICITY_QUANTIZE", "")
+
+# Per-expert backends, e.g. "level1=torchscript,level3=onnxruntime"
+DEFAULT_BACKENDS = os.environ.get("AUTHENTICITY_BACKENDS", "")
+
+
+class ModelRegistry:
+
+    def __init__(self, factories=None, quantize=None, backends=None):
+
+        self._factories = dict(factories or EXPERT_FACTORIES)
+        self.quantize = validate_quantize(
+            quantize if quantize is not None
+            else [name for name in DEFAULT_QUANTIZE.split(",") if name]
+        )
+        self.backends = (
+            validate_backends(backends) if backends is not None
+            else parse_backends(DEFAULT_BACKENDS)
+        )
+        self._experts = {}
+        self._load_stats = {}
+        self._engine = None
+        self._cache = None
+        self._executor = None
+        self._lock = threading.RLock()
+
+    # --------------------------------------------------
+    # Expert Access
+    # --------------------------------------------------
+    def get_expert(self, name):
+
+        with self._lock:
+
+            if name not in self._experts:
+
+                if name not in self._factories:
+                    raise KeyError(f"Unknown expert '{name}'")
+
+                factory = self._factories[name]
+
+                if name in self.quantize:
+                    factory = partial(factory, quantize=True)
+
+                if name in self.backends:
+                    factory = partial(factory, backend=self.backends[name])
+
+                expert, stats = timed_load(name, factory)
+
+                self._experts[name] = expert
+                self._load_stats[name] = stats
+
+            return self._experts[name]
+
+    def get_engine(self):
+
+        with self._lock:
+
+            if self._engine is None:
+                # Experts are pulled from the registry on first use
+                self._engine = EnsembleEngine(
+                    loader=self.get_expert,
+                    cache=self.get_cache(),
+                    quantize=self.quantize,
+                    backends=self.backends
+                )
+
+            return self._engine
+
+    def get_cache(self):
+
+        # Shared by every page, Level4VideoExpert and batch path.
+        # AUTHENTICITY_CACHE_DB="" keeps the cache in memory only.
+        with self._lock:
+
+            if self._cache is None:
+                self._cache = ResultCache(db_path=DEFAULT_CACHE_PATH or None)
+
+            return self._cache
+
+    def get_batch_executor(self, workers=None):
+
+        # Worker processes (each with resident experts) are kept alive
+        # between batch jobs; a different worker count restarts the pool
+        with self._lock:
+
+            if self._executor is not None and workers and self._executor.workers != workers:
+                self._executor.close()
+                self._executor = None
+
+            if self._executor is None:
+                self._executor = ProcessBatchExecutor(
+                    workers=workers,
+                    cache=self.get_cache(),
+                    engine_options={"quantize": self.quantize, "backends": self.backends}
+                )
+
+            return self._executor
+
+    def set_quantize(self, names):
+
+        # Switching precision drops every loaded model
+        names = validate_quantize(names)
+
+        with self._lock:
+            if names != self.quantize:
+                self.clear()
+                self.quantize = names
+
+    def set_backends(self, backends):
+
+        backends = validate_backends(backends)
+
+        with self._lock:
+            if backends != self.backends:
+                self.clear()
+                self.backends = backends
+
+    def preload(self, names=None):
+
+        for name in names or self._factories:
+            self.get_expert(name)
+
+    def is_loaded(self, name):
+        return name in self._experts
+
+    def loaded_experts(self):
+
+        # Lock-free, for readiness probes
+        return {name: name in self._experts for name in self._factories}
+
+    # --------------------------------------------------
+    # Reporting
+    # --------------------------------------------------
+    def status(self):
+
+        # Lock-free snapshot: get_expert() holds the lock for a whole
+        # model load, and /readyz calls this on the server's IOLoop
+        loaded = dict(self._experts)
+        load_stats = dict(self._load_stats)
+        executor = self._executor
+        cache = self._cache
+
+        experts = {}
+
+        for name in self._factories:
+
+            expert = loaded.get(name)
+
+            if expert is None:
+                experts[name] = {"loaded": False}
+                continue
+
+            model = getattr(expert, "model", None)
+
+            experts[name] = {
+                "loaded": True,
+                "class": type(expert).__name__,
+                "device": str(getattr(expert, "device", "cpu")),
+                "model_bytes": module_nbytes(model) if model is not None else None,
+                "quantized": bool(getattr(expert, "quantize", False)),
+                "backend": getattr(expert, "backend", "eager"),
+                **load_stats.get(name, {}),
+            }
+
+        return {
+            "experts": experts,
+            "engine_ready": self._engine is not None,
+            "batch_workers": executor.workers if executor is not None else 0,
+            "cache": cache.stats() if cache is not None else None,
+            "process_rss_bytes": process_rss_bytes(),
+        }
+
+    def clear(self):
+
+        with self._lock:
+            self._experts.clear()
+            self._load_stats.clear()
+            self._engine = None
+
+            if self._executor is not None:
+                self._executor.close()
+                self._executor = None
+
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
@@ -0,0 +1,188 @@
+import bisect
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# -------------------------------------------------
+# Process Memory (Resident Set Size)
+# -------------------------------------------------
+def process_rss_bytes():
+
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss
+
+    # Linux: current RSS from /proc
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Fallback: peak RSS (KB on Linux, bytes on macOS)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+    return None
+
+
+# -------------------------------------------------
+# Model Memory (parameters + buffers)
+# -------------------------------------------------
+def module_nbytes(module):
+
+    total = 0
+
+    for tensor in list(module.parameters()) + list(module.buffers()):
+        total += tensor.numel() * tensor.element_size()
+
+    # Dynamically quantized Linear layers keep packed int8 weights
+    # outside parameters()
+    for child in module.modules():
+        if hasattr(child, "_packed_params") and callable(getattr(child, "weight", None)):
+            for tensor in (child.weight(), child.bias()):
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+
+    return total
+
+
+def format_bytes(num_bytes):
+
+    if num_bytes is None:
+        return "n/a"
+
+    return f"{num_bytes / (1024 ** 2):.1f} MB"
+
+
+# -------------------------------------------------
+# Timed Model Loading
+# -------------------------------------------------
+def timed_load(name, factory):
+
+    rss_before = process_rss_bytes()
+    start = time.perf_counter()
+
+    obj = factory()
+
+    load_seconds = time.perf_counter() - start
+    rss_after = process_rss_bytes()
+
+    stats = {
+        "load_seconds": load_seconds,
+        "rss_delta_bytes": (
+            rss_after - rss_before
+            if rss_before is not None and rss_after is not None
+            else None
+        ),
+        "rss_after_bytes": rss_after,
+    }
+
+    print(
+        f"⏱️ {name} loaded in {load_seconds:.2f}s "
+        f"(+{format_bytes(stats['rss_delta_bytes'])}, "
+        f"RSS {format_bytes(rss_after)})"
+    )
+
+    return obj, stats
+
+
+# -------------------------------------------------
+# Histograms (latency / batch-size distributions)
+# -------------------------------------------------
+# Fixed upper bounds, cumulative like Prometheus buckets. Percentiles
+# are interpolated inside the bucket that contains them.
+LATENCY_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class Histogram:
+
+    def __init__(self, bounds=LATENCY_MS_BUCKETS):
+
+        if list(bounds) != sorted(bounds) or not bounds:
+            raise ValueError("Histogram bounds must be non-empty and sorted")
+
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value, count=1):
+
+        # count > 1 records the same value several times at once
+        slot = bisect.bisect_left(self.bounds, value)
+
+        with self._lock:
+            self._counts[slot] += count
+            self._sum += value * count
+            self._count += count
+            self._max = value if self._max is None else max(self._max, value)
+
+    def percentile(self, q):
+
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q):
+
+        if self._count == 0:
+            return None
+
+        rank = q * self._count
+        seen = 0
+
+        for slot, count in enumerate(self._counts):
+
+            if count and seen + count >= rank:
+                lower = self.bounds[slot - 1] if slot > 0 else 0.0
+                upper = min(self.bounds[slot], self._max) if slot < len(self.bounds) else self._max
+                return lower + (upper - lower) * (rank - seen) / count
+
+            seen += count
+
+        return self._max
+
+    def snapshot(self):
+
+        with self._lock:
+
+            cumulative = []
+            running = 0
+
+            for bound, count in zip(self.bounds + ("+Inf",), self._counts):
+                running += count
+                cumulative.append([bound, running])
+
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": self._sum / self._count if self._count else None,
+                "max": self._max,
+                "p50": self._percentile(0.50),
+                "p90": self._percentile(0.90),
+                "p99": self._percentile(0.99),
+                "buckets": cumulative,
+            }
+
+    def reset(self):
+
+        with self._lock:
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._sum = 0.0
+            self._count = 0
+            self._max = None
@@ -0,0 +1,52 @@
+import warnings
+
+import torch
+import torch.nn as nn
+from torch.ao.quantization import quantize_dynamic
+
+
+# =========================================================
+# INT8 DYNAMIC QUANTIZATION (CPU inference)
+# =========================================================
+# Linear weights are stored as int8; activations are quantized on the
+# fly per batch, so no calibration data is needed. Quantized kernels
+# only exist on CPU: quantized experts always run on the CPU.
+#
+# Experts that support it take quantize=True:
+#   level2 -> MobileNetV2 classifier head
+#   level3 -> every ViT nn.Linear (MLP blocks + head; the attention
+#             out_proj is excluded by PyTorch itself)
+
+QUANTIZABLE_EXPERTS = ("level2", "level3")
+
+
+def quantize_linear_layers(module):
+
+    # Returns a new module; the fp32 original is left untouched
+    with warnings.catch_warnings():
+        # PyTorch flags quantized tensor creation as deprecated in
+        # favour of torchao; the eager dynamic path still works
+        warnings.filterwarnings("ignore", message=".*quantize_per_tensor.*")
+
+        return quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_linear_count(module):
+    return sum(
+        1 for child in module.modules()
+        if isinstance(child, torch.ao.nn.quantized.dynamic.Linear)
+    )
+
+
+def validate_quantize(names):
+
+    names = tuple(sorted(set(names or ())))
+    unsupported = [name for name in names if name not in QUANTIZABLE_EXPERTS]
+
+    if unsupported:
+        raise ValueError(
+            f"Quantization not supported for {unsupported}. "
+            f"Available: {list(QUANTIZABLE_EXPERTS)}"
+        )
+
+    return names
@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.core.profiling import BATCH_SIZE_BUCKETS, Histogram
+
+
+_STOP = object()
+
+
+# =========================================================
+# MICRO-BATCHING REQUEST COALESCER
+# =========================================================
+# Concurrent single-image requests are queued; a scheduler thread
+# takes the first waiting request, keeps collecting for up to
+# max_wait_ms or until max_batch requests are queued, then runs one
+# engine.analyze_batch() call (batched Level 1 / 2 / 3 passes) and
+# resolves each caller's future with its own result.
+#
+# max_wait_ms bounds the extra latency a lone request pays; larger
+# values give fuller batches under load.
+
+class MicroBatcher:
+
+    def __init__(self, engine, max_wait_ms=5.0, max_batch=16, cascade=None):
+
+        if max_wait_ms < 0 or max_batch < 1:
+            raise ValueError("max_wait_ms must be >= 0 and max_batch >= 1")
+
+        self.engine = engine
+        self.max_wait_ms = max_wait_ms
+        self.max_batch = max_batch
+        self.cascade = cascade
+
+        # Time from submit() to the start of the batch, and batch sizes
+        self.queue_wait_ms = Histogram()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.batch_ms = Histogram()
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    # --------------------------------------------------
+    # Client API
+    # --------------------------------------------------
+    def submit(self, image, cascade=None):
+
+        # cascade=None uses the batcher default
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+
+        if cascade is None:
+            cascade = self.cascade
+
+        future = Future()
+        self._queue.put((image, future, time.perf_counter(), cascade))
+
+        return future
+
+    def analyze(self, image, cascade=None, timeout=None):
+        return self.submit(image, cascade=cascade).result(timeout)
+
+    def stats(self):
+        return {
+            "max_wait_ms": self.max_wait_ms,
+            "max_batch": self.max_batch,
+            "queued": self._queue.qsize(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "batch_ms": self.batch_ms.snapshot(),
+        }
+
+    def close(self):
+
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._worker.join()
+
+    # --------------------------------------------------
+    # Scheduler
+    # --------------------------------------------------
+    def _run(self):
+
+        stopping = False
+
+        while not stopping:
+
+            item = self._queue.get()
+
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+
+            while len(batch) < self.max_batch:
+
+                remaining = deadline - time.perf_counter()
+
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+
+                batch.append(item)
+
+            self._run_batch(batch)
+
+        # Fail whatever is still queued after close()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("MicroBatcher is closed"))
+
+    def _run_batch(self, batch):
+
+        start = time.perf_counter()
+
+        # Callers that gave up (cancelled futures) are dropped
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+        if not batch:
+            return
+
+        for _, _, submitted, _ in batch:
+            self.queue_wait_ms.observe(1000.0 * (start - submitted))
+
+        self.batch_sizes.observe(len(batch))
+
+        # Requests with different cascade settings cannot share a call
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[3], []).append(item)
+
+        for cascade, items in groups.items():
+            self._run_group(items, cascade)
+
+        self.batch_ms.observe(1000.0 * (time.perf_counter() - start))
+
+    def _run_group(self, items, cascade):
+
+        try:
+            results = self.engine.analyze_batch(
+                [image for image, _, _, _ in items],
+                batch_size=len(items),
+                cascade=cascade
+            )
+        except Exception:
+            # One bad input must not fail its neighbours: retry singly
+            results = None
+
+        for position, (image, future, _, _) in enumerate(items):
+
+            if results is not None:
+                future.set_result(results[position])
+                continue
+
+            try:
+                future.set_result(self.engine.analyze_image(image, cascade=cascade))
+            except Exception as error:
+                future.set_exception(error)
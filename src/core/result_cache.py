@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "AUTHENTICITY_CACHE_DB",
+    os.path.join("cache", "result_cache.sqlite")
+)
+
+
+# =========================================================
+# CONTENT HASHING
+# =========================================================
+
+def content_digest(source):
+
+    # Returns (digest, source). File-like sources are read once and
+    # handed back as bytes so the caller can still decode them.
+    hasher = hashlib.sha256()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        hasher.update(b"bytes:")
+        hasher.update(source)
+
+    elif isinstance(source, (str, os.PathLike)):
+        hasher.update(b"bytes:")
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+
+    elif isinstance(source, np.ndarray):
+        array = np.ascontiguousarray(source)
+        hasher.update(f"array:{array.dtype}:{array.shape}:".encode())
+        hasher.update(array.data)
+
+    elif isinstance(source, Image.Image):
+        hasher.update(f"pil:{source.mode}:{source.size}:".encode())
+        hasher.update(source.tobytes())
+
+    elif hasattr(source, "read"):
+        source = source.read()
+        hasher.update(b"bytes:")
+        hasher.update(source)
+
+    else:
+        raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+    return hasher.hexdigest(), source
+
+
+_file_digests = {}
+
+
+def file_fingerprint(path):
+
+    # Full SHA-256 of a weights file, memoised per (path, size, mtime)
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    if memo_key not in _file_digests:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        _file_digests[memo_key] = hasher.hexdigest()
+
+    return _file_digests[memo_key]
+
+
+def config_fingerprint(config):
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+# =========================================================
+# TWO-TIER RESULT CACHE (memory LRU + SQLite)
+# =========================================================
+
+class ResultCache:
+
+    def __init__(self, db_path=None, capacity=1024):
+
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+
+        self.capacity = capacity
+        self.db_path = db_path
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "writes": 0,
+        }
+
+        self._db = None
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    # --------------------------------------------------
+    # Lookup / Store
+    # --------------------------------------------------
+    def get(self, key):
+
+        with self._lock:
+
+            payload = self._memory.get(key)
+
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return json.loads(payload)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.counters["disk_hits"] += 1
+                    return json.loads(row[0])
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key, result):
+
+        payload = json.dumps(result)
+
+        with self._lock:
+
+            self._remember(key, payload)
+            self.counters["writes"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, result, created) VALUES (?, ?, ?)",
+                    (key, payload, time.time())
+                )
+                self._db.commit()
+
+    def _remember(self, key, payload):
+
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    # --------------------------------------------------
+    # Maintenance / Reporting
+    # --------------------------------------------------
+    def stats(self):
+
+        with self._lock:
+
+            stats = dict(self.counters)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+
+            stats["memory_entries"] = len(self._memory)
+            stats["hit_rate"] = (
+                (stats["memory_hits"] + stats["disk_hits"]) / lookups
+                if lookups else 0.0
+            )
+
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute(
+                    "SELECT COUNT(*) FROM results"
+                ).fetchone()[0]
+
+            return stats
+
+    def clear(self):
+
+        with self._lock:
+
+            self._memory.clear()
+
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def close(self):
+
+        with self._lock:
+
+            if self._db is not None:
+                self._db.close()
+                self._db = None
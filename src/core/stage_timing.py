@@ -0,0 +1,208 @@
+import contextvars
+import json
+import threading
+import time
+
+from src.core.profiling import Histogram
+
+
+# =========================================================
+# PER-STAGE TIMING SPANS
+# =========================================================
+# Experts and the engine wrap each stage in `with span("level2.detect"):`.
+# Spans only measure while a timing_scope is active in the current
+# context (engine/video option timings=True); otherwise span() returns
+# a shared no-op object, so disabled instrumentation costs one
+# ContextVar lookup per stage.
+#
+# Every finished span is also observed into a process-level Histogram
+# per stage (milliseconds), exported with stage_histograms_json() (ms)
+# or stage_histograms_prometheus() (seconds). One observation per span:
+# batched stages record one observation per batch.
+#
+# Stages: decode, cache, level1.preprocess, level1.forward,
+# level2.detect, level2.preprocess, level2.forward, level3.preprocess,
+# level3.forward, fusion, video.decode, video.dedup, video.track; plus
+# the scope totals analyze_image, analyze_batch and video.analyze.
+
+_active = contextvars.ContextVar("authenticity_stage_timings", default=None)
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def stage_histogram(name):
+
+    with _histograms_lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram()
+
+        return _histograms[name]
+
+
+class StageTimings:
+
+    def __init__(self):
+
+        self.stages_ms = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.total_ms = None
+
+    def record(self, name, elapsed_ms):
+
+        # Repeated spans (one per image or batch) are summed; spans may
+        # come from several threads (video pipeline stages)
+        with self._lock:
+            self.stages_ms[name] = self.stages_ms.get(name, 0.0) + elapsed_ms
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+        stage_histogram(name).observe(elapsed_ms)
+
+    def finish(self, name):
+
+        self.total_ms = 1000 * (time.perf_counter() - self._start)
+        stage_histogram(name).observe(self.total_ms)
+
+    def summary(self, items=None):
+
+        with self._lock:
+            summary = {
+                "total_ms": self.total_ms,
+                "stages_ms": dict(self.stages_ms),
+                "calls": dict(self.calls),
+            }
+
+        # Batched calls: every result of the batch shares these timings
+        if items is not None:
+            summary["items"] = items
+
+        return summary
+
+
+class _Span:
+
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.record(self.name, 1000 * (time.perf_counter() - self.start))
+        return False
+
+
+class _NullSpan:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+
+    timings = _active.get()
+    return _NULL_SPAN if timings is None else _Span(timings, name)
+
+
+class timing_scope:
+
+    # `with timing_scope("analyze_image", enabled) as timings:` yields a
+    # StageTimings, or None when disabled or when an outer scope is
+    # already collecting (nested spans then go to the outer scope)
+    def __init__(self, name, enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.timings = None
+        self._token = None
+
+    def __enter__(self):
+
+        if self.enabled and _active.get() is None:
+            self.timings = StageTimings()
+            self._token = _active.set(self.timings)
+
+        return self.timings
+
+    def __exit__(self, *exc_info):
+
+        if self.timings is not None:
+            _active.reset(self._token)
+            self.timings.finish(self.name)
+
+        return False
+
+
+def record_timings(summary):
+
+    # Feed a result's "timings" (e.g. from a worker process) into this
+    # process's histograms. stages_ms holds per-stage sums over all
+    # spans of the scope, so each stage gets its mean span duration,
+    # observed once per span, keeping the histograms in per-span units.
+    calls = summary.get("calls", {})
+
+    for name, elapsed_ms in summary.get("stages_ms", {}).items():
+        count = max(1, calls.get(name, 1))
+        stage_histogram(name).observe(elapsed_ms / count, count)
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+def stage_histograms_json():
+
+    with _histograms_lock:
+        histograms = dict(_histograms)
+
+    return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+
+def stage_histograms_prometheus(metric="authenticity_stage_duration_seconds"):
+
+    # Prometheus convention: durations in seconds (histograms hold ms)
+    lines = [
+        f"# HELP {metric} Duration of engine stages in seconds",
+        f"# TYPE {metric} histogram",
+    ]
+
+    for name, snapshot in stage_histograms_json().items():
+
+        for bound, count in snapshot["buckets"]:
+            le = bound if bound == "+Inf" else f"{bound / 1000:g}"
+            lines.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {count}')
+
+        lines.append(f'{metric}_sum{{stage="{name}"}} {snapshot["sum"] / 1000}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {snapshot["count"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def dump_stage_histograms(path):
+
+    # *.prom / *.txt -> Prometheus text format, anything else -> JSON
+    if path.endswith((".prom", ".txt")):
+        content = stage_histograms_prometheus()
+    else:
+        content = json.dumps(stage_histograms_json(), indent=2)
+
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def reset_stage_histograms():
+
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,209 @@
+import threading
+
+import cv2
+import numpy as np
+import torch
+
+
+# =========================================================
+# PLUGGABLE FACE DETECTORS (Level 2)
+# =========================================================
+# A detector maps RGB uint8 arrays to full-resolution (x, y, w, h)
+# boxes without margin:
+#   detect(image_np)          -> [(x, y, w, h)]
+#   detect_batch(images_np)   -> [[(x, y, w, h)], ...]
+#   describe()                -> settings dict (part of the cache fingerprint)
+#
+# Detection runs on a copy capped at max_side pixels; boxes are mapped
+# back so crops are still taken from the original pixels. The shrink is
+# capped at min_scale so the smallest requested face (min_size at full
+# resolution) never falls below the detector's own minimum window, so
+# no face is ruled out by the size limit alone (faces just above
+# min_size can still be lost to resampling).
+
+def pyramid_level(image_np, max_side, min_scale=0.0):
+
+    # Returns (resized image, scale) with scale = resized / original
+    if max_side is None:
+        return image_np, 1.0
+
+    scale = min(1.0, max(min_scale, max_side / max(image_np.shape[:2])))
+
+    if scale == 1.0:
+        return image_np, 1.0
+
+    resized = cv2.resize(image_np, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return resized, scale
+
+
+def remap_boxes(boxes, scale, image_shape):
+
+    height, width = image_shape[:2]
+    remapped = []
+
+    for x, y, w, h in boxes:
+
+        x1 = max(0, int(round(x / scale)))
+        y1 = max(0, int(round(y / scale)))
+        x2 = min(width, int(round((x + w) / scale)))
+        y2 = min(height, int(round((y + h) / scale)))
+
+        if x2 > x1 and y2 > y1:
+            remapped.append((x1, y1, x2 - x1, y2 - y1))
+
+    return remapped
+
+
+class HaarFaceDetector:
+
+    # Smallest window the frontal-face cascade was trained on
+    CASCADE_WINDOW = 24
+
+    def __init__(self, max_side=1024, scale_factor=1.1, min_neighbors=5, min_size=40):
+
+        # max_side=None detects at full resolution (previous behaviour)
+        self.max_side = max_side
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+        # Never shrink min_size below the cascade window (40 px -> 0.6x)
+        self.min_scale = self.CASCADE_WINDOW / max(min_size, self.CASCADE_WINDOW)
+
+        self.cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+
+        # One cascade object is not safe to run from several threads
+        # (server image + video workers share the Level 2 expert)
+        self._lock = threading.Lock()
+
+    def detect(self, image_np):
+
+        small, scale = pyramid_level(image_np, self.max_side, self.min_scale)
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+        # minSize stays min_size pixels at full resolution
+        min_size = max(self.CASCADE_WINDOW, int(round(self.min_size * scale)))
+
+        with self._lock:
+            faces = self.cascade.detectMultiScale(
+                gray,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                minSize=(min_size, min_size)
+            )
+
+        boxes = [tuple(int(v) for v in face) for face in faces]
+
+        if scale == 1.0:
+            return boxes
+
+        return remap_boxes(boxes, scale, image_np.shape)
+
+    def detect_batch(self, images_np):
+        return [self.detect(image_np) for image_np in images_np]
+
+    def describe(self):
+        return {
+            "name": "haar",
+            "max_side": self.max_side,
+            "scale_factor": self.scale_factor,
+            "min_neighbors": self.min_neighbors,
+            "min_size": self.min_size,
+            "min_scale": self.min_scale,
+        }
+
+
+class MTCNNFaceDetector:
+
+    # min_face_size handed to MTCNN on the downscaled copy
+    MIN_WINDOW = 20
+
+    def __init__(self, max_side=1024, min_confidence=0.90, min_size=40, device=None):
+
+        try:
+            from facenet_pytorch import MTCNN
+        except ImportError as error:
+            raise ImportError(
+                "The 'mtcnn' face detector requires facenet-pytorch "
+                "(pip install facenet-pytorch)"
+            ) from error
+
+        self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.max_side = max_side
+        self.min_confidence = min_confidence
+        self.min_size = min_size
+        self.min_scale = self.MIN_WINDOW / max(min_size, self.MIN_WINDOW)
+
+        # min_face_size is re-applied per image after remapping
+        self.mtcnn = MTCNN(keep_all=True, min_face_size=self.MIN_WINDOW, device=self.device)
+
+    def detect(self, image_np):
+        return self.detect_batch([image_np])[0]
+
+    def detect_batch(self, images_np):
+
+        # MTCNN batches only same-sized inputs: group pyramid levels by shape
+        levels = [pyramid_level(image_np, self.max_side, self.min_scale) for image_np in images_np]
+        groups = {}
+
+        for i, (small, _) in enumerate(levels):
+            groups.setdefault(small.shape, []).append(i)
+
+        results = [[] for _ in images_np]
+
+        for indices in groups.values():
+
+            stacked = np.stack([levels[i][0] for i in indices])
+
+            with torch.no_grad():
+                batch_boxes, batch_probs = self.mtcnn.detect(stacked)
+
+            for i, boxes, probs in zip(indices, batch_boxes, batch_probs):
+
+                if boxes is None:
+                    continue
+
+                scale = levels[i][1]
+                kept = [
+                    (x1, y1, x2 - x1, y2 - y1)
+                    for (x1, y1, x2, y2), prob in zip(boxes, probs)
+                    if prob >= self.min_confidence
+                ]
+
+                results[i] = [
+                    box for box in remap_boxes(kept, scale, images_np[i].shape)
+                    if min(box[2], box[3]) >= self.min_size
+                ]
+
+        return results
+
+    def describe(self):
+        return {
+            "name": "mtcnn",
+            "max_side": self.max_side,
+            "min_confidence": self.min_confidence,
+            "min_size": self.min_size,
+            "min_scale": self.min_scale,
+        }
+
+
+FACE_DETECTORS = {
+    "haar": HaarFaceDetector,
+    "mtcnn": MTCNNFaceDetector,
+}
+
+
+def build_face_detector(detector="haar", **kwargs):
+
+    # Accepts a registered name or an object with detect/detect_batch
+    if not isinstance(detector, str):
+        return detector
+
+    if detector not in FACE_DETECTORS:
+        raise ValueError(
+            f"Unknown face detector '{detector}'. Available: {sorted(FACE_DETECTORS)}"
+        )
+
+    return FACE_DETECTORS[detector](**kwargs)
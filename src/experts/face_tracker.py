@@ -0,0 +1,220 @@
+import itertools
+
+import cv2
+import numpy as np
+
+
+# =========================================================
+# KEYFRAME DETECTION + TEMPLATE TRACKING (video Level 2)
+# =========================================================
+# The face detector only runs on every keyframe_interval-th frame.
+# In between, each face box is followed by normalised template
+# matching on a downscaled gray frame, searching a window around the
+# previous position. On keyframes, detections are matched to the
+# live tracks by IoU so each face keeps its track id over time.
+#
+# Sampled frames can be far apart (total / max_frames), so a face may
+# move out of its search window or change too much to match. When any
+# track is lost the detector runs on that frame as well, instead of
+# dropping the face until the next keyframe.
+#
+# Frames must be fed in temporal order.
+
+def box_iou(a, b):
+
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+
+    overlap_w = min(ax + aw, bx + bw) - max(ax, bx)
+    overlap_h = min(ay + ah, by + bh) - max(ay, by)
+
+    if overlap_w <= 0 or overlap_h <= 0:
+        return 0.0
+
+    intersection = overlap_w * overlap_h
+    return intersection / (aw * ah + bw * bh - intersection)
+
+
+class FaceTracker:
+
+    def __init__(
+        self,
+        detect,
+        keyframe_interval=4,
+        max_width=480,
+        match_threshold=0.6,
+        iou_threshold=0.3
+    ):
+
+        # detect(rgb_frame) -> [(x, y, w, h)] in full-resolution pixels
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be >= 1")
+
+        self.detect = detect
+        self.keyframe_interval = keyframe_interval
+        self.max_width = max_width
+        self.match_threshold = match_threshold
+        self.iou_threshold = iou_threshold
+
+        self.frames_seen = 0
+        self.keyframes = 0
+
+        # Off-keyframe detector runs after a track was lost
+        self.redetections = 0
+
+        # track_id -> {"box": full-res box, "template": downscaled gray patch}
+        self._tracks = {}
+        self._ids = itertools.count()
+
+        # track_id -> [(frame_index, fake_probability)]
+        self._scores = {}
+
+    # --------------------------------------------------
+    # Per-Frame Update
+    # --------------------------------------------------
+    def update(self, rgb_frame):
+
+        # Returns [(track_id, (x, y, w, h))] for this frame
+        scale = min(1.0, self.max_width / rgb_frame.shape[1])
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        if self.frames_seen % self.keyframe_interval == 0:
+            self._redetect(rgb_frame, gray, scale)
+        elif not self._follow(gray, scale):
+            self._redetect(rgb_frame, gray, scale)
+            self.redetections += 1
+
+        self.frames_seen += 1
+
+        return [(track_id, track["box"]) for track_id, track in self._tracks.items()]
+
+    def _redetect(self, rgb_frame, gray, scale):
+
+        self._associate(self.detect(rgb_frame), gray, scale)
+        self.keyframes += 1
+
+    def _associate(self, detections, gray, scale):
+
+        # Greedy IoU matching, best pairs first
+        pairs = sorted(
+            (
+                (box_iou(track["box"], box), track_id, i)
+                for track_id, track in self._tracks.items()
+                for i, box in enumerate(detections)
+            ),
+            reverse=True
+        )
+
+        assigned = {}
+        used = set()
+
+        for iou, track_id, i in pairs:
+            if iou < self.iou_threshold:
+                break
+            if track_id in assigned or i in used:
+                continue
+            assigned[track_id] = i
+            used.add(i)
+
+        # The detector is authoritative on keyframes: unmatched tracks end
+        tracks = {}
+
+        for track_id, i in assigned.items():
+            tracks[track_id] = self._new_state(detections[i], gray, scale)
+
+        for i, box in enumerate(detections):
+            if i not in used:
+                tracks[next(self._ids)] = self._new_state(box, gray, scale)
+
+        self._tracks = tracks
+
+    def _follow(self, gray, scale):
+
+        # False (tracks left at their last boxes) as soon as one face
+        # cannot be followed; the caller then re-detects
+        tracks = {}
+
+        for track_id, track in self._tracks.items():
+
+            template = track["template"]
+            th, tw = template.shape
+
+            if th < 4 or tw < 4:
+                return False
+
+            # Search window: the previous box grown by one box size
+            x, y, w, h = self._scaled(track["box"], scale)
+            x1, y1 = max(0, x - w), max(0, y - h)
+            x2, y2 = min(gray.shape[1], x + 2 * w), min(gray.shape[0], y + 2 * h)
+
+            window = gray[y1:y2, x1:x2]
+
+            if window.shape[0] < th or window.shape[1] < tw:
+                return False
+
+            response = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, best, _, (dx, dy) = cv2.minMaxLoc(response)
+
+            if best < self.match_threshold:
+                return False
+
+            # Same size, shifted to the best match
+            _, _, full_w, full_h = track["box"]
+            box = (
+                int(round((x1 + dx) / scale)),
+                int(round((y1 + dy) / scale)),
+                full_w,
+                full_h,
+            )
+
+            tracks[track_id] = self._new_state(box, gray, scale)
+
+        self._tracks = tracks
+        return True
+
+    def _new_state(self, box, gray, scale):
+
+        x, y, w, h = self._scaled(box, scale)
+
+        return {
+            "box": tuple(int(v) for v in box),
+            "template": gray[y:y + h, x:x + w].copy(),
+        }
+
+    def _scaled(self, box, scale):
+        return tuple(int(round(v * scale)) for v in box)
+
+    # --------------------------------------------------
+    # Per-Track Aggregation
+    # --------------------------------------------------
+    def add_scores(self, frame_index, track_ids, level2_result):
+
+        # level2_result["per_face_scores"] follows the order of track_ids
+        for track_id, score in zip(track_ids, level2_result.get("per_face_scores", [])):
+            self._scores.setdefault(track_id, []).append(
+                (frame_index, score["fake_probability"])
+            )
+
+    def summary(self):
+
+        tracks = []
+
+        for track_id, observations in sorted(self._scores.items()):
+
+            probs = np.array([prob for _, prob in observations])
+            frames = [frame_index for frame_index, _ in observations]
+
+            tracks.append({
+                "track_id": track_id,
+                "frames": len(frames),
+                "first_frame": frames[0],
+                "last_frame": frames[-1],
+                "mean_fake_probability": float(probs.mean()),
+                "max_fake_probability": float(probs.max()),
+                "std_fake_probability": float(probs.std()),
+            })
+
+        return tracks
@@ -0,0 +1,297 @@
+import time
+
+import cv2
+
+
+# =========================================================
+# FRAME SAMPLING WITHOUT PER-FRAME SEEKS
+# =========================================================
+# Frames are decoded forward: grab() advances the decoder without
+# colour conversion and retrieve() is only called on the frames that
+# are kept. This avoids the keyframe re-decode that every
+# cap.set(CAP_PROP_POS_FRAMES) costs on H.264/H.265 files.
+#
+# A forward pass still decodes every skipped frame, so very sparse
+# sampling of long videos is cheaper with a seek. seek_threshold:
+#   "auto" -> compare measured grab cost x gap against measured seek cost
+#   int    -> seek whenever the gap exceeds this many frames
+#   None   -> strictly sequential, never seek forward
+# Targets behind the current decoder position always seek.
+
+# Smallest gap for which a seek is ever attempted in "auto" mode
+MIN_SEEK_GAP = 8
+
+
+class VideoOpenError(ValueError):
+    # OpenCV could not open the file as a video
+    pass
+
+
+def uniform_indices(total_frames, max_frames):
+
+    if total_frames <= max_frames:
+        return list(range(total_frames))
+
+    step = total_frames // max_frames
+    return [i * step for i in range(max_frames)]
+
+
+def sample_frames(video_path, max_frames=15, seek_threshold="auto"):
+
+    # Returns (frame_indices, frames) with frames in BGR order
+    if max_frames < 1:
+        raise ValueError("max_frames must be >= 1")
+
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        raise VideoOpenError(f"Could not open video: {video_path}")
+
+    try:
+        reported_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        if reported_frames <= 0:
+            # Frame count missing (common with VFR phone videos)
+            return _sample_unknown_length(cap, max_frames)
+
+        indices = uniform_indices(reported_frames, max_frames)
+        state = {}
+        frames = list(_iter_planned(cap, indices, seek_threshold, state))
+
+        # Frame count overstated: the stream ended before the last
+        # planned frame. Resample once as a stream of unknown length.
+        if state["position"] <= indices[-1]:
+            cap.release()
+            cap = cv2.VideoCapture(video_path)
+            return _sample_unknown_length(cap, max_frames)
+
+        return [idx for idx, _ in frames], [frame for _, frame in frames]
+
+    finally:
+        cap.release()
+
+
+def iter_frames(video_path, max_frames=15, seek_threshold="auto"):
+
+    # Streaming variant: yields (frame_index, frame) as soon as each
+    # sampled frame is decoded. With an overstated frame count it stops
+    # at the real end of the stream (fewer frames, still spread out).
+    if max_frames < 1:
+        raise ValueError("max_frames must be >= 1")
+
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        raise VideoOpenError(f"Could not open video: {video_path}")
+
+    try:
+        reported_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        if reported_frames <= 0:
+            indices, frames = _sample_unknown_length(cap, max_frames)
+            yield from zip(indices, frames)
+        else:
+            indices = uniform_indices(reported_frames, max_frames)
+            yield from _iter_planned(cap, indices, seek_threshold, {})
+
+    finally:
+        cap.release()
+
+
+def _iter_planned(cap, indices, seek_threshold, state):
+
+    # state carries the decoder position and the running cost
+    # estimates (seconds) of the "auto" policy between calls on the
+    # same capture. state["position"] ends as the number of frames
+    # decoded; it is <= indices[-1] only when the stream ended early.
+    position = state.get("position", 0)
+    state["position"] = position
+
+    for target in indices:
+
+        gap = target - position
+
+        if _should_seek(gap, seek_threshold, state.get("grab_cost"), state.get("seek_cost")):
+
+            start = time.perf_counter()
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            grabbed = cap.grab()
+            elapsed = time.perf_counter() - start
+
+            seek_cost = state.get("seek_cost")
+            state["seek_cost"] = elapsed if seek_cost is None else 0.5 * (seek_cost + elapsed)
+            position = target
+
+        else:
+
+            start = time.perf_counter()
+
+            while position < target:
+                if not cap.grab():
+                    state["position"] = position
+                    return
+                position += 1
+
+            grabbed = cap.grab()
+
+            elapsed = (time.perf_counter() - start) / (gap + 1)
+            grab_cost = state.get("grab_cost")
+            state["grab_cost"] = elapsed if grab_cost is None else 0.5 * (grab_cost + elapsed)
+
+        state["position"] = position
+
+        if not grabbed:
+            return
+
+        ret, frame = cap.retrieve()
+
+        position += 1
+        state["position"] = position
+
+        if ret:
+            yield target, frame
+
+
+def _should_seek(gap, seek_threshold, grab_cost, seek_cost):
+
+    # Frames behind the decoder can only be reached with a seek
+    if gap < 0:
+        return True
+
+    if seek_threshold is None or gap == 0:
+        return False
+
+    if seek_threshold != "auto":
+        return gap > seek_threshold
+
+    if gap < MIN_SEEK_GAP:
+        return False
+
+    # Probe each cost once (seek first), then pick whichever is cheaper
+    if seek_cost is None:
+        return True
+
+    if grab_cost is None:
+        return False
+
+    return seek_cost < gap * grab_cost
+
+
+def _sample_unknown_length(cap, max_frames):
+
+    # Keep every `stride`-th frame; when the buffer doubles past the
+    # budget, drop every other frame and double the stride. The buffer
+    # stays evenly spread over everything decoded so far.
+    stride = 1
+    kept = []
+    position = 0
+
+    while cap.grab():
+
+        if position % stride == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                kept.append((position, frame))
+
+            if len(kept) >= 2 * max_frames:
+                kept = kept[::2]
+                stride *= 2
+
+        position += 1
+
+    if len(kept) > max_frames:
+        step = len(kept) / max_frames
+        kept = [kept[int(i * step)] for i in range(max_frames)]
+
+    return [idx for idx, _ in kept], [frame for _, frame in kept]
+
+
+# =========================================================
+# COARSE-TO-FINE SAMPLING (adaptive video analysis)
+# =========================================================
+# Positions follow the base-2 van der Corput sequence (1/2, 1/4, 3/4,
+# 1/8, 5/8, ...), so every prefix is spread over the whole clip and
+# each round refines the gaps left by the previous ones.
+
+def coarse_to_fine_indices(total_frames, max_frames):
+
+    indices = []
+    seen = set()
+    k = 1
+
+    # Bounded: k only grows until total_frames distinct positions exist
+    while len(indices) < min(max_frames, total_frames):
+
+        fraction, denominator, n = 0.0, 1.0, k
+
+        while n:
+            denominator *= 2
+            fraction += (n % 2) / denominator
+            n //= 2
+
+        index = min(total_frames - 1, int(fraction * total_frames))
+
+        if index not in seen:
+            seen.add(index)
+            indices.append(index)
+
+        k += 1
+
+    return indices
+
+
+def iter_frame_rounds(video_path, min_frames=4, max_frames=32, seek_threshold="auto"):
+
+    # Yields rounds of [(frame_index, frame)]: first min_frames frames,
+    # then each round doubles the total. Stop iterating to stop decoding.
+    if min_frames < 1 or max_frames < min_frames:
+        raise ValueError("Require 1 <= min_frames <= max_frames")
+
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        raise VideoOpenError(f"Could not open video: {video_path}")
+
+    try:
+        reported_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        if reported_frames <= 0:
+            # No usable frame count: decode a uniform sample once and
+            # release it in coarse-to-fine order
+            indices, frames = _sample_unknown_length(cap, max_frames)
+            order = coarse_to_fine_indices(len(frames), len(frames))
+            ordered = [(indices[i], frames[i]) for i in order]
+
+            for start, end in _round_bounds(len(ordered), min_frames):
+                yield ordered[start:end]
+            return
+
+        order = coarse_to_fine_indices(reported_frames, max_frames)
+
+        # One capture position and one set of cost estimates across
+        # rounds: each round is decoded in frame order from wherever the
+        # previous one stopped, seeking back only to its first target
+        state = {}
+
+        for start, end in _round_bounds(len(order), min_frames):
+
+            round_frames = list(
+                _iter_planned(cap, sorted(order[start:end]), seek_threshold, state)
+            )
+
+            if not round_frames:
+                return
+
+            yield round_frames
+
+    finally:
+        cap.release()
+
+
+def _round_bounds(total, first_round):
+
+    start, end = 0, min(first_round, total)
+
+    while start < total:
+        yield start, end
+        start, end = end, min(2 * end, total)
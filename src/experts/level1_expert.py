@@ -2,20 +2,54 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 from torchvision import transforms
-from PIL import Image
+from torchvision.transforms.functional import pil_to_tensor
 import os
 
+from src.core.image_io import as_pyramid
+from src.core.inference_backends import load_backend
+from src.core.stage_timing import span
+
 
 # -------------------------------------------------
 # FFT Function (same as training)
 # -------------------------------------------------
 def compute_fft(batch):
     fft = torch.fft.fft2(batch)
-    fft_shift = torch.fft.fftshift(fft)
+    # Shift only the spatial dims: a bare fftshift() also rolls the
+    # batch axis, which is a no-op at batch size 1 but mixes images
+    # across a batch
+    fft_shift = torch.fft.fftshift(fft, dim=(-2, -1))
     magnitude = torch.abs(fft_shift)
     return torch.log1p(magnitude)
 
 
+# -------------------------------------------------
+# compute_fft as real matrix products (export-friendly)
+# -------------------------------------------------
+# ONNX has no complex FFT: for a fixed H x W input the shifted 2D DFT
+# is F_H @ x @ F_W^T with F = C - iS, so the magnitude only needs
+# four real matmuls. fftshift is folded into the matrix rows.
+class DFTMagnitude(nn.Module):
+    def __init__(self, height=32, width=32):
+        super(DFTMagnitude, self).__init__()
+
+        for name, size in (("h", height), ("w", width)):
+            k = torch.fft.fftshift(torch.arange(size, dtype=torch.float64))
+            n = torch.arange(size, dtype=torch.float64)
+            angle = 2 * torch.pi * torch.outer(k, n) / size
+
+            self.register_buffer(f"cos_{name}", torch.cos(angle).float())
+            self.register_buffer(f"sin_{name}", torch.sin(angle).float())
+
+    def forward(self, x):
+        # (C - iS) x (C' - iS')^T
+        cx = self.cos_h @ x
+        sx = self.sin_h @ x
+        real = cx @ self.cos_w.T - sx @ self.sin_w.T
+        imag = cx @ self.sin_w.T + sx @ self.cos_w.T
+        return torch.log1p(torch.sqrt(real * real + imag * imag))
+
+
 # -------------------------------------------------
 # Hybrid Level 1 Model (same architecture)
 # -------------------------------------------------
@@ -68,13 +102,89 @@ class HybridLevel1(nn.Module):
         return output
 
 
+# -------------------------------------------------
+# Tiled Mode (native-resolution patches)
+# -------------------------------------------------
+# Instead of shrinking the whole image to 32x32, score up to
+# max_patches native-resolution 32x32 gray tiles in one batched
+# forward pass and aggregate their fake probabilities:
+#   sampling:  "grid"     -> tiles spread evenly over the image
+#              "saliency" -> tiles with the most gradient energy
+#   aggregate: "mean" | "max" | "topk" (mean of the top_k tiles)
+TILE_SAMPLING = ("grid", "saliency")
+TILE_AGGREGATES = ("mean", "max", "topk")
+TILE_DEFAULTS = {"sampling": "grid", "max_patches": 64, "aggregate": "mean", "top_k": 8}
+
+
+def validate_tiling(tiling):
+
+    # None keeps the classic single 32x32 resize
+    if tiling is None:
+        return None
+
+    unknown = set(tiling) - set(TILE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown tiling options {sorted(unknown)}. Available: {list(TILE_DEFAULTS)}")
+
+    tiling = {**TILE_DEFAULTS, **tiling}
+
+    if tiling["sampling"] not in TILE_SAMPLING:
+        raise ValueError(f"sampling must be one of {list(TILE_SAMPLING)}")
+
+    if tiling["aggregate"] not in TILE_AGGREGATES:
+        raise ValueError(f"aggregate must be one of {list(TILE_AGGREGATES)}")
+
+    if tiling["max_patches"] < 1 or tiling["top_k"] < 1:
+        raise ValueError("max_patches and top_k must be >= 1")
+
+    return tiling
+
+
+def _spread(count, keep):
+
+    # `keep` indices spread evenly over range(count)
+    return torch.linspace(0, count - 1, min(count, keep)).round().long()
+
+
+def extract_patches(gray, size=32, sampling="grid", max_patches=64):
+
+    # gray: H x W uint8 tensor -> N x 1 x size x size float in [0, 1]
+    # (same scale as ToTensor). Non-overlapping tiles via unfold (a view).
+    tiles = gray.unfold(0, size, size).unfold(1, size, size)
+    rows, cols = tiles.shape[:2]
+
+    if sampling == "grid":
+        # Keep the grid's aspect ratio: ~sqrt(max_patches * rows / cols) rows
+        keep_rows = max(1, min(rows, round((max_patches * rows / cols) ** 0.5)))
+        keep_cols = max(1, min(cols, max_patches // keep_rows))
+
+        selected = tiles[_spread(rows, keep_rows)][:, _spread(cols, keep_cols)]
+        selected = selected.reshape(-1, size, size)
+
+    else:
+        # Gradient energy per tile: absolute horizontal + vertical
+        # differences on the tile-aligned crop, summed per block
+        signed = gray[:rows * size, :cols * size].to(torch.int16)
+
+        gradient = F.pad((signed[:, 1:] - signed[:, :-1]).abs_(), (0, 1))
+        gradient += F.pad((signed[1:, :] - signed[:-1, :]).abs_(), (0, 0, 0, 1))
+
+        energy = gradient.reshape(rows, size, cols, size).sum(dim=(1, 3)).flatten()
+
+        top = torch.topk(energy, min(max_patches, len(energy))).indices
+        selected = tiles.reshape(-1, size, size)[top.sort().values]
+
+    return selected.unsqueeze(1).float().div_(255.0)
+
+
 # -------------------------------------------------
 # Level 1 Expert Class
 # -------------------------------------------------
 class Level1Expert:
-    def __init__(self, model_path="models/level1/level1_hybrid.pth"):
+    def __init__(self, model_path="models/level1/level1_hybrid.pth", backend="eager"):
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.model_path = model_path
 
         self.model = HybridLevel1().to(self.device)
 
@@ -87,32 +197,114 @@ class Level1Expert:
 
         self.model.eval()
 
-        self.transform = transforms.Compose([
-            transforms.Grayscale(),
-            transforms.Resize((32, 32)),
-            transforms.ToTensor()
-        ])
+        # eager / torchscript / onnxruntime (parity-checked against eager)
+        self.forward_fn, self.backend, self.backend_parity = load_backend(
+            "level1", self.model, backend, self.device
+        )
+
+        # Grayscale -> Resize((32, 32)) -> ToTensor; the gray resize is
+        # taken from the shared ImagePyramid
+        self.input_size = (32, 32)
+        self.transform = transforms.ToTensor()
 
         print("✅ Level 1 Expert Loaded Successfully")
 
+    # -------------------------------------------------
+    # Preprocess (single image -> 1 x 32 x 32 tensor,
+    # or N_patches x 1 x 32 x 32 in tiled mode)
+    # -------------------------------------------------
+    def preprocess(self, image, tiling=None):
+
+        # Accepts a path, an already-decoded image or an ImagePyramid
+        pyramid = as_pyramid(image)
+
+        with span("level1.preprocess"):
+
+            if tiling is None:
+                return self.transform(pyramid.resized(self.input_size, gray=True))
+
+            width, height = pyramid.size
+
+            # Smaller than one tile: the resized image is the only patch
+            if width < self.input_size[0] or height < self.input_size[1]:
+                return self.transform(pyramid.resized(self.input_size, gray=True)).unsqueeze(0)
+
+            return extract_patches(
+                pil_to_tensor(pyramid.gray)[0],
+                size=self.input_size[0],
+                sampling=tiling["sampling"],
+                max_patches=tiling["max_patches"]
+            )
+
     # -------------------------------------------------
     # Predict method
     # -------------------------------------------------
-    def predict(self, image_path):
+    def predict(self, image, tiling=None):
+        return self.predict_batch([image], tiling)[0]
 
-        image = Image.open(image_path).convert("L")
-        image_tensor = self.transform(image).unsqueeze(0).to(self.device)
+    def predict_batch(self, images, tiling=None):
 
-        with torch.no_grad():
-            output = self.model(image_tensor)
-            probabilities = F.softmax(output, dim=1)
+        tiling = validate_tiling(tiling)
+        return self.predict_prepared([self.preprocess(image, tiling) for image in images], tiling)
+
+    def predict_prepared(self, prepared, tiling=None):
 
-        real_prob = probabilities[0][0].item()
-        fake_prob = probabilities[0][1].item()
-        confidence = abs(fake_prob - real_prob)
+        if tiling is None:
+            return self.predict_tensors(torch.stack(prepared))
+
+        # Every patch of every image goes through one forward pass
+        counts = [len(patches) for patches in prepared]
+        patch_scores = self.predict_tensors(torch.cat(prepared))
+
+        results = []
+        start = 0
+
+        for count in counts:
+            results.append(self._aggregate(patch_scores[start:start + count], tiling))
+            start += count
+
+        return results
+
+    def _aggregate(self, patch_scores, tiling):
+
+        fake_probs = torch.tensor([score["fake_probability"] for score in patch_scores])
+
+        if tiling["aggregate"] == "max":
+            fake_prob = fake_probs.max().item()
+        elif tiling["aggregate"] == "topk":
+            fake_prob = torch.topk(fake_probs, min(tiling["top_k"], len(fake_probs))).values.mean().item()
+        else:
+            fake_prob = fake_probs.mean().item()
+
+        real_prob = 1.0 - fake_prob
 
         return {
             "real_probability": real_prob,
             "fake_probability": fake_prob,
-            "confidence": confidence
+            "confidence": abs(fake_prob - real_prob),
+            "patches_analyzed": len(patch_scores),
+            "patch_aggregate": tiling["aggregate"],
+            "max_patch_fake_probability": fake_probs.max().item()
         }
+
+    def predict_tensors(self, batch):
+
+        with span("level1.forward"), torch.no_grad():
+            output = self.forward_fn(batch.to(self.device))
+            probabilities = F.softmax(output, dim=1)
+
+        results = []
+
+        for probs in probabilities.cpu():
+
+            real_prob = probs[0].item()
+            fake_prob = probs[1].item()
+            confidence = abs(fake_prob - real_prob)
+
+            results.append({
+                "real_probability": real_prob,
+                "fake_probability": fake_prob,
+                "confidence": confidence
+            })
+
+        return results
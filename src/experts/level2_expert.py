@@ -1,17 +1,41 @@
 import torch
 import torch.nn as nn
+from torchvision import models
 import numpy as np
-from torchvision import models, transforms
 from PIL import Image
-import cv2
 import os
 
+from src.core.image_io import as_pyramid
+from src.core.inference_backends import load_backend
+from src.core.quantization import quantize_linear_layers
+from src.core.stage_timing import span
+from src.experts.face_detectors import build_face_detector
+
+
+# Default memory guards (also part of the result-cache fingerprint)
+MAX_FACES = 64
+FACE_BATCH_SIZE = 32
+
 
 class Level2FaceExpert:
 
-    def __init__(self, model_path="models/level2/level2_face_best.pth"):
+    def __init__(
+        self,
+        model_path="models/level2/level2_face_best.pth",
+        max_faces=MAX_FACES,
+        face_batch_size=FACE_BATCH_SIZE,
+        detector="haar",
+        quantize=False,
+        backend="eager"
+    ):
 
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if quantize and backend != "eager":
+            raise ValueError("Quantized experts only run on the eager backend")
+
+        # Quantized (INT8) kernels are CPU-only
+        self.quantize = quantize
+        self.device = torch.device("cuda" if torch.cuda.is_available() and not quantize else "cpu")
+        self.model_path = model_path
 
         # ----------------------------
         # Model Setup (MobileNetV2)
@@ -29,6 +53,15 @@ class Level2FaceExpert:
         self.model.to(self.device)
         self.model.eval()
 
+        # Opt-in INT8 dynamic quantization of the classifier head
+        if quantize:
+            self.model.classifier = quantize_linear_layers(self.model.classifier)
+
+        # eager / torchscript / onnxruntime (parity-checked against eager)
+        self.forward_fn, self.backend, self.backend_parity = load_backend(
+            "level2", self.model, backend, self.device
+        )
+
         # Explicit class mapping (VERY IMPORTANT)
         # ImageFolder alphabetical order: fake=0, real=1
         self.class_names = ["fake", "real"]
@@ -36,19 +69,27 @@ class Level2FaceExpert:
         # ----------------------------
         # Transform (must match training)
         # ----------------------------
-        self.transform = transforms.Compose([
-            transforms.Resize((128, 128)),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                [0.485, 0.456, 0.406],
-                [0.229, 0.224, 0.225]
-            )
-        ])
+        # Resize((128, 128)) + ToTensor + Normalize: the same PIL
+        # bilinear resize per crop, normalized as one batch
+        self.input_size = [128, 128]
+        self.mean = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+        self.std = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
 
-        # Haar cascade for face detection
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
+        # ----------------------------
+        # Memory Guards
+        # ----------------------------
+        # max_faces: largest detections kept per image
+        # face_batch_size: faces per forward pass
+        if max_faces < 1 or face_batch_size < 1:
+            raise ValueError("max_faces and face_batch_size must be >= 1")
+
+        self.max_faces = max_faces
+        self.face_batch_size = face_batch_size
+
+        # Face detector: "haar" (default), "mtcnn" or a detector object
+        # (see src/experts/face_detectors.py). Detection runs on a
+        # size-capped copy; crops come from the full-resolution image.
+        self.detector = build_face_detector(detector)
 
         print("✅ Level 2 Face Expert Loaded Successfully (multi-face enabled)")
 
@@ -57,18 +98,42 @@ class Level2FaceExpert:
     # --------------------------------------------------
     def _detect_faces(self, image_np):
 
-        gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
+        boxes, faces_skipped = self.detect_boxes(image_np)
+        return self.crop_faces(image_np, boxes), faces_skipped
 
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(40, 40)
-        )
+    def detect_boxes(self, image_np):
+
+        # Returns ([(x, y, w, h)], faces_skipped) without the margin
+        with span("level2.detect"):
+            return self._cap_faces(self.detector.detect(image_np))
+
+    def detect_boxes_batch(self, images_np):
+
+        with span("level2.detect"):
+            return [self._cap_faces(faces) for faces in self.detector.detect_batch(images_np)]
+
+    def _cap_faces(self, faces):
+
+        faces = list(faces)
+        faces_skipped = 0
+
+        # Too many detections (usually false positives): keep the largest
+        if len(faces) > self.max_faces:
+            keep = sorted(
+                range(len(faces)),
+                key=lambda i: faces[i][2] * faces[i][3],
+                reverse=True
+            )[:self.max_faces]
+            faces_skipped = len(faces) - self.max_faces
+            faces = [faces[i] for i in sorted(keep)]
+
+        return faces, faces_skipped
+
+    def crop_faces(self, image_np, boxes):
 
         cropped_faces = []
 
-        for (x, y, w, h) in faces:
+        for (x, y, w, h) in boxes:
 
             margin = int(0.3 * w)
 
@@ -83,48 +148,134 @@ class Level2FaceExpert:
         return cropped_faces
 
     # --------------------------------------------------
-    # Prediction Logic
+    # Preprocess (single image -> N_faces x 3 x 128 x 128)
     # --------------------------------------------------
-    def predict(self, image_path):
+    def preprocess(self, image):
+
+        # Accepts a path, an already-decoded image or an ImagePyramid
+        image_np = as_pyramid(image).array
+
+        faces, faces_skipped = self._detect_faces(image_np)
+
+        return {
+            "faces": self._preprocess_crops(faces),
+            "faces_skipped": faces_skipped
+        }
 
-        image = Image.open(image_path).convert("RGB")
-        image_np = np.array(image)
+    def preprocess_batch(self, images):
+
+        # One detect_batch call for all images (batched MTCNN)
+        images_np = [as_pyramid(image).array for image in images]
+        prepared = []
+
+        for image_np, (boxes, faces_skipped) in zip(images_np, self.detect_boxes_batch(images_np)):
+            prepared.append({
+                "faces": self._preprocess_crops(self.crop_faces(image_np, boxes)),
+                "faces_skipped": faces_skipped
+            })
+
+        return prepared
+
+    def preprocess_boxes(self, image, boxes):
+
+        # Same output as preprocess() for externally supplied boxes
+        # (e.g. face tracks in video), skipping detection
+        image_np = as_pyramid(image).array
+
+        return {
+            "faces": self._preprocess_crops(self.crop_faces(image_np, boxes)),
+            "faces_skipped": 0
+        }
 
-        faces = self._detect_faces(image_np)
+    def _preprocess_crops(self, faces):
 
         if len(faces) == 0:
-            return {
-                "faces_detected": 0,
-                "ai_content_percentage": None,
-                "forensic_decision": "No Face Detected",
-                "note": "Level 2 skipped."
-            }
+            return torch.empty((0, 3, *self.input_size))
+
+        with span("level2.preprocess"):
+
+            height, width = self.input_size
+
+            resized = np.stack([
+                np.asarray(
+                    Image.fromarray(np.ascontiguousarray(face_img, dtype=np.uint8))
+                    .resize((width, height), Image.BILINEAR)
+                )
+                for face_img in faces
+            ])
+
+            batch = torch.from_numpy(resized).permute(0, 3, 1, 2).float().div_(255.0)
+            return (batch - self.mean) / self.std
+
+    # --------------------------------------------------
+    # Prediction Logic
+    # --------------------------------------------------
+    def predict(self, image):
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images):
+
+        return self.predict_prepared(self.preprocess_batch(images))
+
+    def predict_prepared(self, prepared):
+
+        # All faces of all images are scored together
+        counts = [len(item["faces"]) for item in prepared]
+        face_scores = []
 
-        per_face_scores = []
-        fake_probs = []
+        if sum(counts) > 0:
+            face_scores = self.predict_tensors(
+                torch.cat([item["faces"] for item in prepared])
+            )
+
+        results = []
+        start = 0
+
+        for item, count in zip(prepared, counts):
+            results.append(
+                self._summarize(face_scores[start:start + count], item["faces_skipped"])
+            )
+            start += count
+
+        return results
 
-        for face_img in faces:
+    def predict_tensors(self, face_batch):
 
-            face_pil = Image.fromarray(
-                face_img.astype("uint8")
-            ).convert("RGB")
+        probs = []
 
-            face_tensor = self.transform(face_pil).unsqueeze(0).to(self.device)
+        # Chunked so hundreds of detections cannot exhaust memory
+        with span("level2.forward"), torch.no_grad():
+            for start in range(0, len(face_batch), self.face_batch_size):
+                chunk = face_batch[start:start + self.face_batch_size]
+                output = self.forward_fn(chunk.to(self.device))
+                probs.append(torch.softmax(output, dim=1).cpu())
 
-            with torch.no_grad():
-                output = self.model(face_tensor)
-                probs = torch.softmax(output, dim=1)
+        scores = []
+
+        for face_probs in torch.cat(probs):
 
             # Explicit index mapping
-            fake_prob = probs[0][0].item()  # index 0 = fake
-            real_prob = probs[0][1].item()  # index 1 = real
+            fake_prob = face_probs[0].item()  # index 0 = fake
+            real_prob = face_probs[1].item()  # index 1 = real
 
-            per_face_scores.append({
+            scores.append({
                 "real_probability": real_prob,
                 "fake_probability": fake_prob
             })
 
-            fake_probs.append(fake_prob)
+        return scores
+
+    def _summarize(self, per_face_scores, faces_skipped=0):
+
+        if len(per_face_scores) == 0:
+            return {
+                "faces_detected": 0,
+                "ai_content_percentage": None,
+                "forensic_decision": "No Face Detected",
+                "note": "Level 2 skipped."
+            }
+
+        fake_probs = [score["fake_probability"] for score in per_face_scores]
 
         max_fake = max(fake_probs)
         avg_fake = sum(fake_probs) / len(fake_probs)
@@ -139,8 +290,8 @@ class Level2FaceExpert:
         else:
             verdict = "Uncertain"
 
-        return {
-            "faces_detected": len(faces),
+        result = {
+            "faces_detected": len(per_face_scores),
             "per_face_scores": per_face_scores,
             "max_fake_probability": max_fake,
             "average_fake_probability": avg_fake,
@@ -148,3 +299,8 @@ class Level2FaceExpert:
             "forensic_decision_score": max_fake,
             "forensic_decision": verdict
         }
+
+        if faces_skipped:
+            result["faces_skipped"] = faces_skipped
+
+        return result
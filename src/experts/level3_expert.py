@@ -1,19 +1,42 @@
+import os
+
 import torch
 import torch.nn as nn
 from torchvision import models
 from torchvision.transforms import v2
-from PIL import Image
+
+from src.core.image_io import as_pyramid
+from src.core.inference_backends import load_backend
+from src.core.quantization import quantize_linear_layers
+from src.core.stage_timing import span
+
 
 class Level3SemanticExpert:
-    def __init__(self, model_path="models/level3/level3_semantic_best.pth"):
+    def __init__(self, model_path="models/level3/level3_semantic_best.pth", quantize=False, backend="eager"):
+
+        if quantize and backend != "eager":
+            raise ValueError("Quantized experts only run on the eager backend")
 
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # Quantized (INT8) kernels are CPU-only
+        self.quantize = quantize
+        self.device = torch.device("cuda" if torch.cuda.is_available() and not quantize else "cpu")
+        self.model_path = model_path
 
         self.model = self._load_model(model_path)
         self.model.eval()
 
+        # Opt-in INT8 dynamic quantization of every nn.Linear
+        if quantize:
+            self.model = quantize_linear_layers(self.model)
+
+        # eager / torchscript / onnxruntime (parity-checked against eager)
+        self.forward_fn, self.backend, self.backend_parity = load_backend(
+            "level3", self.model, backend, self.device
+        )
+
+        # Resize((224, 224)) comes from the shared ImagePyramid
+        self.input_size = (224, 224)
         self.transform = v2.Compose([
-            v2.Resize((224, 224)),
             v2.ToImage(),
             v2.ToDtype(torch.float32, scale=True),
             v2.Normalize(
@@ -25,40 +48,61 @@ class Level3SemanticExpert:
         print("✅ Level 3 Semantic Expert Loaded Successfully")
 
     def _load_model(self, model_path):
-        model = models.vit_b_16(
-            weights=models.ViT_B_16_Weights.IMAGENET1K_V1
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found at {model_path}")
+
+        # Inference-only construction: the fine-tuned checkpoint overwrites
+        # every tensor, so build the bare architecture on the meta device
+        # (no ImageNet download, no random init) and assign the checkpoint
+        # tensors directly. Works on air-gapped hosts.
+        with torch.device("meta"):
+            model = models.vit_b_16(weights=None)
+            model.heads.head = nn.Linear(model.heads.head.in_features, 2)
+
+        state_dict = torch.load(
+            model_path,
+            map_location="cpu",
+            mmap=True,
+            weights_only=True
         )
+        model.load_state_dict(state_dict, assign=True)
+
+        return model.to(self.device)
 
-        # Freeze all
-        for param in model.parameters():
-            param.requires_grad = False
+    def preprocess(self, image):
 
-        # Unfreeze last 4 blocks
-        for block in model.encoder.layers[-4:]:
-            for param in block.parameters():
-                param.requires_grad = True
+        # Accepts a path, an already-decoded image or an ImagePyramid
+        pyramid = as_pyramid(image)
 
-        # Replace head
-        model.heads.head = nn.Linear(model.heads.head.in_features, 2)
+        with span("level3.preprocess"):
+            return self.transform(pyramid.resized(self.input_size))
 
-        model.load_state_dict(torch.load(model_path, map_location=self.device))
+    def predict(self, image):
+        return self.predict_batch([image])[0]
 
-        return model.to(self.device)
+    def predict_batch(self, images):
 
-    def predict(self, image_path):
+        batch = torch.stack([self.preprocess(image) for image in images])
+        return self.predict_tensors(batch)
 
-        image = Image.open(image_path).convert("RGB")
-        image_tensor = self.transform(image).unsqueeze(0).to(self.device)
+    def predict_tensors(self, batch):
 
-        with torch.no_grad():
-            outputs = self.model(image_tensor)
+        with span("level3.forward"), torch.no_grad():
+            outputs = self.forward_fn(batch.to(self.device))
             probs = torch.softmax(outputs, dim=1)
 
-        fake_prob = probs[0][0].item()
-        real_prob = probs[0][1].item()
+        results = []
+
+        for item_probs in probs.cpu():
+
+            fake_prob = item_probs[0].item()
+            real_prob = item_probs[1].item()
+
+            results.append({
+                "real_probability": real_prob,
+                "fake_probability": fake_prob,
+                "confidence": abs(fake_prob - real_prob)
+            })
 
-        return {
-            "real_probability": real_prob,
-            "fake_probability": fake_prob,
-            "confidence": abs(fake_prob - real_prob)
-        }
\ No newline at end of file
+        return results
@@ -1,74 +1,312 @@
+import math
+
 import cv2
-import os
-import tempfile
-from src.core.ensemble_engine import EnsembleEngine
+from src.core.model_registry import get_registry
+from src.core.stage_timing import span, timing_scope
+from src.experts.face_tracker import FaceTracker
+from src.experts.frame_sampler import iter_frame_rounds, iter_frames, sample_frames
+from src.experts.perceptual_hash import FrameDeduplicator, phash
+from src.experts.video_pipeline import VideoPipeline
+
+
+class NoFramesError(ValueError):
+    # The video decoded to zero usable frames
+    pass
 
 
 class Level4VideoExpert:
 
-    def __init__(self):
+    # Video verdict thresholds
+    AI_MAX_THRESHOLD = 0.75
+    LIKELY_AI_AVG_THRESHOLD = 0.60
+    AUTHENTIC_AVG_THRESHOLD = 0.35
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size=16,
+        pipelined=True,
+        queue_depth=8,
+        dedup_distance=None,
+        face_tracking=False,
+        keyframe_interval=4
+    ):
         print("🎥 Initializing Level 4 Video Expert...")
-        self.engine = EnsembleEngine()
+        # Share the process-wide warm engine unless one is injected
+        self.engine = engine if engine is not None else get_registry().get_engine()
+        self.batch_size = batch_size
+
+        # Pipelined mode overlaps decoding, preprocessing and inference
+        self.pipelined = pipelined
+        self.queue_depth = queue_depth
+        self.last_pipeline_stats = None
+
+        # Opt-in: frames whose 64-bit perceptual hashes differ in at most
+        # dedup_distance bits reuse an already scored frame. 0 reuses
+        # only hash-identical frames; larger distances can skip a small
+        # localized edit and so may change verdicts. None = off.
+        self.dedup_distance = dedup_distance
+
+        # Face tracking: detect faces on keyframes only, follow them in
+        # between and report per-track scores (uniform sampling only;
+        # adaptive rounds are not in temporal order)
+        self.face_tracking = face_tracking
+        self.keyframe_interval = keyframe_interval
         print("✅ Level 4 Video Expert Ready\n")
 
     def extract_frames(self, video_path, max_frames=15):
-        cap = cv2.VideoCapture(video_path)
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
+        # Forward decoding; seeks only across long gaps
+        _, frames = sample_frames(video_path, max_frames=max_frames)
 
-        if total_frames == 0:
-            raise ValueError("Video contains no frames.")
+        if len(frames) == 0:
+            raise NoFramesError("Video contains no frames.")
 
-        frame_indices = []
+        return frames
 
-        if total_frames <= max_frames:
-            frame_indices = list(range(total_frames))
-        else:
-            step = total_frames // max_frames
-            frame_indices = [i * step for i in range(max_frames)]
+    def score_frames(self, frames, deduplicator=None, tracker=None, frame_indices=None):
 
-        frames = []
+        # Frames go straight from the decoder into the batched engine
+        # path: no temporary JPEGs, no lossy re-encode
+        if tracker is not None and deduplicator is None:
+            return self._score_tracked(frames, tracker, frame_indices)
 
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
+        if deduplicator is None:
+            rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+            results = self.engine.analyze_batch(rgb_frames, batch_size=self.batch_size)
 
-            if ret:
-                frames.append(frame)
+            return [result["final_fake_probability"] for result in results]
 
-        cap.release()
-        return frames
+        # Only the first frame of each near-duplicate group is scored
+        if frame_indices is None:
+            frame_indices = list(range(len(frames)))
+
+        cells = []
+        unique = []
+
+        for frame, frame_index in zip(frames, frame_indices):
+            with span("video.dedup"):
+                cell, duplicate = deduplicator.lookup(phash(frame))
+
+            cells.append(cell)
+
+            if not duplicate:
+                unique.append((frame, frame_index, cell))
+
+        if unique:
+            scores = self.score_frames(
+                [frame for frame, _, _ in unique],
+                tracker=tracker,
+                frame_indices=[frame_index for _, frame_index, _ in unique]
+            )
+
+            for (_, _, cell), score in zip(unique, scores):
+                cell[0] = score
+
+        return [cell[0] for cell in cells]
+
+    def _score_tracked(self, frames, tracker, frame_indices=None):
+
+        if frame_indices is None:
+            frame_indices = list(range(len(frames)))
+
+        scores = []
+
+        for start in range(0, len(frames), self.batch_size):
+
+            prepared = []
+            track_ids = []
+
+            for frame in frames[start:start + self.batch_size]:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+                with span("video.track"):
+                    tracks = tracker.update(rgb)
+
+                track_ids.append([track_id for track_id, _ in tracks])
+                prepared.append(self.engine.prepare(rgb, face_boxes=[box for _, box in tracks]))
+
+            results = self.engine.analyze_prepared(prepared)
+
+            for frame_index, ids, result in zip(frame_indices[start:], track_ids, results):
+                tracker.add_scores(frame_index, ids, result["level2_details"])
+                scores.append(result["final_fake_probability"])
+
+        return scores
+
+    def _new_tracker(self):
+
+        if not self.face_tracking:
+            return None
+
+        level2 = self.engine.level2
+
+        return FaceTracker(
+            lambda rgb: level2.detect_boxes(rgb)[0],
+            keyframe_interval=self.keyframe_interval
+        )
+
+    def _new_deduplicator(self):
+
+        if self.dedup_distance is None:
+            return None
 
-    def analyze(self, video_path):
+        return FrameDeduplicator(max_distance=self.dedup_distance)
+
+    def analyze(self, video_path, max_frames=15, adaptive=False, min_frames=4):
 
         print(f"📂 Processing Video: {video_path}\n")
 
-        frames = self.extract_frames(video_path)
+        # Stage spans of the whole video (engine stages included) when
+        # the engine has timings enabled
+        with timing_scope("video.analyze", getattr(self.engine, "timings", False)) as timings:
+
+            if adaptive:
+                result = self.analyze_adaptive(video_path, min_frames=min_frames, max_frames=max_frames)
+            else:
+                result = self._analyze_uniform(video_path, max_frames)
+
+        if timings is not None:
+            result["timings"] = timings.summary()
+
+        return result
+
+    def _analyze_uniform(self, video_path, max_frames):
+
+        deduplicator = self._new_deduplicator()
+        tracker = self._new_tracker()
+
+        if self.pipelined:
+            pipeline = VideoPipeline(
+                self.engine,
+                queue_depth=self.queue_depth,
+                batch_size=self.batch_size,
+                deduplicator=deduplicator,
+                tracker=tracker
+            )
+            results = pipeline.run(iter_frames(video_path, max_frames=max_frames))
+            frame_scores = [result["final_fake_probability"] for _, result in results]
+            self.last_pipeline_stats = pipeline.stats()
+
+            if tracker is not None:
+                for frame_index, frame_result in results:
+                    if frame_index in pipeline.face_tracks:
+                        tracker.add_scores(
+                            frame_index,
+                            pipeline.face_tracks[frame_index],
+                            frame_result["level2_details"]
+                        )
+
+        else:
+            with span("video.decode"):
+                frame_indices, frames = sample_frames(video_path, max_frames=max_frames)
+
+            if len(frames) == 0:
+                raise NoFramesError("Video contains no frames.")
+
+            frame_scores = self.score_frames(frames, deduplicator, tracker, frame_indices)
+
+        result = self._build_result(frame_scores, deduplicator)
+        result["pipeline_stats"] = self.last_pipeline_stats if self.pipelined else None
+
+        if tracker is not None:
+            result["face_tracks"] = tracker.summary()
+            result["face_keyframes"] = tracker.keyframes
+            result["face_redetections"] = tracker.redetections
+
+        return result
+
+    # --------------------------------------------------
+    # Adaptive Sampling with Early Verdict Termination
+    # --------------------------------------------------
+    # Frames are scored in coarse-to-fine rounds spread over the whole
+    # clip (min_frames, then doubling up to max_frames). Sampling stops
+    # as soon as the verdict can no longer plausibly change: clear-cut
+    # videos finish after a few frames, borderline ones use the budget.
+    def analyze_adaptive(self, video_path, min_frames=4, max_frames=32, z=1.96):
 
         frame_scores = []
+        settled, reason = False, None
+        deduplicator = self._new_deduplicator()
+
+        rounds = iter_frame_rounds(video_path, min_frames=min_frames, max_frames=max_frames)
+
+        while True:
+
+            with span("video.decode"):
+                round_frames = next(rounds, None)
+
+            if round_frames is None:
+                break
+
+            frame_scores.extend(
+                self.score_frames([frame for _, frame in round_frames], deduplicator)
+            )
+
+            settled, reason = self._verdict_settled(frame_scores, z)
+
+            if settled:
+                break
+
+        # Release the capture before building the result
+        rounds.close()
+
+        result = self._build_result(frame_scores, deduplicator)
+        result.update({
+            "sampling": "adaptive",
+            "stopped_early": settled and len(frame_scores) < max_frames,
+            "stop_reason": reason if settled else "Frame budget exhausted",
+        })
+
+        return result
+
+    def _verdict_settled(self, frame_scores, z):
+
+        n = len(frame_scores)
+
+        # The max never decreases: once above the threshold it is final
+        if max(frame_scores) > self.AI_MAX_THRESHOLD:
+            return True, "Max frame probability above AI threshold"
+
+        if n < 2:
+            return False, None
+
+        mean = sum(frame_scores) / n
+        variance = sum((score - mean) ** 2 for score in frame_scores) / (n - 1)
+
+        # Floor keeps a few near-identical frames from looking certain
+        std = max(math.sqrt(variance), 0.02)
+
+        # Mean must sit clear of the average-based thresholds...
+        margin = z * std / math.sqrt(n)
+        low, high = mean - margin, mean + margin
+
+        for threshold in (self.AUTHENTIC_AVG_THRESHOLD, self.LIKELY_AI_AVG_THRESHOLD):
+            if low <= threshold <= high:
+                return False, None
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        # ...and an unseen frame is unlikely to cross the max threshold
+        if mean + z * std * math.sqrt(1 + 1 / n) >= self.AI_MAX_THRESHOLD:
+            return False, None
 
-            for i, frame in enumerate(frames):
-                frame_path = os.path.join(temp_dir, f"frame_{i}.jpg")
-                cv2.imwrite(frame_path, frame)
+        return True, f"Verdict settled after {n} frames"
 
-                result = self.engine.analyze(frame_path)
-                frame_scores.append(result["final_fake_probability"])
+    # --------------------------------------------------
+    # Final Video Verdict
+    # --------------------------------------------------
+    def _build_result(self, frame_scores, deduplicator=None):
 
         if len(frame_scores) == 0:
-            raise ValueError("No frames processed.")
+            raise NoFramesError("No frames processed.")
 
         max_fake = max(frame_scores)
         avg_fake = sum(frame_scores) / len(frame_scores)
 
-        # Final Video Verdict
-        if max_fake > 0.75:
+        if max_fake > self.AI_MAX_THRESHOLD:
             verdict = "AI Generated"
-        elif avg_fake > 0.60:
+        elif avg_fake > self.LIKELY_AI_AVG_THRESHOLD:
             verdict = "Likely AI"
-        elif avg_fake < 0.35:
+        elif avg_fake < self.AUTHENTIC_AVG_THRESHOLD:
             verdict = "Authentic"
         else:
             verdict = "Uncertain"
@@ -78,5 +316,6 @@ class Level4VideoExpert:
             "max_frame_fake_probability": max_fake,
             "average_frame_fake_probability": avg_fake,
             "video_ai_percentage": avg_fake * 100,
+            "frames_deduplicated": deduplicator.deduplicated if deduplicator else 0,
             "verdict": verdict
-        }
\ No newline at end of file
+        }
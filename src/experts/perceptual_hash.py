@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+
+
+# -------------------------------------------------
+# DCT Perceptual Hash (64-bit)
+# -------------------------------------------------
+# Frame -> 32x32 gray -> 2D DCT (two matrix products) -> top-left 8x8
+# low frequencies -> bit = coefficient > median.
+
+HASH_SIZE = 8
+SAMPLE_SIZE = 32
+
+
+def _dct_matrix(n):
+
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0, :] = np.sqrt(1.0 / n)
+
+    return matrix.astype(np.float32)
+
+
+_DCT = _dct_matrix(SAMPLE_SIZE)
+_BIT_WEIGHTS = (np.uint64(1) << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64))
+
+
+def phash(frame, is_bgr=True):
+
+    if frame.ndim == 3:
+        code = cv2.COLOR_BGR2GRAY if is_bgr else cv2.COLOR_RGB2GRAY
+        frame = cv2.cvtColor(frame, code)
+
+    small = cv2.resize(frame, (SAMPLE_SIZE, SAMPLE_SIZE), interpolation=cv2.INTER_AREA)
+    coeffs = _DCT @ small.astype(np.float32) @ _DCT.T
+
+    low = coeffs[:HASH_SIZE, :HASH_SIZE].ravel()
+
+    # Median without the DC term, which only encodes brightness
+    bits = low > np.median(low[1:])
+
+    return np.uint64(np.sum(_BIT_WEIGHTS[bits], dtype=np.uint64))
+
+
+# -------------------------------------------------
+# Near-Duplicate Lookup
+# -------------------------------------------------
+class FrameDeduplicator:
+
+    def __init__(self, max_distance=4):
+
+        self.max_distance = max_distance
+        self.deduplicated = 0
+
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._cells = []
+
+    def lookup(self, frame_hash):
+
+        # Returns the result cell of a near-identical frame already seen,
+        # otherwise registers a new empty cell for this frame.
+        # Cells are one-element lists filled once the frame is scored.
+        if len(self._hashes):
+            distances = np.bitwise_count(self._hashes ^ frame_hash)
+            nearest = int(np.argmin(distances))
+
+            if distances[nearest] <= self.max_distance:
+                self.deduplicated += 1
+                return self._cells[nearest], True
+
+        cell = [None]
+
+        self._hashes = np.append(self._hashes, np.uint64(frame_hash))
+        self._cells.append(cell)
+
+        return cell, False
@@ -0,0 +1,365 @@
+import contextvars
+import queue
+import threading
+import time
+
+import cv2
+
+from src.core.stage_timing import span
+from src.experts.perceptual_hash import phash
+
+_END = object()
+
+
+# =========================================================
+# STREAMING VIDEO PIPELINE
+# =========================================================
+#   decode thread ──► frame queue ──► preprocess thread ──► prepared queue ──► inference (caller thread)
+#
+# Both queues are bounded (queue_depth), so a slow inference stage
+# applies back-pressure instead of buffering the whole video. The
+# inference stage pulls micro-batches of up to batch_size prepared
+# frames and runs one batched forward pass per expert.
+#
+# With a deduplicator, near-duplicate frames (perceptual hash) never
+# reach the inference queue; they reuse the result of the matching
+# frame once it has been scored.
+#
+# With a FaceTracker, Level 2 uses tracked face boxes instead of
+# per-frame detection; these results bypass the cache because the
+# boxes depend on the preceding frames.
+
+class StageStats:
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.get_stalls = 0
+        self.get_stall_seconds = 0.0
+        self.put_stalls = 0
+        self.put_stall_seconds = 0.0
+
+    def as_dict(self, wall_seconds):
+        return {
+            "items": self.items,
+            "busy_seconds": self.busy_seconds,
+            "utilisation": self.busy_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+            "get_stalls": self.get_stalls,
+            "get_stall_seconds": self.get_stall_seconds,
+            "put_stalls": self.put_stalls,
+            "put_stall_seconds": self.put_stall_seconds,
+        }
+
+
+class VideoPipeline:
+
+    def __init__(self, engine, queue_depth=8, batch_size=8, cascade=None, deduplicator=None, tracker=None):
+
+        if queue_depth < 1 or batch_size < 1:
+            raise ValueError("queue_depth and batch_size must be >= 1")
+
+        self.engine = engine
+        self.queue_depth = queue_depth
+        self.batch_size = batch_size
+        self.cascade = cascade
+        self.deduplicator = deduplicator
+        self.tracker = tracker
+
+        # frame_index -> track ids, in Level 2 per-face order
+        self.face_tracks = {}
+
+        self._stats = {}
+        self._wall_seconds = 0.0
+        self._batch_sizes = []
+        self._duplicates = []
+
+    # --------------------------------------------------
+    # Run
+    # --------------------------------------------------
+    def run(self, frames):
+
+        # frames: iterable of (frame_index, BGR frame), e.g. iter_frames();
+        # it is consumed on the decode thread.
+        # Returns [(frame_index, engine_result)] in frame order.
+        frame_queue = queue.Queue(maxsize=self.queue_depth)
+        prepared_queue = queue.Queue(maxsize=self.queue_depth)
+
+        self._stats = {
+            name: StageStats(name) for name in ("decode", "preprocess", "inference")
+        }
+        self._batch_sizes = []
+        self._abort = threading.Event()
+        self._errors = []
+        self._duplicates = []
+        self.face_tracks = {}
+
+        workers = [
+            # Stage threads run in a copy of the caller's context so their
+            # timing spans reach the caller's timing_scope
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._decode_stage, frames, frame_queue),
+                name="video-decode",
+                daemon=True
+            ),
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._preprocess_stage, frame_queue, prepared_queue),
+                name="video-preprocess",
+                daemon=True
+            ),
+        ]
+
+        start = time.perf_counter()
+
+        for worker in workers:
+            worker.start()
+
+        try:
+            results = self._inference_stage(prepared_queue)
+        except BaseException:
+            self._abort.set()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+            self._wall_seconds = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+
+        # Every matched frame was queued before its duplicates, so all
+        # cells are filled by now
+        results.extend((index, cell[0]) for index, cell in self._duplicates)
+
+        return sorted(results, key=lambda item: item[0])
+
+    def stats(self):
+
+        batch_sizes = self._batch_sizes
+
+        return {
+            "wall_seconds": self._wall_seconds,
+            "queue_depth": self.queue_depth,
+            "max_batch_size": self.batch_size,
+            "batches": len(batch_sizes),
+            "mean_batch_size": sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0.0,
+            "frames_deduplicated": len(self._duplicates),
+            "stages": {
+                name: stage.as_dict(self._wall_seconds)
+                for name, stage in self._stats.items()
+            },
+        }
+
+    # --------------------------------------------------
+    # Stages
+    # --------------------------------------------------
+    def _decode_stage(self, frames, out_queue):
+
+        stats = self._stats["decode"]
+        iterator = iter(frames)
+
+        try:
+
+            while not self._abort.is_set():
+
+                start = time.perf_counter()
+
+                with span("video.decode"):
+                    item = next(iterator, _END)
+
+                stats.busy_seconds += time.perf_counter() - start
+
+                if item is _END:
+                    break
+
+                stats.items += 1
+                self._put(out_queue, item, stats)
+
+        except Exception as error:
+            self._fail(error)
+
+        finally:
+            # Release the decoder even when stopping early
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+            self._put(out_queue, _END, stats, force=True)
+
+    def _preprocess_stage(self, in_queue, out_queue):
+
+        stats = self._stats["preprocess"]
+
+        try:
+            while True:
+
+                item = self._get(in_queue, stats)
+
+                if item is _END:
+                    break
+
+                start = time.perf_counter()
+
+                index, frame = item
+                cell = None
+
+                if self.deduplicator is not None:
+                    with span("video.dedup"):
+                        cell, duplicate = self.deduplicator.lookup(phash(frame))
+
+                    if duplicate:
+                        self._duplicates.append((index, cell))
+                        stats.busy_seconds += time.perf_counter() - start
+                        stats.items += 1
+                        continue
+
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+                if self.tracker is not None:
+                    with span("video.track"):
+                        tracks = self.tracker.update(rgb)
+                    self.face_tracks[index] = [track_id for track_id, _ in tracks]
+
+                    prepared = self.engine.prepare(rgb, face_boxes=[box for _, box in tracks])
+                    prepared_item = (index, None, prepared, None, cell)
+
+                    stats.busy_seconds += time.perf_counter() - start
+                    stats.items += 1
+
+                    self._put(out_queue, prepared_item, stats)
+                    continue
+
+                key, rgb, cached = self.engine.cache_lookup(rgb, cascade=self.cascade)
+
+                if cached is not None:
+                    prepared_item = (index, key, None, cached, cell)
+                else:
+                    prepared_item = (index, key, self.engine.prepare(rgb), None, cell)
+
+                stats.busy_seconds += time.perf_counter() - start
+                stats.items += 1
+
+                self._put(out_queue, prepared_item, stats)
+
+        except Exception as error:
+            self._fail(error)
+
+        finally:
+            self._put(out_queue, _END, stats, force=True)
+
+    def _inference_stage(self, in_queue):
+
+        stats = self._stats["inference"]
+        results = []
+        finished = False
+
+        while not finished:
+
+            # Block for the first item, then drain up to batch_size
+            batch = []
+            item = self._get(in_queue, stats)
+
+            while item is not _END:
+                batch.append(item)
+
+                if len(batch) >= self.batch_size:
+                    break
+
+                try:
+                    item = in_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            finished = item is _END
+
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+
+            pending = [entry for entry in batch if entry[3] is None]
+
+            for index, _, _, cached, cell in batch:
+                if cached is not None:
+                    results.append((index, cached))
+
+                    if cell is not None:
+                        cell[0] = cached
+
+            if pending:
+                self._batch_sizes.append(len(pending))
+
+                pending_results = self.engine.analyze_prepared(
+                    [entry[2] for entry in pending],
+                    cascade=self.cascade
+                )
+
+                for (index, key, _, _, cell), result in zip(pending, pending_results):
+                    results.append((index, result))
+
+                    if cell is not None:
+                        cell[0] = result
+
+                    if key is not None:
+                        self.engine.cache.put(key, result)
+
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += len(batch)
+
+        return results
+
+    # --------------------------------------------------
+    # Queue helpers (stall accounting + abort awareness)
+    # --------------------------------------------------
+    def _put(self, target_queue, item, stats, force=False):
+
+        try:
+            target_queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        stats.put_stalls += 1
+        start = time.perf_counter()
+
+        while True:
+            try:
+                target_queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                # On abort the consumer may be gone; only the end
+                # marker keeps trying so downstream stages can exit
+                if self._abort.is_set() and not force:
+                    break
+                if self._abort.is_set() and force:
+                    self._drain(target_queue)
+
+        stats.put_stall_seconds += time.perf_counter() - start
+
+    def _get(self, source_queue, stats):
+
+        try:
+            return source_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        stats.get_stalls += 1
+        start = time.perf_counter()
+
+        item = source_queue.get()
+
+        stats.get_stall_seconds += time.perf_counter() - start
+        return item
+
+    def _drain(self, target_queue):
+
+        try:
+            while True:
+                target_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _fail(self, error):
+        self._errors.append(error)
+        self._abort.set()
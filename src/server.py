@@ -0,0 +1,470 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import tornado.ioloop
+import tornado.web
+from tornado.log import app_log
+
+from src.core.inference_backends import parse_backends
+from src.core.model_registry import get_registry
+from src.core.profiling import process_rss_bytes
+from src.core.request_batcher import MicroBatcher
+from src.core.stage_timing import stage_histograms_json, stage_histograms_prometheus
+
+
+# =========================================================
+# LOCAL HTTP INFERENCE SERVICE
+# =========================================================
+#   python -m src.server --port 8000
+#
+#   POST /v1/images/analyze          raw image bytes -> EnsembleEngine result
+#   POST /v1/videos                  raw video bytes -> 202 {"job_id": ...}
+#   GET  /v1/videos/<job_id>         job status
+#   GET  /v1/videos/<job_id>/result  video result (409 until finished)
+#   GET  /healthz                    process is up
+#   GET  /readyz                     200 once every expert is loaded
+#   GET  /stats                      micro-batching + stage histograms, job counts
+#   GET  /metrics                    stage histograms, Prometheus text format
+#                                    (stages are timed with --timings)
+#
+# Request bodies are streamed to a temporary file chunk by chunk, so
+# a large video never sits in memory. All handlers share the engine of
+# the process-wide model registry (one set of loaded models).
+# Concurrent image requests are coalesced into batched forward passes
+# by a MicroBatcher.
+#
+#   curl --data-binary @photo.jpg localhost:8000/v1/images/analyze
+
+MAX_IMAGE_BYTES = 64 * 1024 ** 2
+MAX_VIDEO_BYTES = 4 * 1024 ** 3
+
+
+# --------------------------------------------------
+# Video Job Store
+# --------------------------------------------------
+class JobStore:
+
+    def __init__(self, max_finished=256):
+
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, options):
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "options": options,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "result": None,
+        }
+
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._evict()
+
+        return job
+
+    def get(self, job_id):
+
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id, **fields):
+
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def counts(self):
+
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def _evict(self):
+
+        # Oldest finished jobs go first; queued/running jobs are kept
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("done", "failed")
+        ]
+
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+def public_job(job):
+    return {key: value for key, value in job.items() if key not in ("result", "options")}
+
+
+# --------------------------------------------------
+# Base Handlers
+# --------------------------------------------------
+class JSONHandler(tornado.web.RequestHandler):
+
+    def initialize(self, service):
+        self.service = service
+
+    def write_json(self, payload, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(payload))
+
+    def write_error(self, status_code, **kwargs):
+
+        message = self._reason
+
+        if "exc_info" in kwargs:
+            error = kwargs["exc_info"][1]
+            if isinstance(error, tornado.web.HTTPError) and error.log_message:
+                message = error.log_message
+
+        self.write_json({"error": message}, status=status_code)
+
+    def query_flag(self, name, default=False):
+
+        value = self.get_query_argument(name, None)
+
+        if value is None:
+            return default
+
+        return value.lower() in ("1", "true", "yes")
+
+    def query_int(self, name, default):
+
+        value = self.get_query_argument(name, None)
+
+        if value is None:
+            return default
+
+        try:
+            return int(value)
+        except ValueError:
+            raise tornado.web.HTTPError(400, f"Query parameter '{name}' must be an integer")
+
+
+@tornado.web.stream_request_body
+class UploadHandler(JSONHandler):
+
+    # Subclasses set the size limit and the temp file suffix
+    MAX_BYTES = MAX_IMAGE_BYTES
+    SUFFIX = ""
+
+    def prepare(self):
+
+        self.request.connection.set_max_body_size(self.MAX_BYTES)
+
+        self.upload = tempfile.NamedTemporaryFile(
+            prefix="upload_",
+            suffix=self.SUFFIX,
+            dir=self.service.upload_dir,
+            delete=False
+        )
+        self.upload_bytes = 0
+
+    def data_received(self, chunk):
+        self.upload.write(chunk)
+        self.upload_bytes += len(chunk)
+
+    def on_finish(self):
+        self._discard_upload()
+
+    def on_connection_close(self):
+        self._discard_upload()
+
+    def take_upload(self):
+
+        # Closes the temp file and hands ownership to the caller
+        if self.upload_bytes == 0:
+            raise tornado.web.HTTPError(400, "Empty request body")
+
+        self.upload.close()
+        path = self.upload.name
+        self.upload = None
+
+        return path
+
+    def _discard_upload(self):
+
+        upload = getattr(self, "upload", None)
+
+        if upload is not None:
+            upload.close()
+            if os.path.exists(upload.name):
+                os.remove(upload.name)
+            self.upload = None
+
+
+# --------------------------------------------------
+# Images (synchronous)
+# --------------------------------------------------
+class ImageAnalyzeHandler(UploadHandler):
+
+    MAX_BYTES = MAX_IMAGE_BYTES
+
+    async def post(self):
+
+        path = self.take_upload()
+        cascade = self.query_flag("cascade", default=None)
+
+        try:
+            result = await asyncio.wrap_future(
+                self.service.batcher.submit(path, cascade=cascade)
+            )
+        except (OSError, ValueError) as error:
+            # Undecodable, truncated or corrupt uploads are client errors
+            # (UnidentifiedImageError is an OSError). Decoder messages
+            # include the temp upload path: log them only
+            app_log.warning("Rejected image upload: %s", error)
+            raise tornado.web.HTTPError(400, "Invalid image")
+        finally:
+            os.remove(path)
+
+        self.write_json(result)
+
+
+# --------------------------------------------------
+# Videos (asynchronous jobs)
+# --------------------------------------------------
+class VideoSubmitHandler(UploadHandler):
+
+    MAX_BYTES = MAX_VIDEO_BYTES
+    SUFFIX = ".mp4"
+
+    def post(self):
+
+        options = {
+            "max_frames": self.query_int("max_frames", 15),
+            "adaptive": self.query_flag("adaptive"),
+            "min_frames": self.query_int("min_frames", 4),
+        }
+
+        path = self.take_upload()
+        job = self.service.submit_video(path, options)
+
+        self.set_header("Location", f"/v1/videos/{job['job_id']}")
+        self.write_json(public_job(job), status=202)
+
+
+class VideoStatusHandler(JSONHandler):
+
+    def get(self, job_id):
+
+        job = self.service.jobs.get(job_id)
+
+        if job is None:
+            raise tornado.web.HTTPError(404, "Unknown job")
+
+        self.write_json(public_job(job))
+
+
+class VideoResultHandler(JSONHandler):
+
+    def get(self, job_id):
+
+        job = self.service.jobs.get(job_id)
+
+        if job is None:
+            raise tornado.web.HTTPError(404, "Unknown job")
+
+        if job["status"] == "failed":
+            self.write_json(public_job(job), status=500)
+        elif job["status"] != "done":
+            self.write_json(public_job(job), status=409)
+        else:
+            self.write_json(job["result"])
+
+
+# --------------------------------------------------
+# Health / Readiness
+# --------------------------------------------------
+class HealthHandler(JSONHandler):
+
+    def get(self):
+        self.write_json({"status": "ok", "uptime_seconds": time.time() - self.service.started})
+
+
+class StatsHandler(JSONHandler):
+
+    def get(self):
+        self.write_json({
+            "batching": self.service.batcher.stats(),
+            "stages": stage_histograms_json(),
+            "video_jobs": self.service.jobs.counts(),
+        })
+
+
+class MetricsHandler(JSONHandler):
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.finish(stage_histograms_prometheus())
+
+
+class ReadyHandler(JSONHandler):
+
+    def get(self):
+
+        # Never blocks on a model load in progress (no registry lock)
+        experts = get_registry().loaded_experts()
+        warm = all(experts.values())
+
+        self.write_json(
+            {
+                "ready": warm,
+                "experts": experts,
+                "video_jobs": self.service.jobs.counts(),
+                "process_rss_bytes": process_rss_bytes(),
+            },
+            status=200 if warm else 503
+        )
+
+
+# --------------------------------------------------
+# Service
+# --------------------------------------------------
+class InferenceService:
+
+    def __init__(self, max_batch=16, max_wait_ms=5.0, video_workers=1, upload_dir=None):
+
+        self.registry = get_registry()
+        self.jobs = JobStore()
+        self.upload_dir = upload_dir
+        self.started = time.time()
+
+        # Image requests are micro-batched; videos get their own workers
+        # so a long job cannot starve synchronous image requests
+        self.batcher = MicroBatcher(
+            self.registry.get_engine(),
+            max_wait_ms=max_wait_ms,
+            max_batch=max_batch
+        )
+        self.video_executor = ThreadPoolExecutor(video_workers, thread_name_prefix="video")
+
+        self._video_expert = None
+        self._video_lock = threading.Lock()
+
+    def warm_up(self):
+        self.registry.preload()
+        self.registry.get_engine()
+
+    def submit_video(self, path, options):
+
+        job = self.jobs.create(options)
+        self.video_executor.submit(self._run_video_job, job["job_id"], path, options)
+
+        return job
+
+    def _run_video_job(self, job_id, path, options):
+
+        self.jobs.update(job_id, status="running", started=time.time())
+
+        try:
+            result = self._get_video_expert().analyze(path, **options)
+            self.jobs.update(job_id, status="done", result=result, finished=time.time())
+
+        except Exception:
+            # Details (which name the temp upload path) stay in the log
+            app_log.exception("Video job %s failed", job_id)
+            self.jobs.update(
+                job_id,
+                status="failed",
+                error="Could not analyze video",
+                finished=time.time()
+            )
+
+        finally:
+            os.remove(path)
+
+    def _get_video_expert(self):
+
+        from src.experts.level4_video_expert import Level4VideoExpert
+
+        with self._video_lock:
+            if self._video_expert is None:
+                self._video_expert = Level4VideoExpert(engine=self.registry.get_engine())
+
+            return self._video_expert
+
+    def make_app(self):
+
+        handler_args = {"service": self}
+
+        return tornado.web.Application([
+            (r"/v1/images/analyze", ImageAnalyzeHandler, handler_args),
+            (r"/v1/videos", VideoSubmitHandler, handler_args),
+            (r"/v1/videos/([0-9a-f]+)", VideoStatusHandler, handler_args),
+            (r"/v1/videos/([0-9a-f]+)/result", VideoResultHandler, handler_args),
+            (r"/healthz", HealthHandler, handler_args),
+            (r"/stats", StatsHandler, handler_args),
+            (r"/metrics", MetricsHandler, handler_args),
+            (r"/readyz", ReadyHandler, handler_args),
+        ])
+
+    def shutdown(self):
+        self.batcher.close()
+        self.video_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog="python -m src.server", description="Local inference HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=16, help="Images per coalesced batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Longest wait to fill a batch")
+    parser.add_argument("--video-workers", type=int, default=1)
+    parser.add_argument("--upload-dir", default=None, help="Temp directory for streamed uploads")
+    parser.add_argument("--quantize", default=None, help="INT8 experts, e.g. level2,level3")
+    parser.add_argument("--backends", default=None, help="e.g. level1=torchscript,level3=onnxruntime")
+    parser.add_argument("--timings", action="store_true", help="Per-stage timings in results and /metrics")
+    parser.add_argument("--no-preload", action="store_true", help="Load models on first request")
+    args = parser.parse_args(argv)
+
+    if args.quantize is not None:
+        get_registry().set_quantize([name for name in args.quantize.split(",") if name])
+
+    if args.backends is not None:
+        get_registry().set_backends(parse_backends(args.backends))
+
+    if args.timings:
+        get_registry().get_engine().timings = True
+
+    service = InferenceService(
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        video_workers=args.video_workers,
+        upload_dir=args.upload_dir
+    )
+
+    app = service.make_app()
+    app.listen(args.port, address=args.host, max_body_size=MAX_VIDEO_BYTES)
+
+    # Warm up in the background; /readyz turns 200 once models are loaded
+    if not args.no_preload:
+        threading.Thread(target=service.warm_up, name="warm-up", daemon=True).start()
+
+    print(f"🌐 Serving on http://{args.host}:{args.port}")
+
+    try:
+        tornado.ioloop.IOLoop.current().start()
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+
+from src.cli import load_completed
+
+
+def write_records(path, records, tail=b""):
+
+    with open(path, "wb") as f:
+        for record in records:
+            f.write(json.dumps(record).encode() + b"\n")
+        f.write(tail)
+
+    return str(path)
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_missing_output_file(tmp_path):
+    assert load_completed(str(tmp_path / "results.jsonl")) == set()
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+
+    path = write_records(
+        tmp_path / "results.jsonl",
+        [{"path": "a.jpg", "verdict": 0.1}, {"path": "b.jpg", "verdict": 0.9}],
+        tail=b'{"path": "c.jpg", "verd'
+    )
+
+    assert load_completed(path) == {"a.jpg", "b.jpg"}
+    assert [record["path"] for record in read_records(path)] == ["a.jpg", "b.jpg"]
+
+    # Appending after the cut starts on a fresh line
+    with open(path, "a") as f:
+        f.write(json.dumps({"path": "c.jpg"}) + "\n")
+
+    assert load_completed(path) == {"a.jpg", "b.jpg", "c.jpg"}
+
+
+def test_error_records_count_as_done_without_retry(tmp_path):
+
+    records = [{"path": "a.jpg", "verdict": 0.1}, {"path": "b.jpg", "error": "boom"}]
+    path = write_records(tmp_path / "results.jsonl", records)
+
+    assert load_completed(path) == {"a.jpg", "b.jpg"}
+    assert read_records(path) == records
+
+
+def test_retry_errors_drops_error_records(tmp_path):
+
+    path = write_records(
+        tmp_path / "results.jsonl",
+        [
+            {"path": "a.jpg", "verdict": 0.1},
+            {"path": "b.jpg", "error": "boom"},
+            {"path": "c.jpg", "verdict": 0.5},
+        ]
+    )
+
+    assert load_completed(path, retry_errors=True) == {"a.jpg", "c.jpg"}
+    assert [record["path"] for record in read_records(path)] == ["a.jpg", "c.jpg"]
+    assert not (tmp_path / "results.jsonl.tmp").exists()
+
+
+def test_later_records_supersede_earlier_ones(tmp_path):
+
+    path = write_records(
+        tmp_path / "results.jsonl",
+        [
+            {"path": "a.jpg", "error": "boom"},
+            {"path": "b.jpg", "verdict": 0.2},
+            {"path": "a.jpg", "verdict": 0.7},
+            {"path": "c.jpg", "verdict": 0.3},
+            {"path": "c.jpg", "error": "boom"},
+        ]
+    )
+
+    # A retried success counts; a later failure is retried again
+    assert load_completed(path, retry_errors=True) == {"a.jpg", "b.jpg"}
+    assert read_records(path) == [{"path": "b.jpg", "verdict": 0.2}, {"path": "a.jpg", "verdict": 0.7}]
+
+
+def test_retry_errors_leaves_clean_files_alone(tmp_path):
+
+    path = write_records(tmp_path / "results.jsonl", [{"path": "a.jpg", "verdict": 0.1}])
+    before = (tmp_path / "results.jsonl").stat().st_mtime_ns
+
+    assert load_completed(path, retry_errors=True) == {"a.jpg"}
+    assert (tmp_path / "results.jsonl").stat().st_mtime_ns == before
@@ -0,0 +1,230 @@
+import numpy as np
+import pytest
+
+from src.core.ensemble_engine import EnsembleEngine
+
+
+# --------------------------------------------------
+# Stub experts: deterministic scores from the pixels
+# --------------------------------------------------
+def pixel_score(image, channel):
+    return float(image.array[..., channel].mean()) / 255.0
+
+
+class StubLevel1:
+
+    def predict(self, image, tiling=None):
+        return {"fake_probability": pixel_score(image, 0)}
+
+    def predict_batch(self, images, tiling=None):
+        return [self.predict(image, tiling) for image in images]
+
+
+class StubLevel2:
+
+    # Images with a bright top-left pixel "contain a face"
+    def predict(self, image):
+
+        if image.array[0, 0, 0] < 128:
+            return {"faces_detected": 0}
+
+        return {"faces_detected": 1, "max_fake_probability": pixel_score(image, 1)}
+
+    def predict_batch(self, images):
+        return [self.predict(image) for image in images]
+
+
+class StubLevel3:
+
+    def __init__(self):
+        self.items = 0
+
+    def predict(self, image):
+        self.items += 1
+        return {"fake_probability": pixel_score(image, 2)}
+
+    def predict_batch(self, images):
+        return [self.predict(image) for image in images]
+
+
+class FixedExpert:
+
+    # Level 1 / 2 / 3 stand-in returning preset results
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def predict(self, image, tiling=None):
+        self.calls += 1
+        return dict(self.result)
+
+
+def stub_engine(**options):
+    return EnsembleEngine(level1=StubLevel1(), level2=StubLevel2(), level3=StubLevel3(), **options)
+
+
+def images(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 255, (24, 32, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def level2_result(max_fake):
+
+    if max_fake is None:
+        return {"faces_detected": 0}
+
+    return {"faces_detected": 1, "max_fake_probability": max_fake}
+
+
+# --------------------------------------------------
+# analyze_batch
+# --------------------------------------------------
+@pytest.mark.parametrize("cascade", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 3, 16])
+def test_analyze_batch_matches_analyze_image(cascade, batch_size):
+
+    engine = stub_engine()
+    inputs = images(7)
+
+    batched = engine.analyze_batch(inputs, batch_size=batch_size, cascade=cascade)
+    single = [engine.analyze_image(image, cascade=cascade) for image in inputs]
+
+    assert batched == single
+
+
+def test_analyze_batch_accepts_iterators_and_keeps_order():
+
+    engine = stub_engine()
+    inputs = images(5, seed=1)
+
+    batched = engine.analyze_batch(iter(inputs), batch_size=2)
+
+    assert [result["level1_details"] for result in batched] == [
+        engine.analyze_image(image)["level1_details"] for image in inputs
+    ]
+
+
+def test_analyze_batch_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        stub_engine().analyze_batch(images(1), batch_size=0)
+
+
+def test_cascade_batch_runs_level3_only_for_undecided_items():
+
+    engine = stub_engine()
+    inputs = images(12, seed=2)
+
+    results = engine.analyze_batch(inputs, batch_size=4, cascade=True)
+    undecided = sum(result["level3_details"] is not None for result in results)
+
+    assert engine.level3.items == undecided
+
+
+# --------------------------------------------------
+# Cascade exit bounds
+# --------------------------------------------------
+def early_exit(engine, l1_fake, l2_fake):
+    return engine._early_exit({"fake_probability": l1_fake}, level2_result(l2_fake))
+
+
+def fused(engine, l1_fake, l2_fake, l3_fake):
+    return engine._fuse({"fake_probability": l1_fake}, level2_result(l2_fake), {"fake_probability": l3_fake})
+
+
+@pytest.mark.parametrize("l2_fake", [None, 0.1, 0.5, 0.79])
+def test_bounded_exit_never_changes_the_verdict(l2_fake):
+
+    engine = stub_engine()
+
+    for l1_fake in np.linspace(0.0, 1.0, 41):
+
+        result = early_exit(engine, l1_fake, l2_fake)
+
+        if result is None or not result.get("early_exit"):
+            continue
+
+        low, high = result["final_fake_probability_bounds"]
+
+        # Whatever Level 3 would have said, the verdict is the same and
+        # the fused score lies inside the reported bounds
+        for l3_fake in np.linspace(0.0, 1.0, 11):
+            full = fused(engine, l1_fake, l2_fake, l3_fake)
+
+            assert full["verdict"] == result["verdict"]
+            assert low - 1e-12 <= full["final_fake_probability"] <= high + 1e-12
+
+
+def test_bounded_exit_with_face():
+
+    # 0.2 * 0 + 0.5 * 0 + 0.3 (Level 3 at most) < AUTHENTIC_THRESHOLD
+    result = early_exit(stub_engine(), 0.0, 0.0)
+
+    assert result["verdict"] == "Authentic"
+    assert result["decision_mode"] == "Cascade Early Exit (Bounded)"
+    assert result["early_exit"] is True
+    assert result["final_fake_probability_bounds"] == pytest.approx([0.0, 0.3])
+    assert result["level3_details"] is None
+
+
+def test_no_face_verdict_is_never_bounded():
+
+    # Level 3 carries half the weight without a face: always undecided
+    engine = stub_engine()
+
+    assert all(early_exit(engine, l1_fake, None) is None for l1_fake in np.linspace(0.0, 1.0, 21))
+
+
+def test_undecided_partial_score_runs_level3():
+    assert early_exit(stub_engine(), 0.5, 0.5) is None
+
+
+def test_face_override_exit_is_exact():
+
+    engine = stub_engine()
+    result = early_exit(engine, 0.3, 0.9)
+
+    assert result["decision_mode"] == "Face Override"
+    assert "early_exit" not in result
+    assert result["final_fake_probability"] == fused(engine, 0.3, 0.9, 0.0)["final_fake_probability"]
+
+
+def test_confidence_bands_exit_with_estimate_and_bounds():
+
+    engine = stub_engine(cascade_bands={"authentic_below": 0.2, "ai_above": 0.9})
+
+    # No face: partial = 0.5 * l1, estimate = l1
+    low = early_exit(engine, 0.15, None)
+    high = early_exit(engine, 0.95, None)
+
+    assert low["decision_mode"] == high["decision_mode"] == "Cascade Early Exit (Confidence Band)"
+    assert low["final_fake_probability"] == pytest.approx(0.15)
+    assert low["final_fake_probability_bounds"] == pytest.approx([0.075, 0.575])
+    assert high["final_fake_probability"] == pytest.approx(0.95)
+
+    # Without bands the same scores are undecided
+    assert early_exit(stub_engine(), 0.15, None) is None
+
+
+@pytest.mark.parametrize("bands", [
+    {"authentic_below": 0.35},
+    {"ai_above": 0.70},
+    {"unknown": 0.5},
+])
+def test_invalid_cascade_bands(bands):
+    with pytest.raises(ValueError):
+        stub_engine(cascade_bands=bands)
+
+
+def test_cascade_skips_level3_in_analyze_image():
+
+    level3 = FixedExpert({"fake_probability": 0.5})
+    engine = EnsembleEngine(
+        level1=FixedExpert({"fake_probability": 0.0}),
+        level2=FixedExpert(level2_result(0.0)),
+        level3=level3,
+    )
+
+    result = engine.analyze_image(images(1)[0], cascade=True)
+
+    assert result["verdict"] == "Authentic"
+    assert level3.calls == 0
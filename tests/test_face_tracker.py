@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import draw_face, textured_background
+from src.experts.face_detectors import HaarFaceDetector
+from src.experts.face_tracker import FaceTracker, box_iou
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return HaarFaceDetector()
+
+
+def moving_face_frames(positions, size=110, width=640, height=360):
+
+    # RGB frames of one cartoon face centred at each (x, y)
+    background = textured_background(width, height, np.random.default_rng(0))
+    frames = []
+
+    for cx, cy in positions:
+        frame = background.copy()
+        draw_face(frame, cx, cy, size)
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    return frames
+
+
+def face_counts(tracker, detector, frames):
+
+    tracked = [len(tracker.update(frame)) for frame in frames]
+    detected = [len(detector.detect(frame)) for frame in frames]
+
+    return tracked, detected
+
+
+def test_box_iou():
+
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == pytest.approx(1 / 3)
+
+
+def test_slow_faces_are_followed_between_keyframes(detector):
+
+    frames = moving_face_frames([(150 + 6 * i, 180) for i in range(12)])
+    tracker = FaceTracker(detector.detect, keyframe_interval=4)
+
+    tracked, detected = face_counts(tracker, detector, frames)
+
+    assert detected == [1] * 12
+    assert tracked == detected
+    assert tracker.keyframes == 3
+    assert tracker.redetections == 0
+
+
+def test_far_apart_samples_keep_every_detected_face(detector):
+
+    # Sparse uniform sampling: the face jumps further than the search
+    # window between consecutive sampled frames
+    frames = moving_face_frames([(80 + (i * 170) % 480, 180) for i in range(15)])
+    tracker = FaceTracker(detector.detect, keyframe_interval=4)
+
+    tracked, detected = face_counts(tracker, detector, frames)
+
+    assert detected == [1] * 15
+    assert tracked == detected
+    assert tracker.redetections > 0
+
+
+def test_lost_track_triggers_detection_off_keyframe():
+
+    boxes = iter([[(100, 100, 60, 60)], [(400, 200, 60, 60)]])
+    calls = []
+
+    def detect(rgb):
+        calls.append(rgb)
+        return next(boxes, [])
+
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    frame[100:160, 100:160] = np.random.default_rng(0).integers(0, 255, (60, 60, 3))
+
+    tracker = FaceTracker(detect, keyframe_interval=10)
+    tracker.update(frame)
+
+    # The textured patch is gone: matching fails, so the detector runs
+    tracks = tracker.update(np.zeros_like(frame))
+
+    assert len(calls) == 2
+    assert [box for _, box in tracks] == [(400, 200, 60, 60)]
+    assert tracker.redetections == 1
+
+
+def test_invalid_keyframe_interval():
+    with pytest.raises(ValueError):
+        FaceTracker(lambda rgb: [], keyframe_interval=0)
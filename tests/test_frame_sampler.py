@@ -0,0 +1,205 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.experts.frame_sampler import (
+    VideoOpenError,
+    _round_bounds,
+    _sample_unknown_length,
+    _should_seek,
+    coarse_to_fine_indices,
+    iter_frame_rounds,
+    iter_frames,
+    sample_frames,
+    uniform_indices,
+)
+
+
+NUM_FRAMES = 90
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+
+    # Small clip with a moving block; returns (path, every decoded frame)
+    path = str(tmp_path_factory.mktemp("video") / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+
+    if not writer.isOpened():
+        pytest.skip("OpenCV cannot write MJPG video here")
+
+    for i in range(NUM_FRAMES):
+        frame = np.full((48, 64, 3), (i * 2) % 256, dtype=np.uint8)
+        cv2.rectangle(frame, (i % 56, 10), (i % 56 + 8, 20), (0, 0, 255), -1)
+        writer.write(frame)
+
+    writer.release()
+
+    cap = cv2.VideoCapture(path)
+    frames = []
+
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+
+    cap.release()
+
+    return path, frames
+
+
+def assert_exact(pairs, frames):
+    for index, frame in pairs:
+        assert np.array_equal(frame, frames[index]), f"frame {index} differs"
+
+
+# --------------------------------------------------
+# Plans
+# --------------------------------------------------
+def test_uniform_indices():
+
+    assert uniform_indices(5, 10) == [0, 1, 2, 3, 4]
+    assert uniform_indices(100, 4) == [0, 25, 50, 75]
+
+
+def test_van_der_corput_order():
+    assert coarse_to_fine_indices(8, 8) == [4, 2, 6, 1, 5, 3, 7, 0]
+
+
+def test_coarse_to_fine_prefixes_spread_over_the_clip():
+
+    order = coarse_to_fine_indices(1000, 32)
+
+    assert len(order) == len(set(order)) == 32
+
+    # Every power-of-two prefix leaves no gap wider than ~2 / n of the clip
+    for n in (4, 8, 16, 32):
+        positions = sorted(order[:n]) + [1000]
+        gaps = np.diff([0] + positions)
+        assert max(gaps) <= 2 * 1000 / n
+
+
+def test_coarse_to_fine_short_clips():
+
+    assert sorted(coarse_to_fine_indices(5, 32)) == [0, 1, 2, 3, 4]
+    assert coarse_to_fine_indices(1, 4) == [0]
+
+
+def test_round_bounds_double():
+    assert list(_round_bounds(20, 4)) == [(0, 4), (4, 8), (8, 16), (16, 20)]
+    assert list(_round_bounds(3, 4)) == [(0, 3)]
+
+
+# --------------------------------------------------
+# Seek policy
+# --------------------------------------------------
+def test_backward_targets_always_seek():
+    assert _should_seek(-5, None, None, None)
+    assert _should_seek(-1, "auto", 1.0, 1.0)
+
+
+def test_forward_seek_policies():
+
+    assert not _should_seek(100, None, None, None)
+    assert not _should_seek(0, "auto", None, None)
+
+    assert _should_seek(11, 10, None, None)
+    assert not _should_seek(10, 10, None, None)
+
+    # auto: small gaps grab; large gaps probe a seek, then a grab,
+    # then pick whichever is cheaper
+    assert not _should_seek(4, "auto", None, None)
+    assert _should_seek(50, "auto", None, None)
+    assert not _should_seek(50, "auto", None, 0.01)
+    assert _should_seek(50, "auto", 0.001, 0.01)
+    assert not _should_seek(50, "auto", 0.0001, 0.01)
+
+
+# --------------------------------------------------
+# Decoding
+# --------------------------------------------------
+@pytest.mark.parametrize("seek_threshold", ["auto", None, 8])
+def test_sample_frames_returns_the_planned_frames(video, seek_threshold):
+
+    path, frames = video
+    indices, sampled = sample_frames(path, max_frames=10, seek_threshold=seek_threshold)
+
+    assert indices == uniform_indices(len(frames), 10)
+    assert_exact(zip(indices, sampled), frames)
+
+
+def test_iter_frames_streams_the_same_sample(video):
+
+    path, frames = video
+    streamed = list(iter_frames(path, max_frames=10))
+
+    assert [index for index, _ in streamed] == sample_frames(path, max_frames=10)[0]
+    assert_exact(streamed, frames)
+
+
+@pytest.mark.parametrize("seek_threshold", ["auto", None, 8])
+def test_frame_rounds_follow_the_coarse_to_fine_plan(video, seek_threshold):
+
+    path, frames = video
+    rounds = list(iter_frame_rounds(path, min_frames=4, max_frames=32, seek_threshold=seek_threshold))
+
+    assert [len(round_frames) for round_frames in rounds] == [4, 4, 8, 16]
+
+    order = coarse_to_fine_indices(len(frames), 32)
+    assert [index for round_frames in rounds for index, _ in round_frames] == (
+        sorted(order[:4]) + sorted(order[4:8]) + sorted(order[8:16]) + sorted(order[16:32])
+    )
+
+    for round_frames in rounds:
+        assert_exact(round_frames, frames)
+
+
+def test_invalid_arguments(video):
+
+    path, _ = video
+
+    with pytest.raises(ValueError):
+        sample_frames(path, max_frames=0)
+
+    with pytest.raises(ValueError):
+        next(iter_frame_rounds(path, min_frames=8, max_frames=4))
+
+
+def test_missing_video_raises_open_error(tmp_path):
+    with pytest.raises(VideoOpenError):
+        sample_frames(str(tmp_path / "missing.mp4"))
+
+
+# --------------------------------------------------
+# Streams without a frame count
+# --------------------------------------------------
+class CountlessCapture:
+
+    # Minimal VideoCapture stand-in: n frames, frame i filled with i
+    def __init__(self, n):
+        self.n = n
+        self.position = 0
+
+    def grab(self):
+        if self.position >= self.n:
+            return False
+        self.position += 1
+        return True
+
+    def retrieve(self):
+        return True, np.full((2, 2), self.position - 1, dtype=np.int32)
+
+
+@pytest.mark.parametrize("n", [5, 37, 1000])
+def test_unknown_length_sample_is_evenly_spread(n):
+
+    indices, frames = _sample_unknown_length(CountlessCapture(n), max_frames=8)
+
+    assert len(indices) == min(n, 8)
+    assert indices == sorted(set(indices))
+    assert [int(frame[0, 0]) for frame in frames] == indices
+
+    if n > 8:
+        assert indices[-1] >= n // 2
+        assert max(np.diff(indices)) <= 2 * n / 8
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+import torch
+
+from src.experts.level1_expert import HybridLevel1, Level1Expert, extract_patches, validate_tiling
+
+
+def labelled_tiles(rows, cols, size=32):
+
+    # Gray image whose tile (r, c) is filled with its raster index
+    labels = torch.arange(rows * cols, dtype=torch.uint8).reshape(rows, cols)
+    return labels.repeat_interleave(size, 0).repeat_interleave(size, 1)
+
+
+def tile_labels(patches):
+    return [round(patch[0, 0, 0].item() * 255) for patch in patches]
+
+
+@pytest.fixture(scope="module")
+def level1(tmp_path_factory):
+
+    # Random weights: only preprocessing is under test
+    path = tmp_path_factory.mktemp("models") / "level1_hybrid.pth"
+    torch.manual_seed(0)
+    torch.save(HybridLevel1().state_dict(), path)
+
+    return Level1Expert(str(path))
+
+
+# --------------------------------------------------
+# Grid sampling
+# --------------------------------------------------
+@pytest.mark.parametrize("shape", [(32, 32), (100, 70), (480, 640), (1080, 1920), (64, 2048)])
+@pytest.mark.parametrize("max_patches", [1, 7, 64])
+def test_patch_count_never_exceeds_max_patches(shape, max_patches):
+
+    gray = torch.randint(0, 256, shape, dtype=torch.uint8)
+
+    for sampling in ("grid", "saliency"):
+        patches = extract_patches(gray, sampling=sampling, max_patches=max_patches)
+
+        assert 1 <= len(patches) <= max_patches
+        assert patches.shape[1:] == (1, 32, 32)
+        assert patches.dtype == torch.float32
+        assert 0.0 <= patches.min() and patches.max() <= 1.0
+
+
+def test_small_grids_keep_every_tile_in_raster_order():
+
+    patches = extract_patches(labelled_tiles(3, 4), max_patches=64)
+
+    assert tile_labels(patches) == list(range(12))
+
+
+def test_patches_are_the_native_tiles():
+
+    # Pixels past the last full tile are ignored
+    gray = torch.randint(0, 256, (70, 100), dtype=torch.uint8)
+    patches = extract_patches(gray, max_patches=64)
+
+    assert len(patches) == 2 * 3
+    assert torch.equal(patches[4, 0], gray[32:64, 32:64].float() / 255.0)
+
+
+def test_grid_follows_the_aspect_ratio():
+
+    # 4 x 40 tiles, 16 patches: one spread-out row, not a 4 x 4 corner
+    patches = extract_patches(labelled_tiles(4, 40), max_patches=16)
+    labels = tile_labels(patches)
+
+    rows = {label // 40 for label in labels}
+    cols = [label % 40 for label in labels]
+
+    assert len(patches) == 16
+    assert rows == {0}
+    assert cols[0] == 0 and cols[-1] == 39
+
+    # Square grids keep a square selection
+    labels = tile_labels(extract_patches(labelled_tiles(8, 8), max_patches=16))
+
+    assert len({label // 8 for label in labels}) == 4
+    assert len({label % 8 for label in labels}) == 4
+
+
+# --------------------------------------------------
+# Saliency sampling
+# --------------------------------------------------
+def test_saliency_picks_the_most_textured_tiles():
+
+    gray = torch.full((4 * 32, 5 * 32), 128, dtype=torch.uint8)
+    checker = (torch.arange(32)[:, None] + torch.arange(32)[None, :]) % 2 * 255
+
+    textured = [2, 7, 13, 19]
+
+    for label in textured:
+        r, c = divmod(label, 5)
+        gray[r * 32:(r + 1) * 32, c * 32:(c + 1) * 32] = checker.to(torch.uint8)
+
+    patches = extract_patches(gray, sampling="saliency", max_patches=4)
+
+    # Selected tiles come back in raster order
+    for patch, label in zip(patches, textured):
+        r, c = divmod(label, 5)
+        assert torch.equal(patch[0], gray[r * 32:(r + 1) * 32, c * 32:(c + 1) * 32].float() / 255.0)
+
+
+# --------------------------------------------------
+# Level1Expert tiled preprocessing
+# --------------------------------------------------
+def test_images_smaller_than_a_tile_use_the_resized_image(level1):
+
+    image = np.random.default_rng(0).integers(0, 256, (20, 50, 3), dtype=np.uint8)
+    tiling = validate_tiling({})
+
+    patches = level1.preprocess(image, tiling)
+
+    assert patches.shape == (1, 1, 32, 32)
+    assert torch.equal(patches[0], level1.preprocess(image))
+    assert level1.predict(image, tiling)["patches_analyzed"] == 1
+
+
+def test_tiled_prediction_aggregates_every_patch(level1):
+
+    image = np.random.default_rng(1).integers(0, 256, (96, 128, 3), dtype=np.uint8)
+    result = level1.predict(image, {"aggregate": "max"})
+
+    assert result["patches_analyzed"] == 12
+    assert result["fake_probability"] == pytest.approx(result["max_patch_fake_probability"])
+
+
+@pytest.mark.parametrize("tiling", [
+    {"sampling": "random"},
+    {"aggregate": "median"},
+    {"max_patches": 0},
+    {"top_k": 0},
+    {"stride": 16},
+])
+def test_invalid_tiling(tiling):
+    with pytest.raises(ValueError):
+        validate_tiling(tiling)
@@ -0,0 +1,135 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.experts.level4_video_expert import Level4VideoExpert
+from src.experts.perceptual_hash import FrameDeduplicator, phash
+
+
+def hamming(a, b):
+    return int(np.bitwise_count(np.uint64(a) ^ np.uint64(b)))
+
+
+def textured_frame(seed, size=(240, 320)):
+
+    # Smooth BGR frame: low-frequency content the hash is built from
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (6, 8, 3), dtype=np.uint8)
+    return cv2.resize(base, (size[1], size[0]), interpolation=cv2.INTER_CUBIC)
+
+
+class FakeEngine:
+
+    # Scores a frame by its mean brightness; counts scored frames
+    def __init__(self):
+        self.scored = 0
+
+    def analyze_batch(self, images, batch_size=16):
+        self.scored += len(images)
+        return [{"final_fake_probability": float(image.mean()) / 255.0} for image in images]
+
+
+# --------------------------------------------------
+# phash
+# --------------------------------------------------
+def test_phash_is_deterministic_64_bit():
+
+    frame = textured_frame(0)
+
+    assert phash(frame) == phash(frame.copy())
+    assert isinstance(phash(frame), np.uint64)
+
+
+def test_phash_ignores_small_noise_and_brightness():
+
+    frame = textured_frame(1)
+    noise = np.random.default_rng(2).integers(-3, 4, frame.shape)
+    noisy = np.clip(frame.astype(int) + noise, 0, 255).astype(np.uint8)
+    brighter = np.clip(frame.astype(int) + 20, 0, 255).astype(np.uint8)
+
+    assert hamming(phash(frame), phash(noisy)) <= 4
+    assert hamming(phash(frame), phash(brighter)) <= 4
+
+
+def test_phash_separates_different_frames():
+    assert hamming(phash(textured_frame(3)), phash(textured_frame(4))) > 10
+
+
+def test_phash_rgb_and_bgr_inputs_agree():
+
+    frame = textured_frame(5)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    assert phash(rgb, is_bgr=False) == phash(frame)
+
+
+# --------------------------------------------------
+# FrameDeduplicator
+# --------------------------------------------------
+def test_deduplicator_reuses_cell_within_distance():
+
+    dedup = FrameDeduplicator(max_distance=2)
+
+    first, duplicate = dedup.lookup(np.uint64(0b1011))
+    assert not duplicate
+
+    # Two bits away: same cell
+    cell, duplicate = dedup.lookup(np.uint64(0b1000))
+    assert duplicate and cell is first
+
+    # Three bits away: new cell
+    cell, duplicate = dedup.lookup(np.uint64(0b0100))
+    assert not duplicate and cell is not first
+
+    assert dedup.deduplicated == 1
+
+
+def test_deduplicator_distance_zero_matches_identical_hashes_only():
+
+    dedup = FrameDeduplicator(max_distance=0)
+
+    dedup.lookup(np.uint64(7))
+
+    assert dedup.lookup(np.uint64(7))[1]
+    assert not dedup.lookup(np.uint64(6))[1]
+
+
+# --------------------------------------------------
+# Level 4 dedup is opt-in and verdict-preserving
+# --------------------------------------------------
+def test_video_dedup_is_off_by_default():
+
+    expert = Level4VideoExpert(engine=FakeEngine())
+
+    assert expert.dedup_distance is None
+    assert expert._new_deduplicator() is None
+
+
+@pytest.mark.parametrize("dedup_distance", [0, 4])
+def test_video_verdicts_match_with_dedup_on_and_off(dedup_distance):
+
+    # Clip of repeated (hash-identical) frames of three scenes
+    scenes = [textured_frame(seed) for seed in (10, 11, 12)]
+    frames = [scenes[i // 4].copy() for i in range(12)]
+
+    results = {}
+
+    for distance in (None, dedup_distance):
+
+        engine = FakeEngine()
+        expert = Level4VideoExpert(engine=engine, pipelined=False, dedup_distance=distance)
+
+        deduplicator = expert._new_deduplicator()
+        scores = expert.score_frames(frames, deduplicator)
+        results[distance] = (expert._build_result(scores, deduplicator), engine.scored)
+
+    plain, plain_scored = results[None]
+    deduped, deduped_scored = results[dedup_distance]
+
+    assert deduped["verdict"] == plain["verdict"]
+    assert deduped["max_frame_fake_probability"] == plain["max_frame_fake_probability"]
+    assert deduped["average_frame_fake_probability"] == pytest.approx(plain["average_frame_fake_probability"])
+
+    assert plain_scored == 12
+    assert deduped_scored == 3
+    assert deduped["frames_deduplicated"] == 9
@@ -0,0 +1,174 @@
+import threading
+import time
+
+import pytest
+
+from src.core.request_batcher import MicroBatcher
+
+
+class StubEngine:
+
+    # Results echo the input; inputs equal to "bad" fail
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+        self._lock = threading.Lock()
+
+    def analyze_batch(self, images, batch_size=8, cascade=False):
+
+        with self._lock:
+            self.batches.append((list(images), cascade))
+
+        if "bad" in images:
+            raise ValueError("bad input in batch")
+
+        return [{"image": image, "cascade": cascade} for image in images]
+
+    def analyze_image(self, image, cascade=False):
+
+        with self._lock:
+            self.singles.append(image)
+
+        if image == "bad":
+            raise ValueError("bad input")
+
+        return {"image": image, "cascade": cascade}
+
+
+@pytest.fixture
+def engine():
+    return StubEngine()
+
+
+def submit_all(batcher, images, **kwargs):
+    return [batcher.submit(image, **kwargs) for image in images]
+
+
+def test_concurrent_requests_share_one_batch(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=200, max_batch=16)
+
+    try:
+        futures = submit_all(batcher, ["a", "b", "c", "d"])
+        results = [future.result(2) for future in futures]
+    finally:
+        batcher.close()
+
+    assert [result["image"] for result in results] == ["a", "b", "c", "d"]
+    assert engine.batches == [(["a", "b", "c", "d"], None)]
+
+
+def test_full_batches_do_not_wait_for_the_deadline(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=10_000, max_batch=3)
+
+    try:
+        futures = submit_all(batcher, list("abcdef"))
+        results = [future.result(2) for future in futures]
+    finally:
+        batcher.close()
+
+    assert [result["image"] for result in results] == list("abcdef")
+    assert [images for images, _ in engine.batches] == [["a", "b", "c"], ["d", "e", "f"]]
+
+
+def test_lone_request_is_flushed_after_max_wait(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=30, max_batch=16)
+
+    try:
+        start = time.perf_counter()
+        result = batcher.analyze("a", timeout=2)
+        elapsed_ms = 1000 * (time.perf_counter() - start)
+    finally:
+        batcher.close()
+
+    assert result["image"] == "a"
+    assert elapsed_ms >= 25
+    assert batcher.stats()["queue_wait_ms"]["count"] == 1
+
+
+def test_zero_wait_runs_immediately(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=0, max_batch=16)
+
+    try:
+        assert batcher.analyze("a", timeout=2)["image"] == "a"
+    finally:
+        batcher.close()
+
+
+def test_bad_input_fails_only_its_own_request(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=200, max_batch=16)
+
+    try:
+        good, bad, other = submit_all(batcher, ["a", "bad", "b"])
+
+        assert good.result(2)["image"] == "a"
+        assert other.result(2)["image"] == "b"
+
+        with pytest.raises(ValueError, match="bad input"):
+            bad.result(2)
+    finally:
+        batcher.close()
+
+    assert len(engine.batches) == 1
+    assert engine.singles == ["a", "bad", "b"]
+
+
+def test_requests_are_grouped_by_cascade(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=200, max_batch=16, cascade=True)
+
+    try:
+        futures = [
+            batcher.submit("a"),
+            batcher.submit("b", cascade=False),
+            batcher.submit("c"),
+        ]
+        results = [future.result(2) for future in futures]
+    finally:
+        batcher.close()
+
+    assert [result["cascade"] for result in results] == [True, False, True]
+    assert sorted(engine.batches, key=lambda batch: batch[1]) == [(["b"], False), (["a", "c"], True)]
+
+    # One scheduler batch, split into one engine call per cascade setting
+    assert batcher.stats()["batch_size"]["count"] == 1
+
+
+def test_stats_record_every_batch(engine):
+
+    batcher = MicroBatcher(engine, max_wait_ms=10_000, max_batch=2)
+
+    try:
+        for future in submit_all(batcher, list("abcd")):
+            future.result(2)
+    finally:
+        batcher.close()
+
+    stats = batcher.stats()
+
+    assert stats["max_batch"] == 2
+    assert stats["queued"] == 0
+    assert stats["batch_size"]["count"] == 2
+    assert stats["batch_size"]["sum"] == 4
+    assert stats["queue_wait_ms"]["count"] == 4
+    assert stats["batch_ms"]["count"] == 2
+
+
+def test_submit_after_close_raises(engine):
+
+    batcher = MicroBatcher(engine)
+    batcher.close()
+    batcher.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("a")
+
+
+@pytest.mark.parametrize("options", [{"max_wait_ms": -1}, {"max_batch": 0}])
+def test_invalid_arguments(engine, options):
+    with pytest.raises(ValueError):
+        MicroBatcher(engine, **options)
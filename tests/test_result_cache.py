@@ -0,0 +1,228 @@
+import io
+
+import numpy as np
+import pytest
+
+from src.core.ensemble_engine import EnsembleEngine
+from src.core.result_cache import ResultCache, config_fingerprint, content_digest
+
+
+class StubLevel1:
+
+    def __init__(self, fake_probability=0.1):
+        self.fake_probability = fake_probability
+        self.calls = 0
+
+    def predict(self, image, tiling=None):
+        self.calls += 1
+        return {"fake_probability": self.fake_probability}
+
+
+class StubLevel2:
+
+    max_faces = 64
+    face_batch_size = 32
+
+    def predict(self, image):
+        return {"faces_detected": 0}
+
+
+class StubLevel3:
+
+    def predict(self, image):
+        return {"fake_probability": 0.2}
+
+
+def stub_engine(cache=None, **options):
+    return EnsembleEngine(level1=StubLevel1(), level2=StubLevel2(), level3=StubLevel3(), cache=cache, **options)
+
+
+def image(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+
+
+# --------------------------------------------------
+# ResultCache
+# --------------------------------------------------
+def test_memory_round_trip_and_counters():
+
+    cache = ResultCache()
+
+    assert cache.get("k") is None
+
+    cache.put("k", {"verdict": "Authentic", "score": 0.25})
+
+    assert cache.get("k") == {"verdict": "Authentic", "score": 0.25}
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["writes"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cached_results_are_copies():
+
+    cache = ResultCache()
+    cache.put("k", {"nested": {"a": 1}})
+
+    cache.get("k")["nested"]["a"] = 2
+
+    assert cache.get("k") == {"nested": {"a": 1}}
+
+
+def test_lru_eviction():
+
+    cache = ResultCache(capacity=2)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_persists_across_instances(tmp_path):
+
+    path = str(tmp_path / "cache" / "results.sqlite")
+
+    cache = ResultCache(db_path=path)
+    cache.put("k", {"verdict": "AI Generated"})
+    cache.close()
+
+    reopened = ResultCache(db_path=path)
+
+    assert reopened.get("k") == {"verdict": "AI Generated"}
+    assert reopened.stats()["disk_hits"] == 1
+
+    reopened.clear()
+
+    assert reopened.get("k") is None
+    reopened.close()
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        ResultCache(capacity=0)
+
+
+# --------------------------------------------------
+# Content / config digests
+# --------------------------------------------------
+def test_content_digest_same_bytes_from_any_source(tmp_path):
+
+    payload = b"\xff\xd8not really a jpeg"
+    path = tmp_path / "image.jpg"
+    path.write_bytes(payload)
+
+    digest, _ = content_digest(payload)
+    file_digest, _ = content_digest(str(path))
+    stream_digest, source = content_digest(io.BytesIO(payload))
+
+    assert digest == file_digest == stream_digest
+
+    # File-like sources are handed back as bytes for decoding
+    assert source == payload
+
+
+def test_content_digest_arrays_include_dtype_and_shape():
+
+    array = image()
+
+    assert content_digest(array)[0] == content_digest(array.copy())[0]
+    assert content_digest(array)[0] != content_digest(array.astype(np.int16))[0]
+    assert content_digest(array)[0] != content_digest(array.reshape(64, 48, 3))[0]
+
+
+def test_config_fingerprint_ignores_key_order():
+    assert config_fingerprint({"a": 1, "b": [1, 2]}) == config_fingerprint({"b": [1, 2], "a": 1})
+
+
+# --------------------------------------------------
+# Engine fingerprint invalidation
+# --------------------------------------------------
+def test_fingerprint_stable_for_equal_configuration():
+    assert stub_engine().fingerprint() == stub_engine().fingerprint()
+
+
+@pytest.mark.parametrize("change", [
+    lambda engine: engine.set_decode_max_side(1024),
+    lambda engine: engine.set_level1_tiling({"sampling": "grid"}),
+    lambda engine: setattr(engine.level2, "max_faces", 4),
+    lambda engine: setattr(engine.level2, "face_batch_size", 8),
+    lambda engine: setattr(engine, "cascade_bands", {"ai_above": 0.9}),
+])
+def test_fingerprint_changes_with_output_affecting_options(change):
+
+    engine = stub_engine()
+    before = engine.fingerprint()
+
+    change(engine)
+
+    assert engine.fingerprint() != before
+
+
+def test_fingerprint_covers_quantize_and_backends():
+
+    baseline = EnsembleEngine().fingerprint()
+
+    assert EnsembleEngine(quantize=["level3"]).fingerprint() != baseline
+    assert EnsembleEngine(backends={"level1": "torchscript"}).fingerprint() != baseline
+
+
+def test_fingerprint_covers_face_detector_settings():
+
+    class Detector:
+
+        def __init__(self, min_size):
+            self.min_size = min_size
+
+        def describe(self):
+            return {"name": "stub", "min_size": self.min_size}
+
+    engine = stub_engine()
+    engine.level2.detector = Detector(40)
+    before = engine.fingerprint()
+
+    engine.level2.detector = Detector(80)
+
+    assert engine.fingerprint() != before
+
+
+# --------------------------------------------------
+# Engine cache round trip
+# --------------------------------------------------
+def test_engine_serves_cached_result():
+
+    engine = stub_engine(cache=ResultCache())
+
+    first = engine.analyze_image(image())
+    second = engine.analyze_image(image())
+
+    assert first == second
+    assert engine.level1.calls == 1
+
+
+def test_configuration_change_misses_the_cache():
+
+    engine = stub_engine(cache=ResultCache())
+
+    engine.analyze_image(image())
+    engine.set_decode_max_side(1024)
+    engine.analyze_image(image())
+
+    assert engine.level1.calls == 2
+
+
+def test_cascade_and_full_results_are_cached_separately():
+
+    engine = stub_engine(cache=ResultCache())
+
+    engine.analyze_image(image(), cascade=False)
+    engine.analyze_image(image(), cascade=True)
+
+    assert engine.level1.calls == 2
@@ -0,0 +1,232 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.experts.level4_video_expert import Level4VideoExpert
+from src.experts.perceptual_hash import FrameDeduplicator
+from src.experts.video_pipeline import VideoPipeline
+
+
+def textured_frame(seed, size=(48, 64)):
+
+    # Smooth BGR frame; distinct seeds give distinct perceptual hashes
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (6, 8, 3), dtype=np.uint8)
+    return cv2.resize(base, (size[1], size[0]), interpolation=cv2.INTER_CUBIC)
+
+
+def score(rgb):
+    return {"final_fake_probability": float(rgb.mean()) / 255.0}
+
+
+class StubCache:
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, result):
+        self.entries[key] = result
+
+
+class StubEngine:
+
+    # Scores a frame by its mean brightness. fail_on: "prepare" or
+    # "analyze" raises once that many frames passed through the stage
+    def __init__(self, cache=None, delay=0.0, fail_on=None, fail_after=0):
+        self.cache = cache
+        self.delay = delay
+        self.fail_on = fail_on
+        self.fail_after = fail_after
+        self.prepared = 0
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def cache_lookup(self, rgb, cascade=None):
+
+        if self.cache is None:
+            return None, rgb, None
+
+        key = rgb.tobytes()
+        return key, rgb, self.cache.get(key)
+
+    def prepare(self, rgb, face_boxes=None):
+
+        if self.fail_on == "prepare" and self.prepared >= self.fail_after:
+            raise ValueError("prepare failed")
+
+        self.prepared += 1
+        return rgb
+
+    def analyze_prepared(self, prepared, cascade=None):
+
+        with self._lock:
+            self.batches.append(len(prepared))
+
+        if self.fail_on == "analyze" and sum(self.batches) > self.fail_after:
+            raise RuntimeError("inference failed")
+
+        time.sleep(self.delay)
+        return [score(rgb) for rgb in prepared]
+
+    def analyze_batch(self, images, batch_size=16):
+        return [score(rgb) for rgb in images]
+
+
+def indexed(frames, step=5):
+    return [(i * step, frame) for i, frame in enumerate(frames)]
+
+
+def run_pipeline(pipeline, frames, timeout=10):
+
+    # Runs on a helper thread so a hung pipeline fails the test
+    outcome = {}
+
+    def target():
+        try:
+            outcome["results"] = pipeline.run(frames)
+        except Exception as error:
+            outcome["error"] = error
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    assert not thread.is_alive(), "pipeline did not finish"
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    return outcome["results"]
+
+
+def scores_of(results):
+    return [result["final_fake_probability"] for _, result in results]
+
+
+# --------------------------------------------------
+# Ordering and parity
+# --------------------------------------------------
+def test_results_keep_frame_order_and_match_score_frames():
+
+    frames = [textured_frame(seed) for seed in range(20)]
+    engine = StubEngine(delay=0.002)
+
+    # Shallow queues and a slow inference stage force back-pressure
+    pipeline = VideoPipeline(engine, queue_depth=2, batch_size=3)
+    results = run_pipeline(pipeline, indexed(frames))
+
+    serial = Level4VideoExpert(engine=StubEngine(), pipelined=False).score_frames(frames)
+
+    assert [index for index, _ in results] == [i * 5 for i in range(20)]
+    assert scores_of(results) == serial
+    assert max(engine.batches) <= 3
+    assert sum(engine.batches) == 20
+    assert pipeline.stats()["stages"]["decode"]["items"] == 20
+
+
+def test_invalid_arguments():
+
+    with pytest.raises(ValueError):
+        VideoPipeline(StubEngine(), queue_depth=0)
+
+    with pytest.raises(ValueError):
+        VideoPipeline(StubEngine(), batch_size=0)
+
+
+# --------------------------------------------------
+# Errors abort every stage
+# --------------------------------------------------
+def test_decode_error_propagates():
+
+    def frames():
+        for i in range(3):
+            yield i, textured_frame(i)
+        raise OSError("decode failed")
+
+    with pytest.raises(OSError, match="decode failed"):
+        run_pipeline(VideoPipeline(StubEngine(), queue_depth=1, batch_size=2), frames())
+
+
+def test_preprocess_error_propagates_with_full_queues():
+
+    # Decode keeps the frame queue full while preprocess fails: the end
+    # marker must still get through
+    frames = indexed([textured_frame(seed) for seed in range(50)])
+    engine = StubEngine(fail_on="prepare", fail_after=5)
+
+    with pytest.raises(ValueError, match="prepare failed"):
+        run_pipeline(VideoPipeline(engine, queue_depth=1, batch_size=2), frames)
+
+
+def test_inference_error_propagates_and_stops_decoding():
+
+    decoded = []
+
+    def frames():
+        for i in range(200):
+            decoded.append(i)
+            yield i, textured_frame(i)
+
+    engine = StubEngine(fail_on="analyze", fail_after=4)
+
+    with pytest.raises(RuntimeError, match="inference failed"):
+        run_pipeline(VideoPipeline(engine, queue_depth=2, batch_size=2), frames())
+
+    assert len(decoded) < 200
+
+
+# --------------------------------------------------
+# Dedup and cache
+# --------------------------------------------------
+def test_duplicates_reuse_the_matched_result():
+
+    scenes = [textured_frame(seed) for seed in (1, 2, 3)]
+    frames = [scenes[i % 3].copy() for i in range(12)]
+
+    plain = run_pipeline(VideoPipeline(StubEngine(), queue_depth=2, batch_size=4), indexed(frames))
+
+    engine = StubEngine()
+    pipeline = VideoPipeline(engine, queue_depth=2, batch_size=4, deduplicator=FrameDeduplicator(max_distance=0))
+    deduped = run_pipeline(pipeline, indexed(frames))
+
+    assert deduped == plain
+    assert sum(engine.batches) == 3
+    assert pipeline.stats()["frames_deduplicated"] == 9
+
+
+def test_cache_hits_skip_inference():
+
+    unique = [textured_frame(seed) for seed in range(6)]
+    frames = indexed(unique * 2)
+    cache = StubCache()
+
+    first_engine = StubEngine(cache=cache)
+    run_pipeline(VideoPipeline(first_engine, batch_size=4), indexed(unique))
+
+    assert sum(first_engine.batches) == 6
+    assert len(cache.entries) == 6
+
+    expected = run_pipeline(VideoPipeline(StubEngine(), batch_size=4), frames)
+
+    engine = StubEngine(cache=cache)
+    again = run_pipeline(VideoPipeline(engine, batch_size=4), frames)
+
+    assert again == expected
+    assert engine.batches == []
+    assert engine.prepared == 0
+
+    # Cached results also fill dedup cells for later duplicates
+    engine = StubEngine(cache=cache)
+    deduped = run_pipeline(
+        VideoPipeline(engine, batch_size=4, deduplicator=FrameDeduplicator(max_distance=0)),
+        frames
+    )
+
+    assert deduped == expected
+    assert engine.batches == []